@@ -0,0 +1,39 @@
+"""
+Compares the single-pass inline tokenizer with the multi-pass pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_inline
+"""
+
+import timeit
+
+from src.markdown_parser import text_to_textnodes, text_to_textnodes_multipass
+
+
+def link_dense_text(count: int) -> str:
+    return " ".join(f"see [link {i}](https://example.com/{i}) and ![img {i}](/images/{i}.png)" for i in range(count))
+
+
+def emphasis_dense_text(count: int) -> str:
+    return " ".join(f"**bold {i}** then _italic {i}_ then `code {i}`" for i in range(count))
+
+
+def bench(text: str, repeat: int = 5) -> tuple[float, float]:
+    assert text_to_textnodes(text) == text_to_textnodes_multipass(text)
+    number = max(1, 20000 // max(1, len(text) // 50))
+    single = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=repeat)) / number
+    multi = min(timeit.repeat(lambda: text_to_textnodes_multipass(text), number=number, repeat=repeat)) / number
+    return single, multi
+
+
+def main():
+    print(f"{'input':<10} {'items':>6} {'single-pass':>14} {'multi-pass':>14} {'speedup':>8}")
+    for name, make_text in (("links", link_dense_text), ("emphasis", emphasis_dense_text)):
+        for count in (10, 100, 1000, 10000):
+            single, multi = bench(make_text(count))
+            print(f"{name:<10} {count:>6} {single * 1e6:>12.1f}us {multi * 1e6:>12.1f}us {multi / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures the memory and construction time of the node trees built for a page.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_nodes
+"""
+
+import gc
+import time
+import tracemalloc
+
+from src.markdown_parser import markdown_to_html_node
+
+
+def sample_page(sections: int) -> str:
+    blocks = []
+    for i in range(sections):
+        blocks.append(f"## Section {i}")
+        blocks.append(f"Some **bold {i}** text, _italic_ words, `code` and a [link](/page/{i}) in a paragraph.")
+        blocks.append("\n".join(f"- item {j} with [a link](/item/{j})" for j in range(5)))
+        blocks.append("\n".join(f"{j + 1}. step _{j}_" for j in range(3)))
+        blocks.append("> a quote with **emphasis**")
+    return "\n\n".join(blocks)
+
+
+def count_nodes(node) -> int:
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        if current.children:
+            stack.extend(current.children)
+    return count
+
+
+def measure(markdown: str, repeat: int = 5) -> tuple[int, int, float]:
+    """
+    Returns the node count, the bytes retained by the tree, and the best
+    construction time in seconds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tree = markdown_to_html_node(markdown, memoize=False)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        markdown_to_html_node(markdown, memoize=False)
+        best = min(best, time.perf_counter() - start)
+    return count_nodes(tree), retained, best
+
+
+def main():
+    print(f"{'sections':>8} {'nodes':>8} {'retained':>12} {'bytes/node':>10} {'build time':>12}")
+    for sections in (10, 100, 1000):
+        nodes, retained, seconds = measure(sample_page(sections))
+        print(f"{sections:>8} {nodes:>8} {retained:>11}B {retained / nodes:>10.1f} {seconds * 1e3:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
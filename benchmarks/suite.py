@@ -0,0 +1,171 @@
+"""
+Micro-benchmarks of the parser and renderer hot paths.
+
+Each stage is timed separately on seeded synthetic documents across sizes and
+feature mixes. Results are written as JSON so runs can be compared:
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --output after.json --compare before.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import timeit
+from collections.abc import Callable
+
+from benchmarks.synthetic import FEATURE_MIXES, generate_markdown
+from src.linknode import split_nodes_image, split_nodes_link
+from src.markdown_parser import (
+    BlockType,
+    block_to_block_type,
+    block_to_block_type_predicates,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_to_textnodes,
+)
+from src.textnode import TextNode, TextType, split_nodes_delimiter
+
+SIZES = (10, 100, 1000)
+QUICK_SIZES = (10, 100)
+INLINE_BLOCK_TYPES = (BlockType.PARAGRAPH, BlockType.HEADING)
+
+
+def stage_benchmarks(markdown: str) -> dict[str, Callable[[], object]]:
+    """
+    Prepares the inputs of every stage for a document and returns one
+    zero-argument callable per stage, so only the stage itself is timed.
+    """
+    blocks = markdown_to_blocks(markdown)
+    inline_texts = [block.replace("\n", " ") for block in blocks if block_to_block_type(block) in INLINE_BLOCK_TYPES]
+    text_nodes = [[TextNode(text, TextType.TEXT)] for text in inline_texts]
+    nodes_after_links = [split_nodes_link(split_nodes_image(nodes)) for nodes in text_nodes]
+    html_tree = markdown_to_html_node(markdown, memoize=False)
+    edits = itertools.count()
+
+    def split_delimiters():
+        for nodes in nodes_after_links:
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+
+    return {
+        "markdown_to_blocks": lambda: markdown_to_blocks(markdown),
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        "block_to_block_type_predicates": lambda: [block_to_block_type_predicates(block) for block in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(text) for text in inline_texts],
+        "split_nodes_delimiter": split_delimiters,
+        "split_nodes_link_image": lambda: [split_nodes_link(split_nodes_image(nodes)) for nodes in text_nodes],
+        "markdown_to_html_node": lambda: markdown_to_html_node(markdown, memoize=False),
+        # Re-rendering after a one-block edit, as in watch mode: the other blocks hit the block cache.
+        "markdown_to_html_node_edit": lambda: markdown_to_html_node(f"{markdown}\n\nEdit number {next(edits)}."),
+        "to_html": html_tree.to_html,
+    }
+
+
+def time_callable(func: Callable[[], object], repeat: int, min_time: float = 0.05) -> dict[str, float | int]:
+    """
+    Times a callable, calling it enough times per repeat to run for `min_time` seconds.
+
+    Returns:
+        The best and mean time per call in seconds, and the calls per repeat.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    timings = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {"best_s": min(timings), "mean_s": sum(timings) / len(timings), "number": number}
+
+
+def run_suite(sizes=SIZES, mixes=tuple(FEATURE_MIXES), seed: int = 0, repeat: int = 5, stages=None) -> dict:
+    """
+    Runs every stage benchmark for each document size and feature mix.
+
+    Returns:
+        The results keyed by "<stage>/<mix>/<blocks>", plus run metadata.
+    """
+    results = {}
+    for mix in mixes:
+        for size in sizes:
+            markdown = generate_markdown(size, mix, seed)
+            for stage, func in stage_benchmarks(markdown).items():
+                if stages and stage not in stages:
+                    continue
+                key = f"{stage}/{mix}/{size}"
+                results[key] = time_callable(func, repeat)
+                results[key]["bytes"] = len(markdown)
+                print(f"{key:<45} {results[key]['best_s'] * 1e3:>10.3f}ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compares two suite runs on their best timings.
+
+    Returns:
+        The keys whose best time grew by more than `threshold` (a ratio, e.g. 1.2).
+    """
+    regressions = []
+    print(f"{'benchmark':<45} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        ratio = result["best_s"] / base["best_s"]
+        flag = " REGRESSION" if ratio > threshold else ""
+        print(f"{key:<45} {base['best_s'] * 1e3:>8.3f}ms {result['best_s'] * 1e3:>8.3f}ms {ratio:>6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser and renderer micro-benchmarks.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous JSON result file.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression.")
+    parser.add_argument("--quick", action="store_true", help="Only run the small document sizes.")
+    parser.add_argument("--mix", action="append", choices=sorted(FEATURE_MIXES), help="Feature mix(es) to run.")
+    parser.add_argument("--stage", action="append", help="Stage(s) to run, e.g. text_to_textnodes.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run_suite(
+        sizes=QUICK_SIZES if args.quick else SIZES,
+        mixes=args.mix or tuple(FEATURE_MIXES),
+        seed=args.seed,
+        repeat=args.repeat,
+        stages=args.stage,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Seeded generator of synthetic markdown documents for the benchmarks.
+"""
+
+import random
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog elves rivendell ring bearer shire mountain river "
+    "forest wizard hobbit journey tale song light shadow road home"
+).split()
+
+# Relative weights of each block kind, and how inline-heavy paragraphs are.
+FEATURE_MIXES = {
+    "prose": {"blocks": {"paragraph": 8, "heading": 1}, "inline": 0.02},
+    "links": {"blocks": {"paragraph": 6, "unordered_list": 2, "heading": 1}, "inline": 0.3, "links_only": True},
+    "emphasis": {"blocks": {"paragraph": 6, "quote": 2, "heading": 1}, "inline": 0.3, "emphasis_only": True},
+    "lists": {"blocks": {"unordered_list": 4, "ordered_list": 4, "heading": 1}, "inline": 0.1},
+    "mixed": {
+        "blocks": {"paragraph": 5, "heading": 2, "code": 1, "quote": 1, "unordered_list": 2, "ordered_list": 2},
+        "inline": 0.15,
+    },
+}
+
+
+class MarkdownGenerator:
+    """
+    Generates reproducible markdown documents for a feature mix.
+    """
+
+    def __init__(self, seed: int = 0, mix: str = "mixed"):
+        self.rng = random.Random(seed)
+        self.mix = FEATURE_MIXES[mix]
+        kinds = self.mix["blocks"]
+        self.block_kinds = list(kinds)
+        self.block_weights = [kinds[kind] for kind in self.block_kinds]
+
+    def word(self) -> str:
+        return self.rng.choice(WORDS)
+
+    def inline_text(self, words: int) -> str:
+        parts = []
+        for _ in range(words):
+            if self.rng.random() >= self.mix["inline"]:
+                parts.append(self.word())
+                continue
+            if self.mix.get("emphasis_only"):
+                kind = self.rng.choice(("bold", "italic", "code"))
+            elif self.mix.get("links_only"):
+                kind = self.rng.choice(("link", "image"))
+            else:
+                kind = self.rng.choice(("bold", "italic", "code", "link", "image"))
+            text = self.word()
+            if kind == "bold":
+                parts.append(f"**{text}**")
+            elif kind == "italic":
+                parts.append(f"_{text}_")
+            elif kind == "code":
+                parts.append(f"`{text}`")
+            elif kind == "link":
+                parts.append(f"[{text}](/{self.word()}/{self.rng.randrange(1000)})")
+            else:
+                parts.append(f"![{text}](/images/{self.word()}.png)")
+        return " ".join(parts)
+
+    def block(self) -> str:
+        kind = self.rng.choices(self.block_kinds, self.block_weights)[0]
+        if kind == "heading":
+            return "#" * self.rng.randint(1, 6) + " " + self.inline_text(self.rng.randint(2, 6))
+        if kind == "code":
+            lines = [
+                " ".join(self.word() for _ in range(self.rng.randint(1, 8))) for _ in range(self.rng.randint(2, 8))
+            ]
+            return "```\n" + "\n".join(lines) + "\n```"
+        if kind == "quote":
+            return "\n".join("> " + self.inline_text(self.rng.randint(4, 12)) for _ in range(self.rng.randint(1, 4)))
+        if kind == "unordered_list":
+            return "\n".join("- " + self.inline_text(self.rng.randint(2, 10)) for _ in range(self.rng.randint(2, 8)))
+        if kind == "ordered_list":
+            items = self.rng.randint(2, 8)
+            return "\n".join(f"{i + 1}. " + self.inline_text(self.rng.randint(2, 10)) for i in range(items))
+        lines = [self.inline_text(self.rng.randint(8, 20)) for _ in range(self.rng.randint(1, 4))]
+        return "\n".join(lines)
+
+    def document(self, blocks: int) -> str:
+        """
+        Returns a document starting with a title heading followed by `blocks` blocks.
+        """
+        return "\n\n".join(["# " + self.inline_text(4)] + [self.block() for _ in range(blocks)]) + "\n"
+
+
+def generate_markdown(blocks: int, mix: str = "mixed", seed: int = 0) -> str:
+    """
+    Generates a reproducible synthetic markdown document.
+
+    Args:
+        blocks: The number of blocks after the title.
+        mix: The feature mix, a key of FEATURE_MIXES.
+        seed: The random seed.
+
+    Returns:
+        The markdown document.
+    """
+    return MarkdownGenerator(seed, mix).document(blocks)
@@ -1,2 +1 @@
-./main.sh "$@"
-python3 live_server.py
+python3 -m src.main --serve --host 0.0.0.0 "$@"
@@ -0,0 +1,388 @@
+"""
+The site build: its configuration, `build_site`, and the stages that run
+around page generation (fingerprinting, image probing, feeds, the search
+index, precompression and the deploy changes record).
+"""
+
+import functools
+import logging
+import os
+import shutil
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from src.deploy import DEPLOY_CHANGES_FILENAME, diff_outputs, hash_outputs, write_deploy_changes
+from src.feeds import FEED_FILENAME, SITEMAP_FILENAME, inputs_digest, is_listed, write_atom_feed, write_sitemap
+from src.fingerprint import ASSET_MAP_FILENAME, build_asset_map, fingerprint_assets
+from src.image_size import image_size_map, probe_static_images
+from src.manifest import MANIFEST_FILENAME, STATE_DIRNAME, BuildManifest
+from src.page_index import PAGE_INDEX_FILENAME, PageIndex
+from src.pages import build_settings, process_content_directory
+from src.parse_cache import DEFAULT_MAX_BYTES, ParseCache
+from src.precompress import DEFAULT_MIN_SIZE, precompress_outputs
+from src.search_index import SEARCH_STATE_FILENAME, remove_search_index, update_search_index
+from src.static_sync import sync_static
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class BuildConfig:
+    """
+    The inputs and options of a site build.
+    """
+
+    content_dir: str
+    template_path: str
+    static_dir: str
+    output_dir: str
+    basepath: str = "/"
+    generate_navbar: bool = False
+    mark_active_nav: bool = False
+    incremental: bool = False
+    clean: bool = False
+    stream: bool = False
+    minify: bool = False
+    fingerprint: bool = False
+    image_dimensions: bool = False
+    jobs: int = 1
+    static_hash: bool = False
+    static_hardlink: bool = False
+    deploy_changes_path: str | None = None
+    site_url: str | None = None
+    feed_section: str = "blog"
+    feed_title: str | None = None
+    search_index: bool = False
+    gzip: bool = False
+    gzip_min_size: int = DEFAULT_MIN_SIZE
+    cache_dir: str | None = None
+    cache_max_bytes: int = DEFAULT_MAX_BYTES
+    # Where the manifest, page index and other records of the previous build are
+    # kept; defaults to a directory next to `output_dir`, outside what is published.
+    state_dir: str | None = None
+
+    def __post_init__(self):
+        if self.state_dir is None:
+            self.state_dir = os.path.join(os.path.dirname(os.path.abspath(self.output_dir)), STATE_DIRNAME)
+
+    def parse_cache(self) -> ParseCache | None:
+        """
+        Returns the parse cache of the build, or None when caching is disabled.
+        """
+        return ParseCache(self.cache_dir, self.cache_max_bytes) if self.cache_dir else None
+
+
+def build_site(config: BuildConfig) -> None:
+    """
+    Builds the site: prepares the output directory, syncs the static files
+    and generates the pages, recording both in the build manifest, then
+    writes the list of changed outputs for deploy tooling.
+
+    The output directory is kept between builds. Static files are only copied
+    when they changed, and the outputs of deleted sources are removed. Unless
+    building incrementally every page is regenerated. The manifest and the
+    other records kept for the next build live in `config.state_dir`, so they
+    are not published with the site.
+
+    Args:
+        config: The build inputs and options.
+    """
+    public_base_dir = config.output_dir
+    static_base_dir = config.static_dir
+
+    with tracer.span("manifest_load"):
+        manifest = BuildManifest.load(config.state_dir)
+        page_index = PageIndex.load(config.state_dir)
+
+    # Clean the public directory when asked to, or when there is no manifest telling
+    # which of its files a previous build wrote.
+    if os.path.exists(public_base_dir) and (config.clean or not os.path.exists(manifest.path)):
+        logger.info("Cleaning existing public directory: %s", public_base_dir)
+        with tracer.span("clean_output"):
+            shutil.rmtree(public_base_dir)
+    # The state describes the previous output directory, so it goes with it.
+    if not os.path.exists(public_base_dir):
+        remove_build_state(config.state_dir)
+        manifest = BuildManifest(manifest.path)
+        page_index = PageIndex(page_index.path)
+
+    logger.info("Ensuring public base directory exists: %s", public_base_dir)
+    os.makedirs(public_base_dir, exist_ok=True)
+
+    # Sync static files to the public directory
+    try:
+        logger.info("Syncing static files from %s to %s...", static_base_dir, public_base_dir)
+        with tracer.span("static_sync"):
+            sync_result = sync_static(
+                static_base_dir, public_base_dir, manifest.static, config.static_hash, config.static_hardlink
+            )
+        manifest.static = sync_result.synced
+        logger.info("Static files synced to public.")
+    except FileNotFoundError:
+        logger.error("Error: Static directory %s not found. Skipping static file copy.", static_base_dir)
+    except Exception as e:
+        logger.exception("An error occurred during static file copy: %s", e)
+
+    with tracer.span("fingerprint"):
+        fingerprint_site(config, manifest)
+    with tracer.span("image_dimensions"):
+        probe_site_images(config, manifest)
+
+    manifest.apply_settings(site_settings(config, manifest))
+    parse_cache = config.parse_cache()
+    search_terms = {} if config.search_index else None
+
+    # Call process_content_directory to generate pages in public
+    try:
+        with tracer.span("process_content_directory"):
+            process_content_directory(
+                config.content_dir,
+                config.template_path,
+                public_base_dir,
+                config.basepath,
+                config.generate_navbar,
+                manifest=manifest,
+                jobs=config.jobs,
+                mark_active_nav=config.mark_active_nav,
+                stream=config.stream,
+                force=not config.incremental,
+                parse_cache=parse_cache,
+                page_index=page_index,
+                minify=config.minify,
+                asset_map=build_asset_map(manifest.assets),
+                image_sizes=image_size_map(manifest.images),
+                search_terms=search_terms,
+            )
+        logger.info("Content processing and page generation complete.")
+    except FileNotFoundError:
+        logger.error("Error: Content directory %s not found. Skipping page generation.", config.content_dir)
+        return
+    except Exception as e:
+        logger.error("An error ocurred during content porcessing: %s", e)
+        return
+
+    with tracer.span("page_index_save"):
+        page_index.save()
+    run_stage("feeds", functools.partial(write_site_feeds, config, manifest, page_index))
+    run_stage("search_index", functools.partial(write_search_index, config, page_index, search_terms))
+    outputs = run_stage("precompress", functools.partial(precompress_site, config, manifest))
+    run_stage("deploy_changes", functools.partial(record_deploy_changes, config, manifest, outputs))
+    with tracer.span("manifest_save"):
+        manifest.save()
+    if parse_cache is not None:
+        run_stage("cache_prune", parse_cache.prune)
+
+    logger.info("Static site generation complete.")
+
+
+def site_settings(config: BuildConfig, manifest: BuildManifest | None = None) -> dict:
+    """
+    Returns the `build_settings` of a build configuration.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest whose fingerprinted asset names and image
+                  dimensions the pages use, if any.
+    """
+    return build_settings(
+        config.content_dir,
+        config.template_path,
+        config.basepath,
+        config.generate_navbar,
+        config.mark_active_nav,
+        config.minify,
+        build_asset_map(manifest.assets) if manifest is not None else None,
+        image_size_map(manifest.images) if manifest is not None else None,
+    )
+
+
+def run_stage(name: str, stage: Callable[[], T]) -> T | None:
+    """
+    Runs a build stage after page generation in a tracer span, logging its
+    errors instead of raising them, so the stages after it and the manifest
+    save still run.
+
+    Args:
+        name: The stage name, used for the span and in the error message.
+        stage: The stage to run.
+
+    Returns:
+        The result of `stage`, or None if it failed.
+    """
+    with tracer.span(name):
+        try:
+            return stage()
+        except Exception as e:
+            logger.exception("Error in the %s stage of the build: %s", name, e)
+            return None
+
+
+def remove_build_state(state_dir: str) -> None:
+    """
+    Deletes the records a build keeps in `state_dir`. Other files in the
+    directory are left alone, as it may be shared.
+    """
+    for filename in (MANIFEST_FILENAME, PAGE_INDEX_FILENAME, SEARCH_STATE_FILENAME, DEPLOY_CHANGES_FILENAME):
+        try:
+            os.remove(os.path.join(state_dir, filename))
+        except FileNotFoundError:
+            pass
+
+
+def fingerprint_site(config: BuildConfig, manifest: BuildManifest) -> list[str]:
+    """
+    Copies the synced static assets to content-hashed names when
+    `config.fingerprint` is set, and removes the fingerprinted copies of a
+    previous build otherwise.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest; its record of fingerprinted assets is updated.
+
+    Returns:
+        The outputs written or removed, including the asset map.
+    """
+    synced = manifest.static if config.fingerprint else {}
+    try:
+        result = fingerprint_assets(
+            config.static_dir, config.output_dir, synced, manifest.assets, config.static_hardlink
+        )
+    except OSError as e:
+        logger.error("Error fingerprinting static assets: %s", e)
+        return []
+    manifest.assets = result.assets
+    if not result.written and not result.removed:
+        return []
+    return result.written + result.removed + [ASSET_MAP_FILENAME]
+
+
+def probe_site_images(config: BuildConfig, manifest: BuildManifest) -> None:
+    """
+    Reads the dimensions of the synced static images when
+    `config.image_dimensions` is set, and forgets them otherwise.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest; its record of image dimensions is updated.
+    """
+    synced = manifest.static if config.image_dimensions else {}
+    try:
+        manifest.images = probe_static_images(config.static_dir, synced, manifest.images)
+    except OSError as e:
+        logger.error("Error reading image dimensions: %s", e)
+
+
+def write_site_feeds(config: BuildConfig, manifest: BuildManifest, page_index: PageIndex) -> list[str]:
+    """
+    Writes `sitemap.xml` and the Atom feed of `config.feed_section` from the
+    page index when `config.site_url` is set. Each is only rewritten when the
+    index entries it lists changed since it was last written.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest recording the generated files.
+        page_index: The site's page metadata index.
+
+    Returns:
+        The files written or removed, relative to the output directory.
+    """
+    generated, updated = set(), []
+    if config.site_url:
+        site_url = config.site_url.rstrip("/")
+        entries = page_index.entries()
+        digest = inputs_digest(site_url, config.basepath, entries)
+        if not manifest.is_generated_fresh("sitemap", digest, config.output_dir):
+            files = write_sitemap(config.output_dir, entries, site_url, config.basepath)
+            updated += files + manifest.record_generated("sitemap", digest, files, config.output_dir)
+            logger.info("Wrote %s", os.path.join(config.output_dir, SITEMAP_FILENAME))
+        generated.add("sitemap")
+
+        section = config.feed_section
+        section_index = f"{section}/index.md"
+        feed_entries = [entry for entry in page_index.entries(section) if entry["source"] != section_index]
+        if section and feed_entries:
+            feed_rel = f"{section}/{FEED_FILENAME}"
+            feed_title = config.feed_title or page_index.pages.get(section_index, {}).get("title", section)
+            digest = inputs_digest(site_url, config.basepath, feed_title, feed_entries)
+            if not manifest.is_generated_fresh("feed", digest, config.output_dir):
+                write_atom_feed(
+                    os.path.join(config.output_dir, feed_rel),
+                    feed_entries,
+                    site_url,
+                    config.basepath + feed_rel,
+                    feed_title,
+                )
+                updated += [feed_rel] + manifest.record_generated("feed", digest, [feed_rel], config.output_dir)
+                logger.info("Wrote %s", os.path.join(config.output_dir, feed_rel))
+            generated.add("feed")
+
+    updated += manifest.remove_stale_generated(generated, config.output_dir)
+    return updated
+
+
+def write_search_index(
+    config: BuildConfig, page_index: PageIndex, search_terms: dict[str, dict[str, int]] | None = None
+) -> list[str]:
+    """
+    Updates the client-side search index for the listed pages of the page
+    index (drafts are left out) when `config.search_index` is set, and removes
+    it otherwise.
+
+    Args:
+        config: The build configuration.
+        page_index: The site's page metadata index.
+        search_terms: The search terms counted while generating pages, keyed by source path.
+
+    Returns:
+        The index files written, relative to the output directory; empty when
+        the index is removed.
+    """
+    if config.search_index:
+        listed = {source_rel: entry for source_rel, entry in page_index.pages.items() if is_listed(entry)}
+        return update_search_index(config.output_dir, config.state_dir, config.content_dir, listed, search_terms)
+    remove_search_index(config.output_dir, config.state_dir)
+    return []
+
+
+def precompress_site(config: BuildConfig, manifest: BuildManifest) -> dict[str, dict]:
+    """
+    Writes `.gz` sidecars for the changed compressible outputs when
+    `config.gzip` is set, and removes the sidecars of a previous build otherwise.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest; its record of compressed outputs is updated.
+
+    Returns:
+        The output record of `hash_outputs` taken before compressing, which
+        spares hashing the outputs again when recording the deploy changes.
+    """
+    outputs = hash_outputs(config.output_dir, manifest.outputs)
+    if config.gzip:
+        result = precompress_outputs(config.output_dir, outputs, manifest.compressed, config.gzip_min_size)
+    else:
+        result = precompress_outputs(config.output_dir, {}, manifest.compressed)
+    manifest.compressed = result.compressed
+    return outputs
+
+
+def record_deploy_changes(config: BuildConfig, manifest: BuildManifest, hashed: dict[str, dict] | None = None) -> None:
+    """
+    Compares the output directory with the one recorded in the manifest and
+    writes the added, changed and removed paths to the deploy changes file.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest; its output record is updated.
+        hashed: An output record from earlier in this build, whose hashes are
+                reused for the files that did not change since.
+    """
+    outputs = hash_outputs(config.output_dir, {**manifest.outputs, **(hashed or {})})
+    changes = diff_outputs(manifest.outputs, outputs)
+    manifest.outputs = outputs
+    changes_path = config.deploy_changes_path or os.path.join(config.state_dir, DEPLOY_CHANGES_FILENAME)
+    write_deploy_changes(changes_path, changes)
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+from typing import NamedTuple
+
+from src.manifest import MANIFEST_FILENAME, file_hash
+from src.page_index import PAGE_INDEX_FILENAME
+from src.search_index import SEARCH_STATE_FILENAME
+
+logger = logging.getLogger(__name__)
+
+DEPLOY_CHANGES_FILENAME = ".deploy-changes.json"
+
+# Build state files, which are not part of the site should the state directory
+# be the output directory itself.
+_IGNORED_OUTPUTS = (MANIFEST_FILENAME, DEPLOY_CHANGES_FILENAME, PAGE_INDEX_FILENAME, SEARCH_STATE_FILENAME)
+
+
+def _same_contents(path: str, other_path: str, chunk_size: int = 1 << 16) -> bool:
+    # Compares the bytes every time: filecmp.cmp caches its results by size and
+    # mtime, which a rewritten file can keep on filesystems with coarse mtimes.
+    if os.path.getsize(path) != os.path.getsize(other_path):
+        return False
+    with open(path, "rb") as file, open(other_path, "rb") as other_file:
+        while True:
+            chunk = file.read(chunk_size)
+            if chunk != other_file.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+
+def replace_if_changed(tmp_path: str, dest_path: str) -> bool:
+    """
+    Moves a freshly written temporary file over `dest_path`, unless the
+    destination already has the same contents.
+
+    Leaving an identical file alone keeps its mtime, so rsync and CDN upload
+    tools do not transfer it again.
+
+    Args:
+        tmp_path: The complete temporary file.
+        dest_path: The file it replaces.
+
+    Returns:
+        True if `dest_path` was written, False if it was already up to date
+        (the temporary file is then removed).
+    """
+    if os.path.isfile(dest_path) and _same_contents(tmp_path, dest_path):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, dest_path)
+    return True
+
+
+class OutputChanges(NamedTuple):
+    """
+    The output files a build added, changed and removed, as paths relative to
+    the output directory mapped to their content hashes (the previous hash for
+    removed files).
+    """
+
+    added: dict[str, str]
+    changed: dict[str, str]
+    removed: dict[str, str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def hash_outputs(output_dir: str, previous: dict[str, dict] | None = None) -> dict[str, dict]:
+    """
+    Records the size, mtime and content hash of every file in the output directory.
+
+    Files whose size and mtime match their `previous` record keep its hash
+    instead of being read again.
+
+    Args:
+        output_dir: The build output directory.
+        previous: The record returned for the previous build.
+
+    Returns:
+        A mapping of paths relative to `output_dir` (with '/' separators) to
+        their size, mtime and hash.
+    """
+    previous = previous or {}
+    outputs = {}
+    for root, _, files in os.walk(output_dir):
+        for file in files:
+            path = os.path.join(root, file)
+            rel_path = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            if rel_path in _IGNORED_OUTPUTS or file.endswith(".tmp"):
+                continue
+            stat = os.stat(path)
+            entry = previous.get(rel_path)
+            if entry is None or entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_hash(path)}
+            outputs[rel_path] = entry
+    return outputs
+
+
+def diff_outputs(previous: dict[str, dict], current: dict[str, dict]) -> OutputChanges:
+    """
+    Compares two output records returned by `hash_outputs`.
+
+    Returns:
+        The OutputChanges from `previous` to `current`.
+    """
+    changes = OutputChanges({}, {}, {})
+    for rel_path, entry in current.items():
+        old_entry = previous.get(rel_path)
+        if old_entry is None:
+            changes.added[rel_path] = entry["hash"]
+        elif old_entry["hash"] != entry["hash"]:
+            changes.changed[rel_path] = entry["hash"]
+    for rel_path in previous.keys() - current.keys():
+        changes.removed[rel_path] = previous[rel_path]["hash"]
+    return changes
+
+
+def write_deploy_changes(path: str, changes: OutputChanges) -> None:
+    """
+    Writes the output changes of a build as JSON, for deploy tooling (e.g. to
+    upload and invalidate only the changed paths in a CDN).
+
+    Args:
+        path: The file to write.
+        changes: The changes to record.
+    """
+    data = {
+        "added": dict(sorted(changes.added.items())),
+        "changed": dict(sorted(changes.changed.items())),
+        "removed": dict(sorted(changes.removed.items())),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as changes_file:
+        json.dump(data, changes_file, indent=1)
+    os.replace(tmp_path, path)
+    logger.info(
+        "Wrote deploy changes to %s: %d added, %d changed, %d removed.",
+        path,
+        len(changes.added),
+        len(changes.changed),
+        len(changes.removed),
+    )
@@ -0,0 +1,350 @@
+"""
+A small asyncio HTTP server for local development.
+
+Responses come from a `resolve` callable, so pages can be rendered on request
+from memory instead of being read from a build on disk (see `DevSite`). HTML
+responses get a script that listens on a Server-Sent Events stream
+(`/__reload`); calling `DevServer.reload` pushes an event down every open
+stream and the browsers reload the page.
+"""
+
+import asyncio
+import io
+import logging
+import mimetypes
+import os
+import threading
+import urllib.parse
+from collections.abc import Callable
+from typing import NamedTuple
+
+from src.build import BuildConfig, site_settings
+from src.header import build_nav_bar, nav_section
+from src.pages import generate_page, list_content_directories, make_page
+from src.template import PageTemplate
+from src.watch import DirectoryWatcher
+
+logger = logging.getLogger(__name__)
+
+RELOAD_PATH = "/__reload"
+RELOAD_SCRIPT = (
+    f'<script>new EventSource("{RELOAD_PATH}").addEventListener("reload", () => location.reload());</script>'
+).encode("utf-8")
+# Sent on idle event streams so dropped connections are noticed.
+KEEPALIVE_INTERVAL = 15.0
+MAX_HEADER_BYTES = 16 * 1024
+# How often --serve polls the source directories, in seconds.
+SERVE_INTERVAL = 0.05
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class Response(NamedTuple):
+    """
+    The body of a resolved path and its content type.
+    """
+
+    body: bytes
+    content_type: str
+
+
+def inject_reload_script(html: bytes) -> bytes:
+    """
+    Inserts the reload script before `</body>`, or appends it when the page has none.
+    """
+    index = html.rfind(b"</body>")
+    if index == -1:
+        return html + RELOAD_SCRIPT
+    return html[:index] + RELOAD_SCRIPT + html[index:]
+
+
+class DevServer:
+    """
+    Serves the responses of `resolve` and pushes reload events to browsers.
+    """
+
+    def __init__(self, resolve: Callable[[str], Response | None], host: str = "127.0.0.1", port: int = 8000):
+        """
+        Args:
+            resolve: Returns the response for a URL path (percent-decoded, without
+                     the query string), or None when nothing is served there. It is
+                     called on a worker thread, so rendering does not stall the
+                     event streams.
+            host: The address to listen on.
+            port: The port to listen on; 0 picks a free port.
+        """
+        self.resolve = resolve
+        self.host = host
+        self.port = port
+        self.clients: set[asyncio.Queue] = set()
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """
+        Starts listening. The bound port is stored in `port`.
+        """
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info("Serving on http://%s:%d/ (Ctrl+C to stop)", self.host, self.port)
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            for queue in self.clients:
+                queue.put_nowait(None)
+            await self.server.wait_closed()
+
+    def reload(self) -> None:
+        """
+        Tells every connected browser to reload. Must be called on the event loop.
+        """
+        if self.clients:
+            logger.info("Reloading %d browser(s)", len(self.clients))
+        for queue in self.clients:
+            queue.put_nowait("reload")
+
+    async def watch(self, poll: Callable[[], bool], interval: float) -> None:
+        """
+        Calls `poll` every `interval` seconds on a worker thread and reloads the
+        browsers whenever it returns True.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                changed = await loop.run_in_executor(None, poll)
+            except Exception as e:
+                logger.exception("Error checking for changes: %s", e)
+                continue
+            if changed:
+                self.reload()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+            parts = request_line.split()
+            if len(parts) != 3:
+                await self.respond(writer, 400, b"Bad request\n")
+                return
+            method, target, _ = parts
+            if method not in ("GET", "HEAD"):
+                await self.respond(writer, 405, b"Method not allowed\n")
+                return
+
+            path = urllib.parse.unquote(urllib.parse.urlsplit(target).path)
+            if path == RELOAD_PATH:
+                await self.stream_events(writer)
+                return
+
+            try:
+                response = await asyncio.get_running_loop().run_in_executor(None, self.resolve, path)
+            except Exception as e:
+                logger.exception("Error serving %s: %s", path, e)
+                await self.respond(writer, 500, f"Error serving {path}: {e}\n".encode("utf-8"))
+                return
+            if response is None:
+                await self.respond(writer, 404, b"Not found\n")
+                return
+
+            body = response.body
+            if response.content_type.startswith("text/html"):
+                body = inject_reload_script(body)
+            await self.respond(writer, 200, body, response.content_type, head_only=method == "HEAD")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        content_type: str = "text/plain; charset=utf-8",
+        head_only: bool = False,
+    ) -> None:
+        headers = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Cache-Control: no-store\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(headers.encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+    async def stream_events(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-store\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+            b"retry: 500\n\n"
+        )
+        await writer.drain()
+        queue = asyncio.Queue()
+        self.clients.add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    if event is None:
+                        return
+                    writer.write(f"event: {event}\ndata: {event}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self.clients.discard(queue)
+
+
+async def serve(server: DevServer, poll: Callable[[], bool], interval: float) -> None:
+    """
+    Runs `server` and reloads its browsers on changes until cancelled.
+
+    Args:
+        server: The server to run.
+        poll: Checks for changes, returning True when browsers should reload.
+        interval: How often `poll` is called, in seconds.
+    """
+    await server.start()
+    try:
+        await server.watch(poll, interval)
+    finally:
+        await server.close()
+
+
+class DevSite:
+    """
+    Renders the pages of a site on request and keeps them in memory, for the
+    development server; nothing is written to the output directory.
+
+    A page is rendered again when its source changed since the cached copy
+    was rendered. A change to the build-wide settings (e.g. the template, which
+    lives in the content directory) drops every cached page. Static files are
+    served straight from the static directory.
+    """
+
+    def __init__(self, config: BuildConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.content_watcher = DirectoryWatcher(config.content_dir)
+        self.static_watcher = DirectoryWatcher(config.static_dir)
+        self.load_settings()
+
+    def load_settings(self) -> None:
+        """
+        Compiles the template and navbar and empties the page cache.
+        """
+        config = self.config
+        self.settings = site_settings(config)
+        self.template = PageTemplate.load(config.template_path, config.basepath, config.minify)
+        self.content_directories = list_content_directories(config.content_dir)
+        self.nav_bar = build_nav_bar(tuple(self.content_directories)) if config.generate_navbar else None
+        # Source path (relative to the content directory) -> (source mtime, page HTML).
+        self.pages: dict[str, tuple[int, bytes]] = {}
+
+    def poll(self) -> bool:
+        """
+        Checks the content and static directories for changes.
+
+        Returns:
+            True if anything changed, so the browsers should reload.
+        """
+        content_changes = self.content_watcher.poll()
+        static_changes = self.static_watcher.poll()
+        if not (content_changes or static_changes):
+            return False
+        with self.lock:
+            if site_settings(self.config) != self.settings:
+                logger.info("Template or content directories changed, dropping every rendered page.")
+                self.load_settings()
+            for source_rel in content_changes.removed:
+                self.pages.pop(source_rel, None)
+        return True
+
+    def resolve(self, path: str) -> Response | None:
+        """
+        Returns the page or static file served at a URL path, or None.
+        """
+        basepath = self.config.basepath
+        if not (path + "/").startswith(basepath):
+            return None
+        rel_path = path[len(basepath) :]
+        if not rel_path or rel_path.endswith("/"):
+            rel_path += "index.html"
+        rel_path = os.path.normpath(rel_path)
+        if rel_path.startswith("..") or os.path.isabs(rel_path):
+            return None
+
+        root, ext = os.path.splitext(rel_path)
+        if ext == ".html":
+            return self.render(root + ".md")
+        static_path = os.path.join(self.config.static_dir, rel_path)
+        if os.path.isfile(static_path):
+            with open(static_path, "rb") as static_file:
+                body = static_file.read()
+            return Response(body, mimetypes.guess_type(static_path)[0] or "application/octet-stream")
+        if not ext:
+            # Pages are linked without their trailing "/", e.g. "/contact".
+            return self.render(os.path.join(rel_path, "index.md"))
+        return None
+
+    def render(self, source_rel: str) -> Response | None:
+        """
+        Returns a page from the cache, rendering it first when its source is
+        newer than the cached copy.
+        """
+        source_path = os.path.join(self.config.content_dir, source_rel)
+        try:
+            mtime_ns = os.stat(source_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self.lock:
+            cached = self.pages.get(source_rel)
+            if cached is None or cached[0] != mtime_ns:
+                page_html = io.StringIO()
+                page_info = generate_page(
+                    source_path,
+                    self.config.template_path,
+                    make_page(self.config.content_dir, self.config.output_dir, source_rel).output_path,
+                    self.config.basepath,
+                    self.content_directories,
+                    self.config.generate_navbar,
+                    template=self.template,
+                    nav_bar=self.nav_bar,
+                    nav_active=nav_section(source_rel) if self.config.mark_active_nav else None,
+                    out=page_html,
+                )
+                if not page_info:
+                    return None
+                cached = (mtime_ns, page_html.getvalue().encode("utf-8"))
+                self.pages[source_rel] = cached
+        return Response(cached[1], "text/html; charset=utf-8")
+
+
+def serve_site(config: BuildConfig, host: str, port: int, interval: float = SERVE_INTERVAL) -> None:
+    """
+    Serves the site from memory with the development server, reloading the
+    browsers whenever the content or static directories change, until interrupted.
+
+    Args:
+        config: The build configuration.
+        host: The address to listen on.
+        port: The port to listen on.
+        interval: The polling interval in seconds.
+    """
+    site = DevSite(config)
+    server = DevServer(site.resolve, host, port)
+    try:
+        asyncio.run(serve(server, site.poll, interval))
+    except KeyboardInterrupt:
+        logger.info("Stopped serving.")
@@ -0,0 +1,179 @@
+import datetime
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from typing import TextIO
+from xml.sax.saxutils import escape as escape_text
+
+SITEMAP_FILENAME = "sitemap.xml"
+FEED_FILENAME = "atom.xml"
+
+# The sitemap protocol allows at most this many URLs per sitemap file; larger
+# sites get a sitemap index pointing at numbered sitemaps.
+SITEMAP_URL_LIMIT = 50_000
+FEED_ENTRY_LIMIT = 20
+
+_DATE_KEYS = ("updated", "date")
+
+
+def escape(text: str) -> str:
+    """
+    Escapes text for XML element content and double-quoted attribute values.
+    """
+    return escape_text(text, {'"': "&quot;"})
+
+
+def entry_datetime(entry: dict) -> datetime.datetime:
+    """
+    Returns when a page was last updated: the `updated` or `date` of its front
+    matter when it is an ISO date, else the mtime of its source.
+
+    Args:
+        entry: A page index entry.
+
+    Returns:
+        A timezone-aware datetime in UTC.
+    """
+    front_matter = entry.get("front_matter") or {}
+    for key in _DATE_KEYS:
+        value = front_matter.get(key)
+        if isinstance(value, str):
+            try:
+                parsed = datetime.datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+    return datetime.datetime.fromtimestamp(entry["mtime_ns"] / 1e9, datetime.timezone.utc)
+
+
+def is_listed(entry: dict) -> bool:
+    """
+    Returns whether a page belongs in the sitemap and feeds; drafts do not.
+    """
+    return not (entry.get("front_matter") or {}).get("draft", False)
+
+
+def inputs_digest(*inputs) -> str:
+    """
+    Returns a digest of JSON-serializable inputs, used to tell whether a
+    generated file needs to be written again.
+    """
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _write_atomically(path: str, write) -> None:
+    tmp_path = path + ".tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            write(out)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_urlset(out: TextIO, entries: Iterable[dict], site_url: str) -> None:
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for entry in entries:
+        out.write(f"<url><loc>{escape(site_url + entry['url'])}</loc>")
+        out.write(f"<lastmod>{entry_datetime(entry).date().isoformat()}</lastmod></url>\n")
+    out.write("</urlset>\n")
+
+
+def write_sitemap(output_dir: str, entries: list[dict], site_url: str, basepath: str = "/") -> list[str]:
+    """
+    Writes `sitemap.xml` for the pages, streaming one URL at a time.
+
+    Above SITEMAP_URL_LIMIT pages, `sitemap.xml` is a sitemap index of
+    `sitemap-<n>.xml` files.
+
+    Args:
+        output_dir: The build output directory.
+        entries: The page index entries to list.
+        site_url: The scheme and host the site is served from, without a trailing '/'.
+        basepath: The base URL path of the site, ending with '/'.
+
+    Returns:
+        The written paths, relative to `output_dir`.
+    """
+    entries = [entry for entry in entries if is_listed(entry)]
+    sitemap_path = os.path.join(output_dir, SITEMAP_FILENAME)
+    if len(entries) <= SITEMAP_URL_LIMIT:
+        _write_atomically(sitemap_path, lambda out: _write_urlset(out, entries, site_url))
+        return [SITEMAP_FILENAME]
+
+    written = []
+    for number, start in enumerate(range(0, len(entries), SITEMAP_URL_LIMIT), start=1):
+        chunk = entries[start : start + SITEMAP_URL_LIMIT]
+        filename = f"sitemap-{number}.xml"
+        _write_atomically(os.path.join(output_dir, filename), lambda out: _write_urlset(out, chunk, site_url))
+        written.append(filename)
+
+    def write_index(out: TextIO) -> None:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for filename in written:
+            out.write(f"<sitemap><loc>{escape(f'{site_url}{basepath}{filename}')}</loc></sitemap>\n")
+        out.write("</sitemapindex>\n")
+
+    _write_atomically(sitemap_path, write_index)
+    return [SITEMAP_FILENAME] + written
+
+
+def write_atom_feed(
+    path: str,
+    entries: list[dict],
+    site_url: str,
+    feed_url: str,
+    title: str,
+    author: str | None = None,
+    limit: int = FEED_ENTRY_LIMIT,
+) -> None:
+    """
+    Writes an Atom feed of the most recently updated pages, streaming one entry at a time.
+
+    Args:
+        path: The feed file to write.
+        entries: The page index entries of the feed's section.
+        site_url: The scheme and host the site is served from, without a trailing '/'.
+        feed_url: The URL path of the feed itself.
+        title: The feed title.
+        author: The feed author, defaulting to the title. A page's `author` front
+                matter overrides it for that entry.
+        limit: The maximum number of entries.
+    """
+    dated = sorted(
+        ((entry_datetime(entry), entry) for entry in entries if is_listed(entry)),
+        key=lambda item: (item[0], item[1]["url"]),
+        reverse=True,
+    )[:limit]
+    updated = dated[0][0] if dated else datetime.datetime.fromtimestamp(0, datetime.timezone.utc)
+
+    def write(out: TextIO) -> None:
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        out.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        out.write(f"<title>{escape(title)}</title>\n")
+        out.write(f'<link rel="self" href="{escape(site_url + feed_url)}"/>\n')
+        out.write(f"<id>{escape(site_url + feed_url)}</id>\n")
+        out.write(f"<updated>{updated.isoformat()}</updated>\n")
+        out.write(f"<author><name>{escape(author or title)}</name></author>\n")
+        for entry_updated, entry in dated:
+            url = escape(site_url + entry["url"])
+            out.write("<entry>")
+            out.write(f"<title>{escape(entry['title'])}</title>")
+            out.write(f'<link href="{url}"/><id>{url}</id>')
+            out.write(f"<updated>{entry_updated.isoformat()}</updated>")
+            entry_author = (entry.get("front_matter") or {}).get("author")
+            if entry_author:
+                out.write(f"<author><name>{escape(str(entry_author))}</name></author>")
+            summary = (entry.get("front_matter") or {}).get("summary")
+            if summary:
+                out.write(f"<summary>{escape(str(summary))}</summary>")
+            out.write("</entry>\n")
+        out.write("</feed>\n")
+
+    _write_atomically(path, write)
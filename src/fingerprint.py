@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+from typing import NamedTuple
+
+from src.deploy import replace_if_changed
+from src.manifest import file_hash
+from src.static_sync import copy_asset
+
+logger = logging.getLogger(__name__)
+
+ASSET_MAP_FILENAME = "asset-map.json"
+FINGERPRINT_LENGTH = 8
+FINGERPRINTED_EXTENSIONS = frozenset(
+    {".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico", ".woff", ".woff2", ".ttf", ".otf"}
+)
+
+
+class FingerprintResult(NamedTuple):
+    """
+    The outcome of a fingerprinting pass: the record of fingerprinted assets to
+    store for the next build (static path mapped to its size, mtime, content
+    hash and fingerprinted path), and the fingerprinted paths per action.
+    """
+
+    assets: dict[str, dict]
+    written: list[str]
+    skipped: list[str]
+    removed: list[str]
+
+
+def fingerprint_name(rel_path: str, digest: str) -> str:
+    """
+    Returns the fingerprinted name of an asset, e.g. `style.3f9a1c0b.css`.
+
+    Args:
+        rel_path: The asset path relative to the static directory.
+        digest: The hex digest of the asset's contents.
+    """
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def is_fingerprinted(rel_path: str) -> bool:
+    return os.path.splitext(rel_path)[1].lower() in FINGERPRINTED_EXTENSIONS
+
+
+def build_asset_map(assets: dict[str, dict]) -> dict[str, str]:
+    """
+    Returns the URL path of each fingerprinted asset mapped to the URL path of
+    its fingerprinted copy, both relative to the site root.
+
+    Args:
+        assets: The `assets` record of a fingerprinting pass.
+    """
+    return {
+        rel_path.replace(os.sep, "/"): entry["fingerprinted"].replace(os.sep, "/")
+        for rel_path, entry in sorted(assets.items())
+    }
+
+
+def fingerprint_assets(
+    static_dir: str,
+    output_dir: str,
+    synced: dict[str, dict],
+    previous: dict[str, dict] | None = None,
+    hardlink: bool = False,
+) -> FingerprintResult:
+    """
+    Copies the synced static assets to content-hashed names next to their
+    originals and writes the asset map, so they can be served with immutable
+    cache headers.
+
+    The name depends only on the contents, so an unchanged asset keeps its
+    name across builds. Its hash is reused from `previous` while its size and
+    mtime are unchanged. The originals are kept, so references the pages do
+    not rewrite (e.g. `url()` in stylesheets) still resolve. Fingerprinted
+    copies of assets that changed or were removed are deleted.
+
+    Args:
+        static_dir: The static assets directory.
+        output_dir: The build output directory.
+        synced: The `synced` record of the static sync; passing an empty record
+                removes every fingerprinted copy.
+        previous: The `assets` record of the previous pass.
+        hardlink: Hardlink the fingerprinted copies to their sources instead of copying them.
+
+    Returns:
+        The FingerprintResult.
+    """
+    previous = previous or {}
+    assets, written, skipped = {}, [], []
+    for rel_path, record in sorted(synced.items()):
+        if not is_fingerprinted(rel_path):
+            continue
+        source = os.path.join(static_dir, rel_path)
+        entry = previous.get(rel_path)
+        if entry and entry["size"] == record["size"] and entry["mtime_ns"] == record["mtime_ns"]:
+            digest = entry["hash"]
+        else:
+            digest = file_hash(source)
+        fingerprinted = fingerprint_name(rel_path, digest)
+        destination = os.path.join(output_dir, fingerprinted)
+        if entry and entry["fingerprinted"] == fingerprinted and os.path.exists(destination):
+            skipped.append(fingerprinted)
+        else:
+            copy_asset(source, destination, hardlink)
+            written.append(fingerprinted)
+        assets[rel_path] = {**record, "hash": digest, "fingerprinted": fingerprinted}
+
+    removed = []
+    current = {entry["fingerprinted"] for entry in assets.values()}
+    for entry in previous.values():
+        if entry["fingerprinted"] in current:
+            continue
+        try:
+            os.remove(os.path.join(output_dir, entry["fingerprinted"]))
+            removed.append(entry["fingerprinted"])
+        except FileNotFoundError:
+            pass
+
+    write_asset_map(output_dir, build_asset_map(assets))
+    logger.info("Asset fingerprinting: %d written, %d unchanged, %d removed.", len(written), len(skipped), len(removed))
+    return FingerprintResult(assets, written, skipped, removed)
+
+
+def write_asset_map(output_dir: str, mapping: dict[str, str]) -> None:
+    """
+    Writes the asset map to `asset-map.json` in the output directory, leaving
+    an unchanged file untouched. An empty map removes the file.
+    """
+    path = os.path.join(output_dir, ASSET_MAP_FILENAME)
+    if not mapping:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as map_file:
+        json.dump(mapping, map_file, indent=1, sort_keys=True)
+    replace_if_changed(tmp_path, path)
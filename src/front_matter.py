@@ -0,0 +1,133 @@
+import logging
+import re
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+FRONT_MATTER_DELIMITER = "---"
+_CLOSING_DELIMITERS = ("---", "...")
+
+# A header that is not closed within this many lines is not front matter.
+MAX_FRONT_MATTER_LINES = 100
+
+_KEY_PATTERN = re.compile(r"^([A-Za-z_][\w-]*)\s*:(.*)$")
+_INT_PATTERN = re.compile(r"^[+-]?\d+$")
+_LEADING_BLANK_LINES = re.compile(r"(?:[ \t]*\r?\n)*")
+
+
+def parse_value(value: str):
+    """
+    Parses a front-matter value: a quoted string, a `[a, b]` list, a boolean,
+    an integer or a plain string.
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in value[1:-1].split(",") if item.strip()]
+    if value.lower() in ("true", "yes"):
+        return True
+    if value.lower() in ("false", "no"):
+        return False
+    if _INT_PATTERN.match(value):
+        return int(value)
+    return value
+
+
+def parse_front_matter_lines(lines: list[str]) -> dict:
+    """
+    Parses the `key: value` lines between the front-matter delimiters.
+
+    A key without a value followed by `- item` lines holds a list of the items.
+    Blank lines and `#` comments are ignored.
+
+    Args:
+        lines: The header lines, without the delimiters.
+
+    Returns:
+        The metadata.
+    """
+    metadata = {}
+    list_key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if list_key is not None and stripped.startswith("- "):
+            metadata[list_key].append(parse_value(stripped[2:]))
+            continue
+
+        match = _KEY_PATTERN.match(stripped)
+        if match is None:
+            logger.warning("Ignoring malformed front-matter line: %r", line)
+            list_key = None
+            continue
+        key, value = match.group(1), match.group(2)
+        if value.strip():
+            metadata[key] = parse_value(value)
+            list_key = None
+        else:
+            metadata[key] = []
+            list_key = key
+    return metadata
+
+
+def read_header(lines: Iterator[str]) -> tuple[dict | None, list[str]]:
+    """
+    Reads the front matter at the start of a markdown file, consuming only the
+    header lines.
+
+    Args:
+        lines: The file's lines with their line endings, positioned at the start,
+               e.g. an open text file.
+
+    Returns:
+        The metadata and the lines to put back in front of the remaining ones.
+        Without front matter the metadata is None and the lines consumed while
+        looking for it are returned.
+    """
+    first_line = next(lines, "")
+    if first_line.rstrip("\r\n") != FRONT_MATTER_DELIMITER:
+        return None, [first_line] if first_line else []
+
+    header = []
+    for line in lines:
+        if line.rstrip("\r\n") in _CLOSING_DELIMITERS:
+            return parse_front_matter_lines(header), []
+        header.append(line)
+        if len(header) >= MAX_FRONT_MATTER_LINES:
+            break
+    return None, [first_line] + header
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Separates the front matter of a markdown document from its body.
+
+    Args:
+        markdown: The whole document.
+
+    Returns:
+        The metadata (empty without front matter) and the markdown body, with
+        the blank lines following the front matter removed.
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+
+    header_length = 0
+
+    def header_lines():
+        # Yields lines lazily, counting the characters consumed, so the body
+        # is never split into lines.
+        nonlocal header_length
+        while header_length < len(markdown):
+            line_end = markdown.find("\n", header_length) + 1 or len(markdown)
+            line = markdown[header_length:line_end]
+            header_length = line_end
+            yield line
+
+    metadata, _ = read_header(header_lines())
+    if metadata is None:
+        return {}, markdown
+    body_start = _LEADING_BLANK_LINES.match(markdown, header_length).end()
+    return metadata, markdown[body_start:]
@@ -1,6 +1,10 @@
+import functools
+
 from src.htmlnode import ParentNode
 from src.textnode import TextNode, TextType, text_node_to_html_node
 
+ACTIVE_ITEM_PROPS = {"class": "nav-item active", "aria-current": "page"}
+
 
 def generate_nav_bar(dir_names: list[str]) -> ParentNode:
     ordered_list = [
@@ -12,3 +16,71 @@ def generate_nav_bar(dir_names: list[str]) -> ParentNode:
         ordered_list.append(li_node)
 
     return ParentNode("ul", ordered_list, {"class": "menu"})
+
+
+class NavBar:
+    """
+    The navigation bar rendered to HTML once per build.
+
+    Each item is rendered both in its normal and in its active form, so marking
+    the current section on a page only joins the pre-rendered item strings.
+    """
+
+    def __init__(self, dir_names: list[str]):
+        """
+        Renders the navigation bar for the given top-level content directories.
+
+        Args:
+            dir_names: The top-level content directories, in navbar order.
+        """
+        nav_node = generate_nav_bar(dir_names)
+        self.keys = ["", *dir_names]
+        self.items = [item.to_html() for item in nav_node.children]
+        self.active_items = [
+            ParentNode(item.tag, item.children, ACTIVE_ITEM_PROPS).to_html() for item in nav_node.children
+        ]
+        self.opening_tag = f"<{nav_node.tag}{nav_node.props_to_html()}>"
+        self.closing_tag = f"</{nav_node.tag}>"
+        self.html = self.opening_tag + "".join(self.items) + self.closing_tag
+        self._active_html = {}
+
+    def render(self, active: str | None = None) -> str:
+        """
+        Returns the navigation bar HTML, optionally marking one item as active.
+
+        Args:
+            active: The top-level directory of the current page, "" for the Home item,
+                    or None to mark nothing. Unknown sections are not marked.
+
+        Returns:
+            The navigation bar HTML.
+        """
+        if active is None or active not in self.keys:
+            return self.html
+
+        if active not in self._active_html:
+            index = self.keys.index(active)
+            items = self.items[:index] + [self.active_items[index]] + self.items[index + 1 :]
+            self._active_html[active] = self.opening_tag + "".join(items) + self.closing_tag
+        return self._active_html[active]
+
+
+@functools.lru_cache(maxsize=8)
+def build_nav_bar(dir_names: tuple[str, ...]) -> NavBar:
+    """
+    Returns the rendered navigation bar for a list of directories, cached so it
+    is rendered only once per build.
+    """
+    return NavBar(list(dir_names))
+
+
+def nav_section(source_rel: str) -> str:
+    """
+    Returns the navbar key of a page: its top-level content directory, or ""
+    (the Home item) for pages at the root of the content directory.
+
+    Args:
+        source_rel: The page source path relative to the content directory.
+    """
+    parts = source_rel.replace("\\", "/").split("/")
+    return parts[0] if len(parts) > 1 else ""
@@ -1,9 +1,19 @@
+from typing import TextIO
+
+SELF_CLOSING_TAGS = frozenset({"img"})
+
+
 class HTMLNode:
     """
     Represents a node in an HTML tree structure.
     This is the base class for different types of HTML nodes.
+
+    Nodes use `__slots__` instead of a per-instance `__dict__`, since a large
+    page creates tens of thousands of them.
     """
 
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: str | None = None,
@@ -40,6 +50,36 @@ class HTMLNode:
         """
         raise NotImplementedError
 
+    def write_html(self, out: list[str] | TextIO) -> None:
+        """
+        Writes the HTML of this node and its descendants piece by piece.
+
+        The tree is walked with an explicit stack instead of recursion, so deeply
+        nested trees cannot hit the recursion limit, and no intermediate string
+        is built for each subtree.
+
+        Args:
+            out: A list the pieces are appended to, or a text stream such as
+                 `io.StringIO` or an open file the pieces are written to.
+
+        Raises:
+            ValueError: If a node in the tree cannot be rendered (see `to_html`).
+        """
+        write = out.append if isinstance(out, list) else out.write
+        stack: list["HTMLNode | str"] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                # Closing tag of a ParentNode whose children have been written
+                write(item)
+            elif isinstance(item, ParentNode):
+                item.check_renderable()
+                write(f"<{item.tag}{item.props_to_html()}>" if item.props else f"<{item.tag}>")
+                stack.append(f"</{item.tag}>")
+                stack.extend(reversed(item.children))
+            else:
+                write(item.to_html())
+
     def props_to_html(self) -> str:
         """
         Converts the props dictionary into a string of HTML attributes.
@@ -83,6 +123,8 @@ class LeafNode(HTMLNode):
     Inherits from HTMLNode.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str | None = None,
@@ -119,10 +161,9 @@ class LeafNode(HTMLNode):
             return str(self.value)
 
         # Self-closing tags like "img" don't need a value or closing tag
-        self_closing_tags = ["img"]
-        props_string = self.props_to_html()
+        props_string = self.props_to_html() if self.props else ""
 
-        if self.tag in self_closing_tags:
+        if self.tag in SELF_CLOSING_TAGS:
             return f"<{self.tag}{props_string}>"
 
         # Regular tags need a value and closing tag
@@ -138,6 +179,8 @@ class ParentNode(HTMLNode):
     Inherits from HTMLNode.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str | None = None,
@@ -157,13 +200,9 @@ class ParentNode(HTMLNode):
 
         super().__init__(tag=tag, value=None, children=children, props=props)
 
-    def to_html(self):
+    def check_renderable(self) -> None:
         """
-        Converts the ParentNode to its HTML string representation by recursively
-        rendering its children.
-
-        Returns:
-            str: The HTML string for the parent node and its children.
+        Checks that the ParentNode itself can be rendered.
 
         Raises:
             ValueError: If the ParentNode is initialized without a tag or children.
@@ -175,14 +214,17 @@ class ParentNode(HTMLNode):
         if not self.children or not isinstance(self.children, list) or len(self.children) == 0:
             raise ValueError("ParentNode requires children (a list of HTMLNode objects) to render HTML")
 
-        props_string = self.props_to_html()
-        opening_tag = f"<{self.tag}{props_string}>"
-
-        children_string = ""
-        # Recursively render children
-        for child in self.children:
-            children_string += child.to_html()
+    def to_html(self):
+        """
+        Converts the ParentNode to its HTML string representation, rendering
+        its children with `write_html` and joining the pieces once.
 
-        closing_tag = f"</{self.tag}>"
+        Returns:
+            str: The HTML string for the parent node and its children.
 
-        return f"{opening_tag}{children_string}{closing_tag}"
+        Raises:
+            ValueError: If the ParentNode (or a descendant) cannot be rendered.
+        """
+        parts = []
+        self.write_html(parts)
+        return "".join(parts)
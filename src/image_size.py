@@ -0,0 +1,163 @@
+import logging
+import os
+import struct
+from typing import BinaryIO
+
+from src.manifest import file_hash
+
+logger = logging.getLogger(__name__)
+
+PROBED_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp"})
+
+# JPEG start-of-frame markers, which carry the image size; 0xC4, 0xC8 and
+# 0xCC share the range but are not frames.
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers without a length field.
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+def _png_size(header: bytes) -> tuple[int, int] | None:
+    if header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _gif_size(header: bytes) -> tuple[int, int]:
+    return struct.unpack("<HH", header[6:10])
+
+
+def _webp_size(header: bytes) -> tuple[int, int] | None:
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20:21] == b"\x2f":
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+    return None
+
+
+def _jpeg_size(image_file: BinaryIO) -> tuple[int, int] | None:
+    # Walk the segments after the SOI marker up to the first frame header,
+    # seeking over segment payloads (e.g. EXIF thumbnails) instead of reading them.
+    image_file.seek(2)
+    while True:
+        byte = image_file.read(1)
+        while byte == b"\xff":
+            byte = image_file.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        length_bytes = image_file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in _JPEG_SOF_MARKERS:
+            frame = image_file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        if marker == 0xDA or length < 2:
+            # Start of scan (entropy-coded data follows) or a corrupt segment.
+            return None
+        image_file.seek(length - 2, os.SEEK_CUR)
+
+
+def probe_image_size(path: str) -> tuple[int, int] | None:
+    """
+    Reads the width and height of a PNG, JPEG, GIF or WebP image from its
+    header, without decoding the pixels.
+
+    Args:
+        path: The image file.
+
+    Returns:
+        The (width, height) in pixels, or None if the file is not a supported
+        image or its header is malformed.
+    """
+    with open(path, "rb") as image_file:
+        header = image_file.read(32)
+        if header.startswith(b"\x89PNG\r\n\x1a\n"):
+            size = _png_size(header)
+        elif header[:6] in (b"GIF87a", b"GIF89a"):
+            size = _gif_size(header)
+        elif header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            size = _webp_size(header)
+        elif header[:2] == b"\xff\xd8":
+            size = _jpeg_size(image_file)
+        else:
+            size = None
+    if size is None or not all(size):
+        return None
+    return size
+
+
+def probe_static_images(
+    static_dir: str, synced: dict[str, dict], previous: dict[str, dict] | None = None
+) -> dict[str, dict]:
+    """
+    Finds the dimensions of the images among the synced static files.
+
+    Dimensions are cached by content hash: an image is only probed when no
+    image with the same contents was probed by a previous build, and only
+    hashed when its size or mtime changed since then.
+
+    Args:
+        static_dir: The static assets directory.
+        synced: The `synced` record of the static sync; passing an empty record
+                drops every image.
+        previous: The record returned by the previous call.
+
+    Returns:
+        Each image path (relative to the static directory) mapped to its size,
+        mtime, content hash, width and height; the width and height are None
+        for images whose header could not be read.
+    """
+    previous = previous or {}
+    probed_by_hash = {entry["hash"]: entry for entry in previous.values()}
+    images, probed = {}, 0
+    for rel_path, record in sorted(synced.items()):
+        if os.path.splitext(rel_path)[1].lower() not in PROBED_EXTENSIONS:
+            continue
+        entry = previous.get(rel_path)
+        if entry and entry["size"] == record["size"] and entry["mtime_ns"] == record["mtime_ns"]:
+            images[rel_path] = entry
+            continue
+
+        source = os.path.join(static_dir, rel_path)
+        digest = file_hash(source)
+        cached = probed_by_hash.get(digest)
+        if cached:
+            width, height = cached["width"], cached["height"]
+        else:
+            size = probe_image_size(source)
+            probed += 1
+            if size is None:
+                # Recorded all the same, so the file is not probed again until it changes.
+                logger.warning("Could not read the dimensions of image %s", source)
+            width, height = size or (None, None)
+        images[rel_path] = {**record, "hash": digest, "width": width, "height": height}
+        probed_by_hash[digest] = images[rel_path]
+
+    logger.info("Image dimensions: %d images, %d probed.", len(images), probed)
+    return images
+
+
+def image_size_map(images: dict[str, dict]) -> dict[str, tuple[int, int]]:
+    """
+    Returns the URL path of each image, relative to the site root, mapped to
+    its (width, height).
+
+    Args:
+        images: The record returned by `probe_static_images`.
+    """
+    return {
+        rel_path.replace(os.sep, "/"): (entry["width"], entry["height"])
+        for rel_path, entry in sorted(images.items())
+        if entry["width"]
+    }
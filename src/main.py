@@ -1,169 +1,19 @@
 import argparse
 import logging
 import os
-import shutil
-import sys
 
-from src.header import generate_nav_bar
-from src.markdown_parser import BlockType, block_to_block_type, format_heading, markdown_to_html_node
+from src.build import BuildConfig, build_site
+from src.deploy import DEPLOY_CHANGES_FILENAME
+from src.dev_server import SERVE_INTERVAL, serve_site
+from src.manifest import STATE_DIRNAME
+from src.parse_cache import CACHE_DIRNAME, DEFAULT_MAX_BYTES
+from src.precompress import DEFAULT_MIN_SIZE
+from src.tracing import tracer
+from src.watch import WATCH_INTERVAL, watch_site
 
 logger = logging.getLogger(__name__)
 
 
-def extract_title(first_line: str) -> str:
-    """
-    Extracts the title from the first line of markdown content.
-    Assumes the title is the first block and must be a heading (h1-h6).
-
-    Args:
-        first_line: The string representing the first line of the markdown content.
-
-    Returns:
-        The extracted title string without markdown formatting.
-
-    Raises:
-        Exception: If the first line is not a valid heading block.
-    """
-    first_block_type = block_to_block_type(first_line)
-
-    if first_block_type is BlockType.HEADING:
-        heading_html_node = format_heading(first_line)
-        title_text_parts = []
-        for child_node in heading_html_node.children:
-            if child_node.value is not None:
-                title_text_parts.append(child_node.value)
-
-        file_title = "".join(title_text_parts)
-
-        return file_title.strip()
-
-    raise Exception("The file does not contain a title heading (first line must be # ...)")
-
-
-def generate_page(
-    from_path: str, template_path: str, dest_path: str, basepath, content_directories: list[str], generate_navbar: bool
-) -> None:
-    """
-    Generates a static HTML page from a markdown file using an HTML template.
-
-    Reads markdown content from the `from_path`, extracts the title from the
-    first line (assuming it's a heading), converts the markdown content to HTML
-    nodes, and then renders the HTML content into a template read from
-    `template_path`. The resulting populated HTML is written to the `dest_path`.
-
-    Args:
-        from_path (str): The full path to the source markdown file.
-        template_path (str): The full path to the HTML template file.
-                             The template is expected to contain '{{ Title }}'
-                             and '{{ Content }}' placeholders.
-        dest_path (str): The full path where the generated HTML file should be written.
-
-    Returns:
-        None: The function writes the output to `dest_path` and does not return a value.
-
-    Raises:
-        FileNotFoundError: If `from_path` or `template_path` do not exist.
-        Exception: If the first line of the markdown file does not contain a title
-                   (as determined by `extract_title`).
-        # Add other potential exceptions from called functions if known and relevant
-        # (e.g., errors from markdown parsing or file writing)
-    """
-
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    logger.info("Generating page from %s to %s using %s", from_path, template_path, dest_path)
-    with open(from_path, "r", encoding="utf-8") as source_file:
-        md_content = source_file.read()
-
-    with open(template_path, "r", encoding="utf-8") as template_file:
-        template_content = template_file.read()
-
-    if not md_content.strip():
-        logger.warning(
-            "Warning: Markdown file %s is empty or contains only whitespace. Skipping page generation.", from_path
-        )
-        return
-
-    try:
-        file_title = extract_title(md_content.splitlines(keepends=True)[0])
-    except Exception as e:
-        logger.exception(
-            "Warning: Could not extract title from %s. Using default or handling failure. Error: %s", from_path, e
-        )
-        file_title = "Untitled Page"
-
-    nav_html = ""
-    if generate_navbar:
-        nav_html = generate_nav_bar(content_directories).to_html()
-
-    html_content = markdown_to_html_node(md_content).to_html()
-    footer_content = ""
-
-    populated_html = (
-        template_content.replace("{{ Title }}", file_title)
-        .replace("{{ nav }}", nav_html)
-        .replace("{{ Content }}", html_content)
-        .replace("{{ Footer }}", footer_content)
-    )
-
-    # **Perform the specified string replacements for base path**
-    populated_html = populated_html.replace('href="/', f'href="{basepath}')
-    populated_html = populated_html.replace('src="/', f'src="{basepath}')
-
-    with open(dest_path, "w", encoding="utf-8") as dest_file:
-        dest_file.write(populated_html)
-
-
-def process_content_directory(content_dir: str, template_path: str, output_dir: str, basepath, generate_navbar: bool):
-    """
-    Processes markdown files in a content directory and generates
-    corresponding HTML pages in an output directory, mirroring the structure.
-
-    Args:
-        content_dir: The path to the source content directory.
-        template_path: The path to the HTML template file.
-        output_dir: The path to the output directory where generated HTML files will be written.
-    """
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    if not os.path.isdir(content_dir):
-        logger.exception("Error: Source is not a directory: %s", content_dir)
-        return
-
-    logger.info("Processing content from %s and generating pages in %s...", content_dir, output_dir)
-
-    content_directories = [name for name in os.listdir(content_dir) if os.path.isdir(os.path.join(content_dir, name))]
-
-    for root, _, files in os.walk(content_dir):
-        relative_dir_path_from_content = os.path.relpath(root, content_dir)
-        current_output_dir = os.path.join(output_dir, relative_dir_path_from_content)
-
-        # Ensure the directory exists in the output path.
-        try:
-            os.makedirs(current_output_dir, exist_ok=True)
-            logger.info("Created directory: %s", current_output_dir)
-        except OSError as e:
-            logger.error("Error ensuring outpu directory %s exists: %s", current_output_dir, e)
-
-        for file in files:
-            source_file_path = os.path.join(root, file)
-
-            if file.endswith(".md"):
-                file_relative_path_from_content = os.path.relpath(source_file_path, content_dir)
-                output_file_basename = os.path.splitext(file_relative_path_from_content)[0] + ".html"
-                output_file_path = os.path.join(output_dir, output_file_basename)
-
-                try:
-                    generate_page(
-                        source_file_path,
-                        template_path,
-                        output_file_path,
-                        basepath,
-                        content_directories,
-                        generate_navbar,
-                    )
-                except Exception as e:
-                    logger.exception("Error generating page from %s: %s", source_file_path, e)
-
-
 def main():
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
@@ -180,11 +30,160 @@ def main():
         action="store_true",
         help="Incluede a navigation bar in the generated pages.",
     )
+    parser.add_argument(
+        "--nav-active",
+        action="store_true",
+        help="Mark the navigation bar item of each page's section as active.",
+    )
     parser.add_argument(
         "--basepath",
         default="/",
         help="Base URL path for the site (e.g., '/repository-name/' for Github Pages)",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep the existing output and only regenerate pages whose inputs changed since the last build.",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Delete the output directory before building instead of syncing it.",
+    )
+    parser.add_argument(
+        "--static-hash",
+        action="store_true",
+        help="Decide whether a static file changed by content hash instead of size and mtime.",
+    )
+    parser.add_argument(
+        "--static-hardlink",
+        action="store_true",
+        help="Hardlink static files into the output directory instead of copying them.",
+    )
+    parser.add_argument(
+        "--deploy-changes",
+        metavar="FILE",
+        help=f"Where to write the JSON list of added, changed and removed outputs "
+        f"(default: {DEPLOY_CHANGES_FILENAME} in the state directory).",
+    )
+    parser.add_argument(
+        "--state-dir",
+        default=os.path.normpath(os.path.join(script_dir, "..", STATE_DIRNAME)),
+        help="Directory of the build manifest and the other records kept between builds, "
+        "outside the published output (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.path.normpath(os.path.join(script_dir, "..", CACHE_DIRNAME)),
+        help="Directory of the parsed-document cache (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every page instead of reusing cached content HTML.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES >> 20,
+        metavar="MB",
+        help="Size limit of the parsed-document cache in megabytes (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="The scheme and host the site is served from, e.g. https://example.com. "
+        "When given, sitemap.xml and an Atom feed are generated.",
+    )
+    parser.add_argument(
+        "--feed-section",
+        default="blog",
+        help="The top-level content directory whose pages make up the Atom feed (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--feed-title",
+        help="The Atom feed title (default: the title of the section's index page).",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="Write a client-side search index, sharded by term prefix, to search/ in the output directory.",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write .gz sidecars at maximum compression for HTML, CSS, JS, XML and JSON outputs.",
+    )
+    parser.add_argument(
+        "--gzip-min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        metavar="BYTES",
+        help="Outputs smaller than this are not precompressed (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Render markdown block by block while reading it, keeping memory bounded for very large files.",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Copy static assets to content-hashed names (e.g. style.3f9a1c0b.css), write asset-map.json "
+        "and point the pages' href and src references at the hashed names.",
+    )
+    parser.add_argument(
+        "--image-dimensions",
+        action="store_true",
+        help="Add width, height, loading=lazy and decoding=async to <img> tags of images under static/, "
+        "read from the PNG, JPEG, GIF or WebP headers.",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Strip comments and insignificant whitespace from the generated HTML.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Render pages across N worker processes (0 uses every CPU core).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After building, watch content/ and static/ and rebuild only what changed.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the site from memory with a development server that renders pages on request "
+        "and reloads the browser when content/ or static/ change. Nothing is written to disk.",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="The address --serve listens on (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=5500,
+        help="The port --serve listens on (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        metavar="SECONDS",
+        help=f"How often --watch and --serve poll for changes "
+        f"(default: {WATCH_INTERVAL} for --watch, {SERVE_INTERVAL} for --serve).",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record per-page, per-stage timings to FILE in Chrome trace-event JSON and print a summary.",
+    )
 
     args = parser.parse_args()
 
@@ -200,34 +199,52 @@ def main():
     else:
         logger.info("Navbar generation is DISABLED.")
 
-    # Clean the public directory before copying
-    if os.path.exists(public_base_dir):
-        logger.info("Cleaning existing public directory: %s", public_base_dir)
-        shutil.rmtree(public_base_dir)
-
-    logger.info("Ensuring public base directory exists: %s", public_base_dir)
-    os.makedirs(public_base_dir)
-
-    # Copy static files to the public directory
-    try:
-        logger.info("Copying static files from %s to %s...", static_base_dir, public_base_dir)
-        shutil.copytree(static_base_dir, public_base_dir, dirs_exist_ok=True)
-        logger.info("Static files copied to public.")
-    except FileNotFoundError:
-        logger.error("Error: Static directory %s not found. Skipping static file copy.", static_base_dir)
-    except Exception as e:
-        logger.exception("An error occurred during static file copy: %s", e)
-
-    # Call process_content_directory to generate pages in public
-    try:
-        process_content_directory(content_base_dir, template_path, public_base_dir, basepath, generate_navbar)
-        logger.info("Content processing and page generation complete.")
-    except FileNotFoundError:
-        logger.error("Error: Content directory %s not found. Skipping page generation.", content_base_dir)
-    except Exception as e:
-        logger.error("An error ocurred during content porcessing: %s", e)
-
-    logger.info("Static site generation complete.")
+    config = BuildConfig(
+        content_dir=content_base_dir,
+        template_path=template_path,
+        static_dir=static_base_dir,
+        output_dir=public_base_dir,
+        basepath=basepath,
+        generate_navbar=generate_navbar,
+        mark_active_nav=args.nav_active,
+        incremental=args.incremental,
+        clean=args.clean,
+        stream=args.stream,
+        minify=args.minify,
+        fingerprint=args.fingerprint,
+        image_dimensions=args.image_dimensions,
+        jobs=args.jobs if args.jobs > 0 else os.cpu_count() or 1,
+        static_hash=args.static_hash,
+        static_hardlink=args.static_hardlink,
+        deploy_changes_path=args.deploy_changes,
+        site_url=args.site_url,
+        feed_section=args.feed_section,
+        feed_title=args.feed_title,
+        search_index=args.search_index,
+        gzip=args.gzip,
+        gzip_min_size=args.gzip_min_size,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_bytes=args.cache_size << 20,
+        state_dir=args.state_dir,
+    )
+
+    if args.serve:
+        serve_site(config, args.host, args.port, args.watch_interval or SERVE_INTERVAL)
+        return
+
+    if args.watch:
+        watch_site(config, args.watch_interval or WATCH_INTERVAL)
+        return
+
+    if args.trace:
+        tracer.enable()
+
+    with tracer.span("build"):
+        build_site(config)
+
+    if args.trace:
+        tracer.write_chrome_trace(args.trace)
+        logger.info("Wrote build trace to %s\n%s", args.trace, tracer.summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,310 @@
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".build-manifest.json"
+MANIFEST_VERSION = 1
+# The directory, next to the output directory, keeping the manifest and the
+# other records a build leaves for the next one, so they are not published.
+STATE_DIRNAME = ".ssg-state"
+
+
+def file_hash(path: str, chunk_size: int = 1 << 16) -> str:
+    """
+    Computes the SHA-256 hex digest of a file's contents, reading it in chunks.
+
+    Args:
+        path: The path of the file to hash.
+        chunk_size: The number of bytes read per chunk.
+
+    Returns:
+        The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Records the inputs each generated page was built from, so an incremental
+    build can skip pages whose inputs have not changed.
+
+    The manifest is stored as JSON in the build state directory. `settings` holds
+    the build-wide inputs (template hash, basepath, navbar inputs); when they
+    differ from the previous build every page is considered stale. `pages` maps
+    each source path (relative to the content directory) to its size, mtime,
+    content hash and output path (relative to the output directory). `static`
+    records the static files synced into the output directory, so copies of
+    deleted assets can be removed. `outputs` maps every file in the output
+    directory to its size, mtime and content hash after the previous build.
+    `generated` maps each site-wide generated output (e.g. the sitemap) to the
+    digest of its inputs and the files it wrote. `compressed` maps each output
+    with a `.gz` sidecar to the content hash the sidecar was written from.
+    `assets` maps each fingerprinted static file to its size, mtime, content
+    hash and fingerprinted path. `images` maps each static image to its size,
+    mtime, content hash and dimensions.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        settings: dict | None = None,
+        pages: dict[str, dict] | None = None,
+        static: dict[str, dict] | None = None,
+        outputs: dict[str, dict] | None = None,
+        generated: dict[str, dict] | None = None,
+        compressed: dict[str, str] | None = None,
+        assets: dict[str, dict] | None = None,
+        images: dict[str, dict] | None = None,
+    ):
+        self.path = path
+        self.settings = settings or {}
+        self.pages = pages or {}
+        self.static = static or {}
+        self.outputs = outputs or {}
+        self.generated = generated or {}
+        self.compressed = compressed or {}
+        self.assets = assets or {}
+        self.images = images or {}
+
+    @classmethod
+    def load(cls, state_dir: str) -> "BuildManifest":
+        """
+        Loads the manifest stored in `state_dir`.
+
+        A missing, unreadable or outdated manifest yields an empty one, which
+        makes every page stale.
+
+        Args:
+            state_dir: The build state directory.
+
+        Returns:
+            The loaded BuildManifest.
+        """
+        path = os.path.join(state_dir, MANIFEST_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable build manifest %s: %s", path, e)
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            logger.info("Build manifest %s is from an older version, rebuilding everything.", path)
+            return cls(path)
+
+        return cls(
+            path,
+            data.get("settings"),
+            data.get("pages"),
+            data.get("static"),
+            data.get("outputs"),
+            data.get("generated"),
+            data.get("compressed"),
+            data.get("assets"),
+            data.get("images"),
+        )
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk atomically.
+        """
+        data = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "pages": self.pages,
+            "static": self.static,
+            "outputs": self.outputs,
+            "generated": self.generated,
+            "compressed": self.compressed,
+            "assets": self.assets,
+            "images": self.images,
+        }
+        tmp_path = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(data, manifest_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def apply_settings(self, settings: dict) -> bool:
+        """
+        Sets the build-wide settings, marking every page as stale when they
+        differ from the ones the manifest was recorded with.
+
+        Stale pages keep only their output path, so the outputs of sources
+        deleted in the same build are still removed by `remove_stale_pages`.
+
+        Args:
+            settings: The JSON-serializable build-wide inputs of the current build.
+
+        Returns:
+            True if the settings changed and all pages must be regenerated.
+        """
+        changed = self.settings != settings
+        if changed:
+            if self.pages:
+                logger.info("Template or build settings changed, regenerating every page.")
+            self.pages = {
+                source_rel: {"output": entry["output"]} for source_rel, entry in self.pages.items() if "output" in entry
+            }
+        self.settings = settings
+        return changed
+
+    def is_page_fresh(self, source_rel: str, source_path: str, output_path: str, output_rel: str) -> bool:
+        """
+        Checks whether a page's recorded inputs still match its source file.
+
+        The size and mtime are compared first; only when they differ is the
+        content hashed. A matching hash refreshes the recorded stat values.
+
+        Args:
+            source_rel: The source path relative to the content directory (manifest key).
+            source_path: The full path to the source markdown file.
+            output_path: The full path to the generated HTML file.
+            output_rel: The output path relative to the output directory.
+
+        Returns:
+            True if the page does not need to be regenerated.
+        """
+        entry = self.pages.get(source_rel)
+        if entry is None or entry.get("output") != output_rel or not os.path.exists(output_path):
+            return False
+
+        stat = os.stat(source_path)
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+
+        if entry.get("hash") != file_hash(source_path):
+            return False
+
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def record_page(self, source_rel: str, source_path: str, output_rel: str) -> None:
+        """
+        Records the current inputs of a successfully generated page.
+
+        Args:
+            source_rel: The source path relative to the content directory (manifest key).
+            source_path: The full path to the source markdown file.
+            output_rel: The output path relative to the output directory.
+        """
+        stat = os.stat(source_path)
+        self.pages[source_rel] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_hash(source_path),
+            "output": output_rel,
+        }
+
+    def remove_stale_pages(self, seen_sources: set[str], output_dir: str) -> list[str]:
+        """
+        Deletes the outputs of pages whose source files no longer exist and
+        forgets them.
+
+        Args:
+            seen_sources: The manifest keys of every source found in this build.
+            output_dir: The build output directory.
+
+        Returns:
+            The output paths (relative to `output_dir`) that were removed.
+        """
+        removed = []
+        for source_rel in sorted(set(self.pages) - seen_sources):
+            output_rel = self.pages.pop(source_rel).get("output")
+            if not output_rel:
+                continue
+            output_path = os.path.join(output_dir, output_rel)
+            try:
+                os.remove(output_path)
+                logger.info("Removed output of deleted source %s: %s", source_rel, output_path)
+                removed.append(output_rel)
+            except FileNotFoundError:
+                continue
+            _remove_empty_parents(os.path.dirname(output_path), output_dir)
+        return removed
+
+    def is_generated_fresh(self, name: str, digest: str, output_dir: str) -> bool:
+        """
+        Checks whether a site-wide generated output was last written from the
+        same inputs and its files still exist.
+
+        Args:
+            name: The name of the generated output, e.g. "sitemap".
+            digest: The digest of its current inputs.
+            output_dir: The build output directory.
+
+        Returns:
+            True if the output does not need to be written again.
+        """
+        entry = self.generated.get(name)
+        if entry is None or entry.get("digest") != digest:
+            return False
+        return all(os.path.exists(os.path.join(output_dir, file)) for file in entry.get("files", []))
+
+    def record_generated(self, name: str, digest: str, files: list[str], output_dir: str) -> list[str]:
+        """
+        Records the inputs digest and the files (relative to the output
+        directory) of a site-wide generated output, deleting the files it
+        wrote before but no longer writes (e.g. a feed moved to another
+        section, or numbered sitemaps of a site that shrank).
+
+        Returns:
+            The removed paths, relative to `output_dir`.
+        """
+        previous_files = self.generated.get(name, {}).get("files", [])
+        self.generated[name] = {"digest": digest, "files": files}
+        other_files = {file for entry in self.generated.values() for file in entry.get("files", [])}
+        return _remove_files([file for file in previous_files if file not in other_files], output_dir)
+
+    def remove_stale_generated(self, names: set[str], output_dir: str) -> list[str]:
+        """
+        Deletes the files of generated outputs that are not in `names` or that
+        their output no longer writes, and forgets those outputs.
+
+        Args:
+            names: The generated outputs of this build.
+            output_dir: The build output directory.
+
+        Returns:
+            The removed paths, relative to `output_dir`.
+        """
+        current_files = {file for name in names for file in self.generated.get(name, {}).get("files", [])}
+        removed = []
+        for name in list(self.generated):
+            if name in names:
+                continue
+            stale_files = [file for file in self.generated.pop(name).get("files", []) if file not in current_files]
+            removed.extend(_remove_files(stale_files, output_dir))
+        return removed
+
+
+def _remove_files(files: list[str], output_dir: str) -> list[str]:
+    removed = []
+    for file in files:
+        try:
+            os.remove(os.path.join(output_dir, file))
+            removed.append(file)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _remove_empty_parents(directory: str, stop_dir: str) -> None:
+    stop_dir = os.path.abspath(stop_dir)
+    directory = os.path.abspath(directory)
+    while directory != stop_dir and directory.startswith(stop_dir + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
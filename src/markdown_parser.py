@@ -1,6 +1,9 @@
 import re
 import textwrap
+from collections.abc import Callable, Iterable, Iterator
 from enum import Enum
+from functools import lru_cache
+from typing import TextIO
 
 from src.htmlnode import HTMLNode, ParentNode
 from src.linknode import split_nodes_image, split_nodes_link
@@ -16,11 +19,86 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+# One alternation matching every inline token: images, links (not preceded by '!',
+# checked after the '[' so the lookbehind only runs at brackets), and the code, bold
+# and italic delimiters. Links and images come first so that
+# delimiters inside them are consumed with them, as in the multi-pass pipeline.
+_INLINE_TOKEN_PATTERN = re.compile(
+    r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+    r"|\[(?<!!\[)([^\[\]]*)\]\(([^\(\)]*)\)"
+    r"|`|\*\*|_"
+)
+
+_DELIMITER_TEXT_TYPES = {"`": TextType.CODE, "**": TextType.BOLD, "_": TextType.ITALIC}
+
+# Delimiters that are plain text inside an open span: code content is never split,
+# and bold content is not split on italic delimiters.
+_IGNORED_INSIDE = {"`": ("**", "_"), "**": ("_",), "_": ()}
+
+
 def text_to_textnodes(text: str) -> list[TextNode]:
     """
     Converts a raw text string into a list of TextNode objects by
     processing markdown elements (images, links, bold, italic, code).
 
+    The text is tokenized in a single left-to-right scan and produces the same
+    nodes as `text_to_textnodes_multipass`. Malformed input (an unclosed
+    delimiter) is handed to the multi-pass pipeline so it raises the same error.
+
+    Args:
+        text: The raw text string to convert.
+
+    Returns:
+        A list of TextNode objects representing the parsed text.
+
+    Raises:
+        ValueError: If a delimiter is not properly closed.
+    """
+    nodes = []
+    open_delimiter = None
+    span_start = 0
+
+    for match in _INLINE_TOKEN_PATTERN.finditer(text):
+        token = match.group()
+
+        if open_delimiter is None:
+            if match.start() > span_start:
+                nodes.append(TextNode(text[span_start : match.start()], TextType.TEXT))
+            if token in _DELIMITER_TEXT_TYPES:
+                open_delimiter = token
+            elif token[0] == "!":
+                nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+            else:
+                nodes.append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+            span_start = match.end()
+
+        elif token == open_delimiter:
+            if match.start() > span_start:
+                nodes.append(TextNode(text[span_start : match.start()], _DELIMITER_TEXT_TYPES[token]))
+            open_delimiter = None
+            span_start = match.end()
+
+        elif token not in _IGNORED_INSIDE[open_delimiter]:
+            # A link, image or outer delimiter ends the span before it was closed.
+            return text_to_textnodes_multipass(text)
+
+    if open_delimiter is not None:
+        return text_to_textnodes_multipass(text)
+
+    if span_start < len(text):
+        nodes.append(TextNode(text[span_start:], TextType.TEXT))
+
+    return nodes
+
+
+def text_to_textnodes_multipass(text: str) -> list[TextNode]:
+    """
+    Converts a raw text string into a list of TextNode objects by running one
+    splitting pass per markdown element (images, links, code, bold, italic).
+
+    This is the reference implementation `text_to_textnodes` is checked and
+    benchmarked against.
+
     Args:
         text: The raw text string to convert.
 
@@ -58,6 +136,41 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     return markdown_blocks
 
 
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Lazily splits markdown lines into blocks, yielding the same blocks as
+    `markdown_to_blocks` without holding the whole document in memory.
+
+    Only the lines of the block being read are kept, so memory is bounded by
+    the largest block rather than the document.
+
+    Args:
+        lines: The markdown lines with their line endings, e.g. an open text file.
+
+    Yields:
+        Each non-empty, stripped block in document order.
+    """
+    block_lines = []
+    # Whether the last line read ends with a newline that can start a "\n\n" separator.
+    newline_available = False
+
+    for line in lines:
+        if line == "\n" and newline_available:
+            # The separator is the previous line's newline plus this empty line.
+            block = "".join(block_lines)[:-1].strip()
+            if block:
+                yield block
+            block_lines = []
+            newline_available = False
+        else:
+            block_lines.append(line)
+            newline_available = line.endswith("\n")
+
+    block = "".join(block_lines).strip()
+    if block:
+        yield block
+
+
 def is_heading(markdown_block: str) -> bool:
     title_types = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
 
@@ -93,7 +206,13 @@ def is_ordered_list(markdown_lines: list[str]) -> bool:
     return all(line.startswith(f"{i + 1}. ") for i, line in non_empty_lines_with_indices)
 
 
-def block_to_block_type(markdown_block: str) -> BlockType:
+def block_to_block_type_predicates(markdown_block: str) -> BlockType:
+    """
+    Classifies a block by trying each block-type predicate in turn.
+
+    This is the reference implementation of `block_to_block_type`, which
+    dispatches on the first character instead.
+    """
     markdown_lines = markdown_block.split("\n")
     if is_heading(markdown_block):
         return BlockType.HEADING
@@ -113,6 +232,84 @@ def block_to_block_type(markdown_block: str) -> BlockType:
     return BlockType.PARAGRAPH
 
 
+_HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+
+def _classify_heading(block: str) -> tuple[BlockType, list[str] | None]:
+    return (BlockType.HEADING if block.startswith(_HEADING_PREFIXES) else BlockType.PARAGRAPH), None
+
+
+def _classify_code(block: str) -> tuple[BlockType, list[str] | None]:
+    return (BlockType.CODE if block.startswith("```") and block.endswith("```") else BlockType.PARAGRAPH), None
+
+
+def _classify_quote(block: str) -> tuple[BlockType, list[str] | None]:
+    lines = block.split("\n")
+    for line in lines:
+        if line and line[0] != ">":
+            return BlockType.PARAGRAPH, None
+    return BlockType.QUOTE, lines
+
+
+def _classify_unordered_list(block: str) -> tuple[BlockType, list[str] | None]:
+    lines = block.split("\n")
+    for line in lines:
+        if len(line) < 2 or line[0] != "-":
+            return BlockType.PARAGRAPH, None
+    return BlockType.UNORDERED_LIST, lines
+
+
+def _classify_ordered_list(block: str) -> tuple[BlockType, list[str] | None]:
+    lines = block.split("\n")
+    for i, line in enumerate(lines):
+        if line and not line.startswith(f"{i + 1}. "):
+            return BlockType.PARAGRAPH, None
+    return BlockType.ORDERED_LIST, lines
+
+
+# A block that starts with any other character is a paragraph. Only the block
+# types whose marker starts with the character have to be checked: every other
+# predicate needs a different first character (an ordered list must start
+# with "1. ").
+_BLOCK_CLASSIFIERS = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_unordered_list,
+    "1": _classify_ordered_list,
+}
+
+
+def classify_block(markdown_block: str) -> tuple[BlockType, list[str] | None]:
+    """
+    Classifies a block by dispatching on its first character, scanning it at
+    most once.
+
+    Args:
+        markdown_block: A markdown block as returned by `markdown_to_blocks`.
+
+    Returns:
+        The block type, and for quotes and lists the block split into lines,
+        so the formatter does not split it again (None for other types).
+    """
+    first_char = markdown_block[:1]
+    if first_char in ("", "\n"):
+        # An empty first line is only reachable for raw strings, never for
+        # stripped blocks; defer to the predicates for exact behaviour.
+        block_type = block_to_block_type_predicates(markdown_block)
+        lines = markdown_block.split("\n") if block_type in (BlockType.QUOTE, BlockType.ORDERED_LIST) else None
+        return block_type, lines
+
+    classify = _BLOCK_CLASSIFIERS.get(first_char)
+    if classify is None:
+        return BlockType.PARAGRAPH, None
+    return classify(markdown_block)
+
+
+def block_to_block_type(markdown_block: str) -> BlockType:
+    return classify_block(markdown_block)[0]
+
+
 def text_to_children(text: str) -> list[HTMLNode]:
     children = text_to_textnodes(text)
     list_of_text_node = []
@@ -134,22 +331,27 @@ def format_code(code_block: str) -> ParentNode:
     return ParentNode("pre", code_node)
 
 
-def format_quote(quote_block: str) -> ParentNode:
-    quote_text = " ".join(list(map(lambda line: line.lstrip("> "), quote_block.split("\n"))))
+def format_quote(quote_block: str, lines: list[str] | None = None) -> ParentNode:
+    if lines is None:
+        lines = quote_block.split("\n")
+    quote_text = " ".join(line.lstrip("> ") for line in lines)
     return ParentNode("blockquote", text_to_children(quote_text))
 
 
-def format_unordered_list(list_block: str) -> ParentNode:
-    list_text = list(map(lambda line: line.lstrip("- "), list_block.split("\n")))
+def format_unordered_list(list_block: str, lines: list[str] | None = None) -> ParentNode:
+    if lines is None:
+        lines = list_block.split("\n")
     unordered_list = []
-    for line in list_text:
-        unordered_list.append(ParentNode("li", text_to_children(line)))
+    for line in lines:
+        unordered_list.append(ParentNode("li", text_to_children(line.lstrip("- "))))
     return ParentNode("ul", unordered_list)
 
 
-def format_ordered_list(list_block: str) -> ParentNode:
+def format_ordered_list(list_block: str, lines: list[str] | None = None) -> ParentNode:
+    if lines is None:
+        lines = list_block.split("\n")
     ordered_list = []
-    for line in list_block.split("\n"):
+    for line in lines:
         match = re.match(r"^\d+\.\s+", line)
 
         list_item_text = line
@@ -170,29 +372,92 @@ def format_paragraph(paragraph_block: str):
     return ParentNode("p", text_to_children(single_line_text))
 
 
-def markdown_to_html_node(markdown: str) -> HTMLNode:
+def block_to_html_node(block: str) -> ParentNode:
+    """
+    Converts a single markdown block into its HTML node.
+
+    Args:
+        block: A markdown block as returned by `markdown_to_blocks`.
+
+    Returns:
+        The ParentNode for the block.
+    """
+    block_type, lines = classify_block(block)
+
+    match block_type:
+        case BlockType.HEADING:
+            return format_heading(block)
+        case BlockType.CODE:
+            return format_code(block)
+        case BlockType.QUOTE:
+            return format_quote(block, lines)
+        case BlockType.UNORDERED_LIST:
+            return format_unordered_list(block, lines)
+        case BlockType.ORDERED_LIST:
+            return format_ordered_list(block, lines)
+        case BlockType.PARAGRAPH:
+            return format_paragraph(block)
+
+
+# The number of distinct blocks whose nodes `markdown_to_html_node` keeps for reuse.
+BLOCK_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def cached_block_to_html_node(block: str) -> ParentNode:
+    """
+    Memoized `block_to_html_node`, keyed by the block text.
+
+    The returned node is shared by every document containing the same block,
+    so it must not be modified.
+    """
+    return block_to_html_node(block)
+
+
+def markdown_to_html_node(markdown: str, memoize: bool = True) -> HTMLNode:
+    """
+    Converts a markdown document into a tree of HTML nodes.
+
+    Args:
+        markdown: The markdown document.
+        memoize: Reuse the nodes of blocks converted before, so re-rendering an
+                 edited document only converts the blocks that changed.
+
+    Returns:
+        A "div" ParentNode with one child per block. With `memoize`, the block
+        nodes may be shared with other trees and must not be modified.
+    """
+    to_html_node = cached_block_to_html_node if memoize else block_to_html_node
     parent_node = ParentNode(tag="div", children=[])
 
     for block in markdown_to_blocks(markdown):
-        block_type = block_to_block_type(block)
-
-        match block_type:
-            case BlockType.HEADING:
-                parent_node.children.append(format_heading(block))
-            case BlockType.CODE:
-                parent_node.children.append(format_code(block))
-            case BlockType.QUOTE:
-                parent_node.children.append(format_quote(block))
-            case BlockType.UNORDERED_LIST:
-                parent_node.children.append(format_unordered_list(block))
-            case BlockType.ORDERED_LIST:
-                parent_node.children.append(format_ordered_list(block))
-            case BlockType.PARAGRAPH:
-                parent_node.children.append(format_paragraph(block))
+        parent_node.children.append(to_html_node(block))
 
     return parent_node
 
 
+def write_markdown_html(
+    lines: Iterable[str], out: list[str] | TextIO, visit: Callable[[HTMLNode], None] | None = None
+) -> None:
+    """
+    Streams the HTML of a markdown document, rendering and writing one block at
+    a time. The output is the same as `markdown_to_html_node(...).to_html()`.
+
+    Args:
+        lines: The markdown lines with their line endings, e.g. an open text file.
+        out: A list the pieces are appended to, or a text stream to write to.
+        visit: Called with the node of each block after it is written.
+    """
+    write = out.append if isinstance(out, list) else out.write
+    write("<div>")
+    for block in iter_markdown_blocks(lines):
+        node = block_to_html_node(block)
+        node.write_html(out)
+        if visit is not None:
+            visit(node)
+    write("</div>")
+
+
 if __name__ == "__main__":
     md = textwrap.dedent(
         """
@@ -0,0 +1,70 @@
+import re
+
+# Elements whose content is kept exactly as written.
+PRESERVED_TAGS = ("pre", "code", "textarea", "script", "style")
+
+# Elements that do not render inline, so whitespace next to their tags is
+# never significant.
+BLOCK_TAGS = frozenset(
+    (
+        "!doctype address article aside base blockquote body dd details dialog div dl dt fieldset figcaption "
+        "figure footer form h1 h2 h3 h4 h5 h6 head header hr html li link main meta nav ol p pre script "
+        "section style table tbody td tfoot th thead title tr ul"
+    ).split()
+)
+
+_PRESERVED_PATTERN = re.compile(r"(<(" + "|".join(PRESERVED_TAGS) + r")\b[^>]*>.*?</\2\s*>)", re.DOTALL | re.IGNORECASE)
+# Comments, except conditional comments.
+_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_TAG = r"<(/?)([a-zA-Z!][\w-]*)[^>]*>"
+_BETWEEN_TAGS_PATTERN = re.compile(r"(" + _TAG + r")(\s+)(?=" + _TAG + r")")
+_LEADING_PATTERN = re.compile(r"^\s+(?=" + _TAG + r")")
+_TRAILING_PATTERN = re.compile(r"(" + _TAG + r")\s+$")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _is_block(tag_name: str) -> bool:
+    return tag_name.lower() in BLOCK_TAGS
+
+
+def _minify_between_tags(match: re.Match) -> str:
+    if _is_block(match.group(3)) or _is_block(match.group(6)):
+        return match.group(1)
+    return match.group(1) + " "
+
+
+def _minify_text(html: str) -> str:
+    html = _COMMENT_PATTERN.sub("", html)
+    html = _BETWEEN_TAGS_PATTERN.sub(_minify_between_tags, html)
+    html = _LEADING_PATTERN.sub(lambda match: "" if _is_block(match.group(2)) else " ", html)
+    html = _TRAILING_PATTERN.sub(lambda match: match.group(1) + ("" if _is_block(match.group(3)) else " "), html)
+    return _WHITESPACE_PATTERN.sub(" ", html)
+
+
+def minify_html(html: str) -> str:
+    """
+    Removes comments and insignificant whitespace from HTML.
+
+    Whitespace next to block-level tags is dropped and other whitespace runs
+    collapse to one space. The content of `<pre>`, `<code>`, `<textarea>`,
+    `<script>` and `<style>` elements is left untouched.
+
+    Args:
+        html: The HTML to minify; it may be a fragment, e.g. a template segment.
+
+    Returns:
+        The minified HTML.
+    """
+    parts = _PRESERVED_PATTERN.split(html)
+    # split() yields text, then the element and the tag name of each preserved element.
+    minified = []
+    for index in range(0, len(parts), 3):
+        text = _minify_text(parts[index])
+        if index > 0 and _is_block(parts[index - 1]):
+            text = text.lstrip()
+        if index + 2 < len(parts) and _is_block(parts[index + 2]):
+            text = text.rstrip()
+        minified.append(text)
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return "".join(minified)
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_INDEX_FILENAME = ".page-index.json"
+PAGE_INDEX_VERSION = 2
+
+# A word is a whitespace-separated token containing a letter or digit, so
+# markdown markers such as "#", "-" or "```" are not counted.
+_WORD_PATTERN = re.compile(r"\S*\w\S*")
+
+
+def count_words(text: str) -> int:
+    """
+    Counts the words of a markdown text.
+    """
+    return len(_WORD_PATTERN.findall(text))
+
+
+class WordCounter:
+    """
+    Counts the words of markdown lines as they are consumed, so a streamed page
+    is not read twice.
+    """
+
+    def __init__(self, count: int = 0):
+        self.count = count
+
+    def counted(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            self.count += count_words(line)
+            yield line
+
+
+class PageInfo(NamedTuple):
+    """
+    What generating a page learned about its content.
+    """
+
+    title: str
+    word_count: int
+    front_matter: dict | None = None
+    # The search terms of the page mapped to their frequency, when collected.
+    terms: dict[str, int] | None = None
+
+
+def page_url(output_rel: str, basepath: str = "/") -> str:
+    """
+    Returns the URL a page is served at: its output path under the base path,
+    with "index.html" dropped so directory pages end with "/".
+
+    Args:
+        output_rel: The output path relative to the output directory.
+        basepath: The base URL path, ending with '/'.
+    """
+    url_path = output_rel.replace(os.sep, "/")
+    if url_path == "index.html" or url_path.endswith("/index.html"):
+        url_path = url_path[: -len("index.html")]
+    return basepath + url_path
+
+
+class PageIndex:
+    """
+    Metadata of every generated page, built while the pages are generated and
+    kept across incremental builds, so listings, feeds and sitemaps can query it
+    instead of reading the sources again.
+
+    The index is stored as JSON in the build state directory. `pages` maps each
+    source path (relative to the content directory) to its title, output path,
+    URL, source size and mtime, word count and front matter.
+    """
+
+    def __init__(self, path: str, pages: dict[str, dict] | None = None):
+        self.path = path
+        self.pages = pages or {}
+
+    @classmethod
+    def load(cls, state_dir: str) -> "PageIndex":
+        """
+        Loads the index stored in `state_dir`. A missing, unreadable or
+        outdated index yields an empty one.
+
+        Args:
+            state_dir: The build state directory.
+
+        Returns:
+            The loaded PageIndex.
+        """
+        path = os.path.join(state_dir, PAGE_INDEX_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as index_file:
+                data = json.load(index_file)
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable page index %s: %s", path, e)
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != PAGE_INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages"))
+
+    def save(self) -> None:
+        """
+        Writes the index to disk atomically.
+        """
+        data = {"version": PAGE_INDEX_VERSION, "pages": self.pages}
+        tmp_path = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(data, index_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def record(self, source_rel: str, source_path: str, output_rel: str, basepath: str, info: PageInfo) -> None:
+        """
+        Records the metadata of a generated page.
+
+        Args:
+            source_rel: The source path relative to the content directory.
+            source_path: The full path to the source markdown file.
+            output_rel: The output path relative to the output directory.
+            basepath: The base URL path of the site.
+            info: What generating the page learned about its content.
+        """
+        stat = os.stat(source_path)
+        self.pages[source_rel] = {
+            "title": info.title,
+            "source": source_rel.replace(os.sep, "/"),
+            "output": output_rel.replace(os.sep, "/"),
+            "url": page_url(output_rel, basepath),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "word_count": info.word_count,
+            "front_matter": info.front_matter or {},
+        }
+
+    def forget(self, source_rel: str) -> None:
+        self.pages.pop(source_rel, None)
+
+    def retain(self, source_rels: Iterable[str]) -> None:
+        """
+        Drops the pages whose sources are not in `source_rels`.
+        """
+        keep = set(source_rels)
+        self.pages = {source_rel: entry for source_rel, entry in self.pages.items() if source_rel in keep}
+
+    def entries(self, section: str | None = None) -> list[dict]:
+        """
+        Returns the indexed pages sorted by source path.
+
+        Args:
+            section: Only return the pages under this top-level content directory.
+        """
+        entries = [self.pages[source_rel] for source_rel in sorted(self.pages)]
+        if section is not None:
+            prefix = section.rstrip("/") + "/"
+            entries = [entry for entry in entries if entry["source"].startswith(prefix)]
+        return entries
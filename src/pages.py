@@ -0,0 +1,584 @@
+"""
+Page generation: renders the markdown pages of the content directory into
+the output directory through the HTML template.
+"""
+
+import concurrent.futures
+import functools
+import itertools
+import logging
+import os
+from collections import Counter
+from collections.abc import Iterable
+from typing import Literal, NamedTuple, TextIO
+
+from src.deploy import replace_if_changed
+from src.feeds import inputs_digest
+from src.front_matter import read_header, split_front_matter
+from src.header import NavBar, build_nav_bar, nav_section
+from src.htmlnode import HTMLNode
+from src.manifest import BuildManifest, file_hash
+from src.markdown_parser import (
+    BlockType,
+    block_to_block_type,
+    format_heading,
+    markdown_to_html_node,
+    write_markdown_html,
+)
+from src.page_index import PageIndex, PageInfo, WordCounter, count_words
+from src.parse_cache import ParseCache
+from src.search_index import count_terms
+from src.template import PageTemplate
+from src.tracing import PAGE_SPAN, tracer
+
+logger = logging.getLogger(__name__)
+
+
+def extract_title(first_line: str) -> str:
+    """
+    Extracts the title from the first line of markdown content.
+    Assumes the title is the first block and must be a heading (h1-h6).
+
+    Args:
+        first_line: The string representing the first line of the markdown content.
+
+    Returns:
+        The extracted title string without markdown formatting.
+
+    Raises:
+        Exception: If the first line is not a valid heading block.
+    """
+    first_block_type = block_to_block_type(first_line)
+
+    if first_block_type is BlockType.HEADING:
+        heading_html_node = format_heading(first_line)
+        title_text_parts = []
+        for child_node in heading_html_node.children:
+            if child_node.value is not None:
+                title_text_parts.append(child_node.value)
+
+        file_title = "".join(title_text_parts)
+
+        return file_title.strip()
+
+    raise Exception("The file does not contain a title heading (first line must be # ...)")
+
+
+def generate_page(
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    basepath,
+    content_directories: list[str],
+    generate_navbar: bool,
+    template: PageTemplate | None = None,
+    nav_bar: NavBar | None = None,
+    nav_active: str | None = None,
+    stream: bool = False,
+    parse_cache: ParseCache | None = None,
+    out: TextIO | None = None,
+    collect_terms: bool = False,
+) -> PageInfo | Literal[False]:
+    """
+    Generates a static HTML page from a markdown file using an HTML template.
+
+    Reads markdown content from the `from_path`, strips its front matter (if
+    any), takes the title from the front matter or else extracts it from the
+    first line (assuming it's a heading), converts the markdown content to HTML
+    nodes, and then renders the HTML content into a template read from
+    `template_path`, or into the already compiled `template` when one is given.
+    The resulting populated HTML is written to the `dest_path`.
+
+    Args:
+        from_path (str): The full path to the source markdown file.
+        template_path (str): The full path to the HTML template file.
+                             The template is expected to contain '{{ Title }}'
+                             and '{{ Content }}' placeholders.
+        dest_path (str): The full path where the generated HTML file should be written.
+        basepath (str): The base URL path prefixed to root-relative links.
+        content_directories (list[str]): The top-level content directories listed in the navbar.
+        generate_navbar (bool): Whether to render the navigation bar.
+        template (PageTemplate | None): A template compiled for `basepath`, shared across
+                                        pages so it is read only once per build.
+        nav_bar (NavBar | None): The navigation bar rendered once per build. Built (and
+                                 cached) from `content_directories` when not given.
+        nav_active (str | None): The navbar item to mark as active on this page, if any.
+        stream (bool): Read the markdown line by line and write each block as soon as it
+                       is rendered, so memory stays bounded for very large files. The
+                       output is the same as the in-memory path.
+        parse_cache (ParseCache | None): A cache of rendered content HTML; a document whose
+                                         text was parsed before is not parsed again.
+                                         Not used when streaming.
+        out (TextIO | None): Write the page to this text stream instead of `dest_path`,
+                             e.g. to keep it in memory.
+        collect_terms (bool): Count the search terms of the page from its rendered blocks.
+                              A page served from `parse_cache` has no blocks to count, so
+                              its terms are left out.
+
+    Returns:
+        PageInfo | False: The title, word count, front matter and (when collected) search
+                          terms of the page written to `dest_path`, or False if it was skipped.
+
+    Raises:
+        FileNotFoundError: If `from_path` or `template_path` do not exist.
+        Exception: If the first line of the markdown file does not contain a title
+                   (as determined by `extract_title`).
+        # Add other potential exceptions from called functions if known and relevant
+        # (e.g., errors from markdown parsing or file writing)
+    """
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logger.info("Generating page from %s to %s using %s", from_path, template_path, dest_path)
+    if template is None:
+        template = PageTemplate.load(template_path, basepath)
+
+    with open(from_path, "r", encoding="utf-8") as source_file:
+        with tracer.span("read"):
+            if stream:
+                front_matter, pushed_back = read_header(source_file)
+                source_lines = itertools.chain(pushed_back, source_file)
+                # Only read up to the first non-blank line; the rest is consumed block by block.
+                leading_lines = read_leading_lines(source_lines)
+                if front_matter is not None:
+                    leading_lines = [line for line in leading_lines if line.strip()]
+                md_content = "".join(leading_lines)
+            else:
+                front_matter, md_content = split_front_matter(source_file.read())
+            front_matter = front_matter or {}
+
+        if not md_content.strip():
+            logger.warning(
+                "Warning: Markdown file %s is empty or contains only whitespace. Skipping page generation.", from_path
+            )
+            return False
+
+        with tracer.span("extract_title"):
+            try:
+                if "title" in front_matter:
+                    file_title = str(front_matter["title"])
+                else:
+                    file_title = extract_title(md_content.splitlines(keepends=True)[0])
+            except Exception as e:
+                logger.exception(
+                    "Warning: Could not extract title from %s. Using default or handling failure. Error: %s",
+                    from_path,
+                    e,
+                )
+                file_title = "Untitled Page"
+
+        nav_html = ""
+        if generate_navbar:
+            with tracer.span("nav"):
+                if nav_bar is None:
+                    nav_bar = build_nav_bar(tuple(content_directories))
+                nav_html = nav_bar.render(nav_active)
+
+        terms = Counter() if collect_terms else None
+        if stream:
+            word_counter = WordCounter(count_words(md_content))
+            content = functools.partial(
+                write_markdown_html,
+                itertools.chain(leading_lines, word_counter.counted(source_lines)),
+                visit=functools.partial(count_terms, terms) if terms is not None else None,
+            )
+        else:
+            content = None
+            if parse_cache is not None:
+                with tracer.span("cache_lookup"):
+                    cache_key = parse_cache.key(md_content)
+                    content = parse_cache.get(cache_key)
+            if content is None:
+                with tracer.span("parse"):
+                    content = markdown_to_html_node(md_content)
+                if terms is not None:
+                    count_terms(terms, content)
+                if parse_cache is not None:
+                    content = content.to_html()
+                    parse_cache.put(cache_key, content)
+            else:
+                terms = None
+        footer_content = ""
+
+        if out is not None:
+            template.write(out, file_title, nav_html, content, footer_content)
+        else:
+            write_page(dest_path, template, file_title, nav_html, content, footer_content)
+    word_count = word_counter.count if stream else count_words(md_content)
+    return PageInfo(file_title, word_count, front_matter, dict(terms) if terms is not None else None)
+
+
+def read_leading_lines(source_file: Iterable[str]) -> list[str]:
+    """
+    Reads lines from a text file up to and including the first non-blank line.
+
+    Args:
+        source_file: The open markdown file, or an iterator over its lines.
+
+    Returns:
+        The lines read; all of them are blank if the file has no content.
+    """
+    leading_lines = []
+    for line in source_file:
+        leading_lines.append(line)
+        if line.strip():
+            break
+    return leading_lines
+
+
+def write_page(dest_path: str, template: PageTemplate, title: str, nav: str, content, footer: str) -> bool:
+    """
+    Streams a populated page straight to disk.
+
+    The page is written to a temporary file that replaces `dest_path` once it
+    is complete, so a failed render does not leave a truncated page behind.
+    An existing page with identical contents is left untouched.
+
+    When tracing, a content node is instead rendered, filled into the template
+    and written in separate steps, so each gets its own span; the output is
+    the same. Streamed content is traced as a single "render_write" span.
+
+    Args:
+        dest_path: The full path of the HTML file to write.
+        template: The compiled page template.
+        title: The page title.
+        nav: The navigation bar HTML.
+        content: The page content, in any form accepted by `PageTemplate.write`.
+        footer: The footer HTML.
+
+    Returns:
+        True if the page was written, False if `dest_path` was already up to date.
+    """
+    tmp_path = dest_path + ".tmp"
+    try:
+        if tracer.enabled and not callable(content):
+            with tracer.span("render"):
+                content_html = content.to_html() if isinstance(content, HTMLNode) else content
+            with tracer.span("basepath"):
+                page_html = template.render(title, nav, content_html, footer)
+            with tracer.span("write"):
+                with open(tmp_path, "w", encoding="utf-8") as dest_file:
+                    dest_file.write(page_html)
+                return replace_if_changed(tmp_path, dest_path)
+
+        with tracer.span("render_write"):
+            with open(tmp_path, "w", encoding="utf-8") as dest_file:
+                template.write(dest_file, title, nav, content, footer)
+            return replace_if_changed(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Page(NamedTuple):
+    """
+    A markdown source file and the HTML file it is rendered to.
+    """
+
+    source_path: str
+    source_rel: str
+    output_path: str
+    output_rel: str
+
+
+def make_page(content_dir: str, output_dir: str, source_rel: str) -> Page:
+    """
+    Returns the page for a markdown file, given its path relative to the content directory.
+    """
+    output_rel = os.path.splitext(source_rel)[0] + ".html"
+    return Page(os.path.join(content_dir, source_rel), source_rel, os.path.join(output_dir, output_rel), output_rel)
+
+
+def list_content_directories(content_dir: str) -> list[str]:
+    """
+    Lists the top-level directories of the content directory, which make up the navbar.
+    """
+    return [name for name in os.listdir(content_dir) if os.path.isdir(os.path.join(content_dir, name))]
+
+
+def collect_pages(content_dir: str, output_dir: str) -> list[Page]:
+    """
+    Walks the content directory, mirrors its directory structure in the output
+    directory and lists every markdown page to generate.
+
+    Args:
+        content_dir: The path to the source content directory.
+        output_dir: The path to the output directory.
+
+    Returns:
+        The pages in walk order.
+    """
+    pages = []
+    for root, _, files in os.walk(content_dir):
+        relative_dir_path_from_content = os.path.relpath(root, content_dir)
+        current_output_dir = os.path.join(output_dir, relative_dir_path_from_content)
+
+        # Ensure the directory exists in the output path.
+        try:
+            os.makedirs(current_output_dir, exist_ok=True)
+            logger.info("Created directory: %s", current_output_dir)
+        except OSError as e:
+            logger.error("Error ensuring outpu directory %s exists: %s", current_output_dir, e)
+
+        for file in files:
+            if file.endswith(".md"):
+                source_file_path = os.path.join(root, file)
+                file_relative_path_from_content = os.path.relpath(source_file_path, content_dir)
+                pages.append(make_page(content_dir, output_dir, file_relative_path_from_content))
+    return pages
+
+
+def render_page(
+    page: Page,
+    template_path: str,
+    basepath,
+    content_directories: list[str],
+    generate_navbar: bool,
+    template: PageTemplate | None = None,
+    nav_bar: NavBar | None = None,
+    mark_active_nav: bool = False,
+    stream: bool = False,
+    parse_cache: ParseCache | None = None,
+    collect_terms: bool = False,
+) -> PageInfo | Literal[False] | None:
+    """
+    Generates a single page, logging any error instead of raising it.
+
+    This is the unit of work of both the serial and the parallel build, so
+    per-page error reporting is the same in both.
+
+    Returns:
+        The result of `generate_page`, or None if generating the page failed.
+    """
+    try:
+        with tracer.span(PAGE_SPAN, source=page.source_rel):
+            return generate_page(
+                page.source_path,
+                template_path,
+                page.output_path,
+                basepath,
+                content_directories,
+                generate_navbar,
+                template=template,
+                nav_bar=nav_bar,
+                nav_active=nav_section(page.source_rel) if mark_active_nav else None,
+                stream=stream,
+                parse_cache=parse_cache,
+                collect_terms=collect_terms,
+            )
+    except Exception as e:
+        logger.exception("Error generating page from %s: %s", page.source_path, e)
+        return None
+
+
+def render_page_traced(page: Page, **render_args) -> tuple[PageInfo | Literal[False] | None, list[dict]]:
+    """
+    Runs `render_page` in a worker process with tracing enabled and returns its
+    result together with the spans recorded for the page.
+    """
+    tracer.enable()
+    # Forget events inherited from the parent process when the worker was forked.
+    tracer.drain()
+    return render_page(page, **render_args), tracer.drain()
+
+
+def render_pages(pages: list[Page], jobs: int, **render_args) -> list[PageInfo | Literal[False] | None]:
+    """
+    Renders pages serially, or across a process pool when `jobs` is greater than one.
+
+    Args:
+        pages: The pages to render.
+        jobs: The number of worker processes.
+        **render_args: The remaining arguments of `render_page`.
+
+    Returns:
+        The `render_page` result of each page, in the order of `pages`.
+    """
+    render = functools.partial(render_page, **render_args)
+    if jobs <= 1 or len(pages) <= 1:
+        return [render(page) for page in pages]
+
+    workers = min(jobs, len(pages))
+    chunksize = max(1, len(pages) // (workers * 4))
+    logger.info("Rendering %d pages with %d worker processes", len(pages), workers)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        if not tracer.enabled:
+            return list(executor.map(render, pages, chunksize=chunksize))
+
+        render = functools.partial(render_page_traced, **render_args)
+        results = []
+        for result, events in executor.map(render, pages, chunksize=chunksize):
+            tracer.extend(events)
+            results.append(result)
+        return results
+
+
+def process_content_directory(
+    content_dir: str,
+    template_path: str,
+    output_dir: str,
+    basepath,
+    generate_navbar: bool,
+    manifest: BuildManifest | None = None,
+    jobs: int = 1,
+    mark_active_nav: bool = False,
+    stream: bool = False,
+    force: bool = False,
+    parse_cache: ParseCache | None = None,
+    page_index: PageIndex | None = None,
+    minify: bool = False,
+    asset_map: dict[str, str] | None = None,
+    image_sizes: dict[str, tuple[int, int]] | None = None,
+    search_terms: dict[str, dict[str, int]] | None = None,
+):
+    """
+    Processes markdown files in a content directory and generates
+    corresponding HTML pages in an output directory, mirroring the structure.
+
+    Args:
+        content_dir: The path to the source content directory.
+        template_path: The path to the HTML template file.
+        output_dir: The path to the output directory where generated HTML files will be written.
+        manifest: An optional build manifest. When given, pages whose inputs are unchanged
+                  are skipped, generated pages are recorded in it, and the outputs of
+                  sources that no longer exist are deleted.
+        jobs: The number of worker processes used to render pages.
+        mark_active_nav: Whether to mark each page's section as active in the navbar.
+        stream: Whether to render pages block by block instead of reading them into memory.
+        force: Regenerate every page, even those the manifest considers unchanged.
+        parse_cache: The cache of rendered content HTML shared by the pages, if any.
+        page_index: The site's page metadata index. Generated pages are recorded in it,
+                    and unchanged pages missing from it are regenerated.
+        minify: Whether to minify the template's HTML.
+        asset_map: Asset paths mapped to their fingerprinted paths, applied to the
+                   `href` and `src` references of every page.
+        image_sizes: Image paths mapped to the dimensions added to the `<img>` tags showing them.
+        search_terms: When given, the search terms counted while generating pages are
+                      added to it, keyed by source path.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if not os.path.isdir(content_dir):
+        logger.exception("Error: Source is not a directory: %s", content_dir)
+        return
+
+    logger.info("Processing content from %s and generating pages in %s...", content_dir, output_dir)
+
+    try:
+        template = PageTemplate.load(template_path, basepath, minify, asset_map, image_sizes)
+    except OSError as e:
+        logger.error("Error: Could not read template %s: %s", template_path, e)
+        return
+
+    content_directories = list_content_directories(content_dir)
+    nav_bar = build_nav_bar(tuple(content_directories)) if generate_navbar else None
+    with tracer.span("collect_pages"):
+        pages = collect_pages(content_dir, output_dir)
+
+    if manifest is not None and not force:
+        stale_pages = []
+        with tracer.span("check_fresh"):
+            for page in pages:
+                indexed = page_index is None or page.source_rel in page_index.pages
+                if indexed and manifest.is_page_fresh(
+                    page.source_rel, page.source_path, page.output_path, page.output_rel
+                ):
+                    logger.info("Skipping unchanged page %s", page.source_path)
+                else:
+                    stale_pages.append(page)
+        pages_to_render = stale_pages
+    else:
+        pages_to_render = pages
+
+    results = render_pages(
+        pages_to_render,
+        jobs,
+        template_path=template_path,
+        basepath=basepath,
+        content_directories=content_directories,
+        generate_navbar=generate_navbar,
+        template=template,
+        nav_bar=nav_bar,
+        mark_active_nav=mark_active_nav,
+        stream=stream,
+        parse_cache=parse_cache,
+        collect_terms=search_terms is not None,
+    )
+
+    if search_terms is not None:
+        for page, page_info in zip(pages_to_render, results):
+            if page_info and page_info.terms is not None:
+                search_terms[page.source_rel] = page_info.terms
+
+    if page_index is not None:
+        for page, page_info in zip(pages_to_render, results):
+            if page_info:
+                page_index.record(page.source_rel, page.source_path, page.output_rel, basepath, page_info)
+            else:
+                page_index.forget(page.source_rel)
+        page_index.retain(page.source_rel for page in pages)
+
+    if manifest is None:
+        return
+
+    for page, written in zip(pages_to_render, results):
+        if written is None:
+            manifest.pages.pop(page.source_rel, None)
+        elif written:
+            manifest.record_page(page.source_rel, page.source_path, page.output_rel)
+        elif os.path.exists(page.output_path):
+            # The source no longer produces a page; drop the output of a previous build.
+            os.remove(page.output_path)
+
+    manifest.remove_stale_pages({page.source_rel for page in pages}, output_dir)
+
+
+def build_settings(
+    content_dir: str,
+    template_path: str,
+    basepath: str,
+    generate_navbar: bool,
+    mark_active_nav: bool = False,
+    minify: bool = False,
+    asset_map: dict[str, str] | None = None,
+    image_sizes: dict[str, tuple[int, int]] | None = None,
+) -> dict:
+    """
+    Collects the build-wide inputs that affect every generated page.
+
+    A change in any of them (template contents, base path, navbar and minify
+    flags, the top-level content directories listed in the navbar, the
+    fingerprinted asset names or the image dimensions) invalidates every page
+    recorded in the build manifest.
+
+    Args:
+        content_dir: The path to the source content directory.
+        template_path: The path to the HTML template file.
+        basepath: The base URL path of the site.
+        generate_navbar: Whether pages include the navigation bar.
+        mark_active_nav: Whether each page marks its section as active in the navbar.
+        minify: Whether the page HTML is minified.
+        asset_map: Asset paths mapped to their fingerprinted paths.
+        image_sizes: Image paths mapped to the dimensions added to `<img>` tags.
+
+    Returns:
+        A JSON-serializable dictionary of settings.
+    """
+    try:
+        template_hash = file_hash(template_path)
+    except OSError:
+        template_hash = None
+
+    content_directories = []
+    if generate_navbar and os.path.isdir(content_dir):
+        content_directories = list_content_directories(content_dir)
+
+    return {
+        "template_hash": template_hash,
+        "basepath": basepath,
+        "navbar": generate_navbar,
+        "nav_active": generate_navbar and mark_active_nav,
+        "minify": minify,
+        "assets": inputs_digest(asset_map) if asset_map else None,
+        "images": inputs_digest(image_sizes) if image_sizes else None,
+        "content_directories": content_directories,
+    }
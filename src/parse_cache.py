@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import os
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRNAME = ".ssg-cache"
+DEFAULT_MAX_BYTES = 64 << 20
+
+# Bump to invalidate every cached document when parsing changes in a way the
+# source stamp below would not catch (e.g. a dependency upgrade).
+PARSER_VERSION = 1
+
+# Modules whose code determines the HTML a markdown document parses to.
+_PARSER_MODULES = ("markdown_parser.py", "htmlnode.py", "textnode.py")
+
+
+@lru_cache(maxsize=None)
+def parser_stamp() -> str:
+    """
+    Returns a stamp identifying the parser: PARSER_VERSION combined with a hash
+    of the parser's source files, so cached documents are never reused after
+    the parser changes.
+    """
+    digest = hashlib.sha256(str(PARSER_VERSION).encode())
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in _PARSER_MODULES:
+        with open(os.path.join(src_dir, module), "rb") as module_file:
+            digest.update(module_file.read())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    A persistent cache of the content HTML rendered from markdown documents.
+
+    Entries are files named after the hash of the markdown text and the parser
+    stamp, so a document is only parsed again when its text or the parser
+    changed. A hit refreshes the entry's mtime; `prune` evicts the least
+    recently used entries once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, markdown: str) -> str:
+        """
+        Returns the cache key of a markdown document.
+        """
+        digest = hashlib.sha256(parser_stamp().encode())
+        digest.update(markdown.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".html")
+
+    def get(self, key: str) -> str | None:
+        """
+        Returns the cached content HTML for `key`, or None on a miss.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as entry_file:
+                html = entry_file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Ignoring unreadable parse cache entry %s: %s", path, e)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def put(self, key: str, html: str) -> None:
+        """
+        Stores the content HTML for `key`. Failing to write the cache is logged, not raised.
+        """
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as entry_file:
+                entry_file.write(html)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write parse cache entry %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prune(self) -> int:
+        """
+        Evicts the least recently used entries until the cache fits in `max_bytes`.
+
+        Returns:
+            The number of entries evicted.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            logger.info("Evicted %d entries from the parse cache %s.", evicted, self.directory)
+        return evicted
@@ -0,0 +1,116 @@
+import concurrent.futures
+import gzip
+import logging
+import os
+from typing import NamedTuple
+
+from src.deploy import replace_if_changed
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = frozenset({".html", ".css", ".js", ".xml", ".json"})
+DEFAULT_MIN_SIZE = 1024
+GZIP_SUFFIX = ".gz"
+
+
+class CompressResult(NamedTuple):
+    """
+    The outcome of a precompression pass: the record of compressed files to
+    store for the next build (output path mapped to the content hash its
+    sidecar was written from), and the output paths per action.
+    """
+
+    compressed: dict[str, str]
+    written: list[str]
+    skipped: list[str]
+    removed: list[str]
+
+
+def write_gzip_sidecar(path: str) -> bool:
+    """
+    Writes `<path>.gz` at maximum compression. The sidecar is reproducible (no
+    file name or timestamp in its header), and left untouched when unchanged.
+
+    Args:
+        path: The file to compress.
+
+    Returns:
+        True if a sidecar exists afterwards; False if compression would not make
+        the file smaller, in which case no sidecar is kept.
+    """
+    with open(path, "rb") as source_file:
+        data = source_file.read()
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    sidecar_path = path + GZIP_SUFFIX
+    if len(compressed) >= len(data):
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+        return False
+
+    tmp_path = sidecar_path + ".tmp"
+    with open(tmp_path, "wb") as sidecar_file:
+        sidecar_file.write(compressed)
+    replace_if_changed(tmp_path, sidecar_path)
+    return True
+
+
+def is_compressible(rel_path: str, size: int, min_size: int) -> bool:
+    return os.path.splitext(rel_path)[1] in COMPRESSIBLE_EXTENSIONS and size >= min_size
+
+
+def precompress_outputs(
+    output_dir: str,
+    outputs: dict[str, dict],
+    previous: dict[str, str] | None = None,
+    min_size: int = DEFAULT_MIN_SIZE,
+    jobs: int | None = None,
+) -> CompressResult:
+    """
+    Writes `.gz` sidecars next to the compressible outputs, for servers that
+    serve precompressed files (e.g. nginx `gzip_static`).
+
+    Outputs whose content hash matches the one their sidecar was written from
+    are skipped. Sidecars of outputs that were removed, shrank below
+    `min_size` or are no longer compressed are deleted. The files are
+    compressed on a thread pool; zlib releases the GIL while compressing, so
+    the work spreads across cores.
+
+    Args:
+        output_dir: The build output directory.
+        outputs: The output record of `deploy.hash_outputs`.
+        previous: The `compressed` record of the previous pass.
+        min_size: Outputs smaller than this many bytes are not compressed.
+        jobs: The number of files compressed in parallel, defaulting to the number of CPUs.
+
+    Returns:
+        The CompressResult.
+    """
+    previous = previous or {}
+    compressed, skipped, pending = {}, [], []
+    for rel_path, entry in sorted(outputs.items()):
+        if not is_compressible(rel_path, entry["size"], min_size):
+            continue
+        sidecar_path = os.path.join(output_dir, rel_path + GZIP_SUFFIX)
+        if previous.get(rel_path) == entry["hash"] and os.path.exists(sidecar_path):
+            compressed[rel_path] = entry["hash"]
+            skipped.append(rel_path)
+        else:
+            pending.append(rel_path)
+
+    written = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs or os.cpu_count() or 1)) as executor:
+        paths = [os.path.join(output_dir, rel_path) for rel_path in pending]
+        for rel_path, kept in zip(pending, executor.map(write_gzip_sidecar, paths)):
+            if kept:
+                compressed[rel_path] = outputs[rel_path]["hash"]
+                written.append(rel_path)
+
+    removed = []
+    for rel_path in sorted(set(previous) - set(compressed)):
+        sidecar_path = os.path.join(output_dir, rel_path + GZIP_SUFFIX)
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+            removed.append(rel_path + GZIP_SUFFIX)
+
+    logger.info("Precompression: %d written, %d unchanged, %d removed.", len(written), len(skipped), len(removed))
+    return CompressResult(compressed, written, skipped, removed)
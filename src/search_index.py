@@ -0,0 +1,305 @@
+"""
+A client-side search index written into the output directory.
+
+The index is an inverted index sharded by the first characters of each term,
+so a browser only fetches the shards the query terms fall into:
+
+    search/meta.json     {"version", "prefix_length", "docs": {doc id: [url, title]}}
+    search/<prefix>.json {term: [[doc id, term frequency], ...]}
+
+The terms of each page are counted while the page is generated and kept in a
+forward index (`.search-index.json` in the build state directory), so an incremental build only takes the
+terms of changed pages and only rewrites the shards whose terms changed.
+"""
+
+import itertools
+import json
+import logging
+import os
+import re
+import shutil
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+from src.front_matter import read_header
+from src.htmlnode import HTMLNode
+from src.markdown_parser import cached_block_to_html_node, iter_markdown_blocks
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DIRNAME = "search"
+SEARCH_STATE_FILENAME = ".search-index.json"
+SEARCH_INDEX_VERSION = 1
+PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+
+_TERM_PATTERN = re.compile(r"\w+")
+_SAFE_PREFIX_PATTERN = re.compile(r"^[a-z0-9]+$")
+
+
+def node_texts(node: HTMLNode) -> Iterator[str]:
+    """
+    Yields the text of the leaf nodes of a tree, including image alt text.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.children is not None:
+            stack.extend(reversed(current.children))
+            continue
+        if current.value:
+            yield current.value
+        if current.props and current.props.get("alt"):
+            yield current.props["alt"]
+
+
+def count_terms(terms: Counter, node: HTMLNode) -> None:
+    """
+    Adds the terms of the text nodes of a rendered markdown tree to `terms`.
+
+    Only text is indexed, so markdown syntax and link targets are not.
+    """
+    for text in node_texts(node):
+        terms.update(term for term in _TERM_PATTERN.findall(text.lower()) if len(term) >= MIN_TERM_LENGTH)
+
+
+def page_terms(source_path: str) -> dict[str, int]:
+    """
+    Reads a markdown page block by block and counts its terms, for pages whose
+    terms were not collected while they were generated.
+
+    Args:
+        source_path: The markdown file.
+
+    Returns:
+        The lowercased terms of the page, outside its front matter, mapped to
+        their frequency.
+    """
+    terms = Counter()
+    with open(source_path, "r", encoding="utf-8") as source_file:
+        _, pushed_back = read_header(source_file)
+        for block in iter_markdown_blocks(itertools.chain(pushed_back, source_file)):
+            count_terms(terms, cached_block_to_html_node(block))
+    return dict(terms)
+
+
+def shard_name(term: str) -> str:
+    """
+    Returns the shard a term is stored in: its first PREFIX_LENGTH characters,
+    or "_" when those are not safe in a file name.
+    """
+    prefix = term[:PREFIX_LENGTH]
+    return prefix if _SAFE_PREFIX_PATTERN.match(prefix) else "_"
+
+
+class SearchIndex:
+    """
+    Builds and incrementally updates the sharded search index of a site.
+
+    `pages` maps each source path (relative to the content directory) to its
+    document id, the source size and mtime the terms were read at, and the terms.
+    """
+
+    def __init__(self, output_dir: str, state_dir: str, pages: dict[str, dict] | None = None, next_id: int = 0):
+        self.output_dir = output_dir
+        self.state_dir = state_dir
+        self.pages = pages or {}
+        self.next_id = next_id
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.state_dir, SEARCH_STATE_FILENAME)
+
+    @classmethod
+    def load(cls, output_dir: str, state_dir: str) -> "SearchIndex":
+        """
+        Loads the forward index of the previous build from `state_dir`. A
+        missing, unreadable or outdated one yields an empty index, which takes
+        the terms of every page again.
+        """
+        path = os.path.join(state_dir, SEARCH_STATE_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as state_file:
+                data = json.load(state_file)
+        except FileNotFoundError:
+            return cls(output_dir, state_dir)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable search index state %s: %s", path, e)
+            return cls(output_dir, state_dir)
+        if not isinstance(data, dict) or data.get("version") != SEARCH_INDEX_VERSION:
+            return cls(output_dir, state_dir)
+        return cls(output_dir, state_dir, data.get("pages"), data.get("next_id", 0))
+
+    def update(
+        self, page_entries: dict[str, dict], content_dir: str, collected: dict[str, dict[str, int]] | None = None
+    ) -> set[str]:
+        """
+        Brings the forward index in line with the page index: pages that are new
+        or whose source changed take their terms from `collected`, or are read
+        again when their terms were not collected, and removed pages are dropped.
+
+        Args:
+            page_entries: The page index entries, keyed by source path.
+            content_dir: The content directory the source paths are relative to.
+            collected: The terms counted while generating pages, keyed by source path.
+
+        Returns:
+            The shards whose postings may have changed.
+        """
+        changed_shards = set()
+        for source_rel in set(self.pages) - set(page_entries):
+            changed_shards.update(shard_name(term) for term in self.pages.pop(source_rel)["terms"])
+
+        for source_rel, entry in page_entries.items():
+            previous = self.pages.get(source_rel)
+            if previous and previous["size"] == entry["size"] and previous["mtime_ns"] == entry["mtime_ns"]:
+                continue
+            terms = (collected or {}).get(source_rel)
+            if terms is None:
+                terms = page_terms(os.path.join(content_dir, source_rel))
+            if previous:
+                doc_id = previous["id"]
+                old_terms = previous["terms"]
+                changed_terms = {
+                    term for term in old_terms.keys() | terms.keys() if old_terms.get(term) != terms.get(term)
+                }
+            else:
+                doc_id = self.next_id
+                self.next_id += 1
+                changed_terms = terms.keys()
+            changed_shards.update(shard_name(term) for term in changed_terms)
+            self.pages[source_rel] = {
+                "id": doc_id,
+                "size": entry["size"],
+                "mtime_ns": entry["mtime_ns"],
+                "terms": terms,
+            }
+        return changed_shards
+
+    def shard_postings(self, shards: set[str]) -> dict[str, dict[str, list[list[int]]]]:
+        """
+        Collects the postings of the given shards from the forward index.
+
+        Returns:
+            For each shard, its terms mapped to sorted [doc id, frequency] pairs.
+        """
+        postings = {shard: {} for shard in shards}
+        for page in self.pages.values():
+            for term, frequency in page["terms"].items():
+                shard = postings.get(shard_name(term))
+                if shard is not None:
+                    shard.setdefault(term, []).append([page["id"], frequency])
+        for shard in postings.values():
+            for term_postings in shard.values():
+                term_postings.sort()
+        return postings
+
+    def write(self, page_entries: dict[str, dict], shards: Iterable[str]) -> list[str]:
+        """
+        Writes the given shards and the document list, then saves the forward index.
+
+        Shards without terms are removed; files whose contents did not change
+        are left untouched.
+
+        Args:
+            page_entries: The page index entries, keyed by source path.
+            shards: The shards to rewrite.
+
+        Returns:
+            The files written or removed, relative to the output directory.
+        """
+        search_dir = os.path.join(self.output_dir, SEARCH_DIRNAME)
+        os.makedirs(search_dir, exist_ok=True)
+        updated = []
+        for shard, postings in sorted(self.shard_postings(set(shards)).items()):
+            path = os.path.join(search_dir, f"{shard}.json")
+            if postings:
+                if _write_json_if_changed(path, dict(sorted(postings.items()))):
+                    updated.append(f"{SEARCH_DIRNAME}/{shard}.json")
+            elif os.path.exists(path):
+                os.remove(path)
+                updated.append(f"{SEARCH_DIRNAME}/{shard}.json")
+
+        docs = {
+            str(page["id"]): [page_entries[source_rel]["url"], page_entries[source_rel]["title"]]
+            for source_rel, page in sorted(self.pages.items(), key=lambda item: item[1]["id"])
+        }
+        meta = {"version": SEARCH_INDEX_VERSION, "prefix_length": PREFIX_LENGTH, "docs": docs}
+        if _write_json_if_changed(os.path.join(search_dir, "meta.json"), meta):
+            updated.append(f"{SEARCH_DIRNAME}/meta.json")
+
+        state = {"version": SEARCH_INDEX_VERSION, "next_id": self.next_id, "pages": self.pages}
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file, separators=(",", ":"))
+        os.replace(self.state_path + ".tmp", self.state_path)
+        return updated
+
+    def all_shards(self) -> set[str]:
+        """
+        Returns every shard of the index, including stale shard files on disk.
+        """
+        shards = {shard_name(term) for page in self.pages.values() for term in page["terms"]}
+        search_dir = os.path.join(self.output_dir, SEARCH_DIRNAME)
+        if os.path.isdir(search_dir):
+            shards.update(name[: -len(".json")] for name in os.listdir(search_dir) if name.endswith(".json"))
+        shards.discard("meta")
+        return shards
+
+
+def _write_json_if_changed(path: str, data) -> bool:
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    try:
+        with open(path, "r", encoding="utf-8") as json_file:
+            if json_file.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path + ".tmp", "w", encoding="utf-8") as json_file:
+        json_file.write(text)
+    os.replace(path + ".tmp", path)
+    return True
+
+
+def update_search_index(
+    output_dir: str,
+    state_dir: str,
+    content_dir: str,
+    page_entries: dict[str, dict],
+    collected: dict[str, dict[str, int]] | None = None,
+) -> list[str]:
+    """
+    Updates the search index in `output_dir` for the pages of the page index,
+    taking the terms of only the pages that changed since the previous build.
+
+    Args:
+        output_dir: The build output directory.
+        state_dir: The build state directory, which keeps the forward index.
+        content_dir: The content directory.
+        page_entries: The page index entries, keyed by source path.
+        collected: The terms counted while generating pages, keyed by source path;
+                   changed pages missing from it are read again.
+
+    Returns:
+        The files written or removed, relative to `output_dir`.
+    """
+    index = SearchIndex.load(output_dir, state_dir)
+    rebuild = not index.pages
+    changed_shards = index.update(page_entries, content_dir, collected)
+    shards = index.all_shards() if rebuild else changed_shards
+    updated = index.write(page_entries, shards)
+    logger.info("Search index: %d pages, %d files updated.", len(index.pages), len(updated))
+    return updated
+
+
+def remove_search_index(output_dir: str, state_dir: str) -> None:
+    """
+    Deletes the search index from `output_dir` and its forward index from
+    `state_dir`, e.g. after search was turned off.
+    """
+    state_path = os.path.join(state_dir, SEARCH_STATE_FILENAME)
+    if not os.path.exists(state_path):
+        return
+    shutil.rmtree(os.path.join(output_dir, SEARCH_DIRNAME), ignore_errors=True)
+    os.remove(state_path)
+    logger.info("Removed the search index from %s", output_dir)
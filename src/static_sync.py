@@ -0,0 +1,163 @@
+import logging
+import os
+import shutil
+from typing import NamedTuple
+
+from src.deploy import replace_if_changed
+from src.manifest import file_hash
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large are copied with os.copy_file_range where available,
+# which lets the kernel copy (or reflink) them without passing through Python.
+LARGE_FILE_THRESHOLD = 1 << 20
+
+
+class SyncResult(NamedTuple):
+    """
+    The outcome of a static sync: the record of synced files to store for the
+    next build, and the paths (relative to the static directory) per action.
+    """
+
+    synced: dict[str, dict]
+    copied: list[str]
+    skipped: list[str]
+    removed: list[str]
+
+
+def _copy_file_range(source: str, destination: str) -> None:
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        remaining = os.fstat(source_file.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(source_file.fileno(), destination_file.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_asset(source: str, destination: str, hardlink: bool = False) -> None:
+    """
+    Copies a file, preserving its mtime, by writing a temporary file and
+    replacing the destination with it. A destination with identical contents
+    is left untouched.
+
+    Replacing rather than overwriting matters when the destination is a
+    hardlink to the source: writing into it would modify the source.
+
+    Args:
+        source: The file to copy.
+        destination: The path to copy it to. Parent directories are created.
+        hardlink: Link the destination to the source instead of copying it,
+                  falling back to a copy when linking fails (e.g. across file systems).
+    """
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp_path = destination + ".tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    try:
+        if hardlink:
+            try:
+                os.link(source, tmp_path)
+                os.replace(tmp_path, destination)
+                return
+            except OSError as e:
+                logger.debug("Could not hardlink %s, copying instead: %s", source, e)
+
+        if hasattr(os, "copy_file_range") and os.path.getsize(source) >= LARGE_FILE_THRESHOLD:
+            try:
+                _copy_file_range(source, tmp_path)
+            except OSError:
+                shutil.copyfile(source, tmp_path)
+        else:
+            shutil.copyfile(source, tmp_path)
+        shutil.copystat(source, tmp_path)
+        replace_if_changed(tmp_path, destination)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def is_up_to_date(source: str, destination: str, use_hash: bool = False) -> bool:
+    """
+    Checks whether a synced copy still matches its source.
+
+    Args:
+        source: The source file.
+        destination: The copy in the output directory.
+        use_hash: Compare contents by hash instead of comparing mtimes.
+
+    Returns:
+        True if the destination does not need to be copied again.
+    """
+    try:
+        destination_stat = os.stat(destination)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source)
+
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if use_hash:
+        return file_hash(source) == file_hash(destination)
+    return source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+
+def sync_static(
+    static_dir: str,
+    output_dir: str,
+    previous: dict[str, dict] | None = None,
+    use_hash: bool = False,
+    hardlink: bool = False,
+) -> SyncResult:
+    """
+    Mirrors the static directory into the output directory, copying only the
+    files that changed and removing the copies of files that were deleted.
+
+    Args:
+        static_dir: The static assets directory.
+        output_dir: The build output directory.
+        previous: The `synced` record of the previous sync, used to find deleted files.
+        use_hash: Decide whether a file changed by content hash instead of size and mtime.
+        hardlink: Hardlink assets into the output directory instead of copying them.
+
+    Returns:
+        The SyncResult.
+
+    Raises:
+        FileNotFoundError: If the static directory does not exist.
+    """
+    if not os.path.isdir(static_dir):
+        raise FileNotFoundError(static_dir)
+
+    synced, copied, skipped = {}, [], []
+    for root, _, files in os.walk(static_dir):
+        for file in files:
+            source = os.path.join(root, file)
+            rel_path = os.path.relpath(source, static_dir)
+            destination = os.path.join(output_dir, rel_path)
+
+            stat = os.stat(source)
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            # A source unchanged since the previous sync is up to date even when its
+            # copy kept an older mtime because the contents were identical.
+            unchanged = not use_hash and (previous or {}).get(rel_path) == record and os.path.exists(destination)
+            if unchanged or is_up_to_date(source, destination, use_hash):
+                skipped.append(rel_path)
+            else:
+                copy_asset(source, destination, hardlink)
+                copied.append(rel_path)
+            synced[rel_path] = record
+
+    removed = []
+    for rel_path in sorted(set(previous or {}) - set(synced)):
+        destination = os.path.join(output_dir, rel_path)
+        try:
+            os.remove(destination)
+            removed.append(rel_path)
+        except FileNotFoundError:
+            pass
+
+    logger.info("Static sync: %d copied, %d unchanged, %d removed.", len(copied), len(skipped), len(removed))
+    return SyncResult(synced, copied, skipped, removed)
@@ -0,0 +1,213 @@
+import re
+from collections.abc import Callable
+from typing import TextIO
+
+from src.htmlnode import HTMLNode
+from src.minify import minify_html
+
+TEMPLATE_SLOTS = ("Title", "nav", "Content", "Footer")
+
+_SLOT_PATTERN = re.compile(r"\{\{ (" + "|".join(TEMPLATE_SLOTS) + r") \}\}")
+_ROOT_URL_PATTERN = re.compile(r'(href|src)="/([^"?#]*)')
+_IMG_TAG_PATTERN = re.compile(r"<img\b[^>]*>")
+_IMG_SRC_PATTERN = re.compile(r'\ssrc="/([^"?#]*)')
+
+
+def rewrite_basepath(html: str, basepath: str, asset_map: dict[str, str] | None = None) -> str:
+    """
+    Prefixes root-relative `href` and `src` attributes with the site base path.
+
+    Args:
+        html: The HTML to rewrite.
+        basepath: The base URL path, ending with '/'.
+        asset_map: Asset paths (relative to the site root) mapped to their
+                   fingerprinted paths; references to them are rewritten too.
+
+    Returns:
+        The rewritten HTML.
+    """
+    if asset_map:
+        return _ROOT_URL_PATTERN.sub(
+            lambda match: f'{match.group(1)}="{basepath}{asset_map.get(match.group(2), match.group(2))}', html
+        )
+    if basepath == "/":
+        return html
+    return html.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+
+def add_image_dimensions(html: str, image_sizes: dict[str, tuple[int, int]]) -> str:
+    """
+    Adds `width`, `height`, `loading="lazy"` and `decoding="async"` to the
+    `<img>` tags of local images, so browsers reserve their space before they
+    load. Attributes a tag already has are kept.
+
+    Args:
+        html: The HTML to rewrite; `src` attributes must not have the base path applied yet.
+        image_sizes: Image paths (relative to the site root) mapped to their (width, height).
+
+    Returns:
+        The rewritten HTML.
+    """
+
+    def add(match: re.Match) -> str:
+        tag = match.group(0)
+        src = _IMG_SRC_PATTERN.search(tag)
+        size = image_sizes.get(src.group(1)) if src else None
+        if size is None:
+            return tag
+        attributes = {"width": size[0], "height": size[1], "loading": "lazy", "decoding": "async"}
+        added = "".join(f' {name}="{value}"' for name, value in attributes.items() if f" {name}=" not in tag)
+        if tag.endswith("/>"):
+            return f"{tag[:-2].rstrip()}{added} />"
+        return f"{tag[:-1]}{added}>"
+
+    return _IMG_TAG_PATTERN.sub(add, html) if "<img" in html else html
+
+
+class PageTemplate:
+    """
+    An HTML page template compiled once per build.
+
+    The template is split at its `{{ Title }}`, `{{ nav }}`, `{{ Content }}` and
+    `{{ Footer }}` slots. The template is optionally minified as a whole, with
+    its slots in place, so elements spanning a slot (e.g. a `<script>` using
+    `{{ Title }}`) are minified as one; the static segments between the slots
+    then have the base path, asset reference and image dimension rewriting
+    applied at compile time, so rendering a page only rewrites the slot values
+    and joins the pieces once.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        basepath: str = "/",
+        minify: bool = False,
+        asset_map: dict[str, str] | None = None,
+        image_sizes: dict[str, tuple[int, int]] | None = None,
+    ):
+        """
+        Compiles a template.
+
+        Args:
+            source: The template HTML.
+            basepath: The base URL path applied to root-relative links, ending with '/'.
+            minify: Whether to strip comments and insignificant whitespace from the
+                    template (not from the slot values).
+            asset_map: Asset paths mapped to their fingerprinted paths, as written by
+                       `fingerprint.fingerprint_assets`.
+            image_sizes: Image paths mapped to the (width, height) added to the
+                         `<img>` tags showing them, as found by `image_size.probe_static_images`.
+        """
+        self.basepath = basepath
+        self.minify = minify
+        self.asset_map = asset_map or {}
+        self.image_sizes = image_sizes or {}
+        self.segments = []
+        self.slots = []
+
+        if minify:
+            source = minify_html(source)
+        position = 0
+        for match in _SLOT_PATTERN.finditer(source):
+            self.segments.append(self.rewrite(source[position : match.start()]))
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.segments.append(self.rewrite(source[position:]))
+
+    @property
+    def rewrites(self) -> bool:
+        """
+        Whether the HTML written into the template needs rewriting at all.
+        """
+        return self.basepath != "/" or bool(self.asset_map) or bool(self.image_sizes)
+
+    def rewrite(self, html: str) -> str:
+        """
+        Applies the image dimensions, the asset map and the base path to a piece of HTML.
+        """
+        if self.image_sizes:
+            html = add_image_dimensions(html, self.image_sizes)
+        return rewrite_basepath(html, self.basepath, self.asset_map)
+
+    @classmethod
+    def load(
+        cls,
+        template_path: str,
+        basepath: str = "/",
+        minify: bool = False,
+        asset_map: dict[str, str] | None = None,
+        image_sizes: dict[str, tuple[int, int]] | None = None,
+    ) -> "PageTemplate":
+        """
+        Reads and compiles the template at `template_path`.
+
+        Raises:
+            FileNotFoundError: If the template does not exist.
+        """
+        with open(template_path, "r", encoding="utf-8") as template_file:
+            return cls(template_file.read(), basepath, minify, asset_map, image_sizes)
+
+    def render(self, title: str = "", nav: str = "", content: str = "", footer: str = "") -> str:
+        """
+        Fills the template slots and returns the page HTML.
+
+        Args:
+            title: The page title.
+            nav: The navigation bar HTML.
+            content: The page content HTML.
+            footer: The footer HTML.
+
+        Returns:
+            The populated page, with the slot values rewritten by `rewrite`.
+        """
+        values = {"Title": title, "nav": nav, "Content": content, "Footer": footer}
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(self.rewrite(values[slot]))
+            parts.append(segment)
+        return "".join(parts)
+
+    def write(
+        self,
+        out: TextIO,
+        title: str = "",
+        nav: str = "",
+        content: "str | HTMLNode | Callable[[TextIO], None]" = "",
+        footer: str = "",
+    ) -> None:
+        """
+        Writes the populated page to a text stream without building the page string.
+
+        A content node is streamed with `HTMLNode.write_html`, and a content
+        callable is called with the stream to write to; in both cases each piece
+        is rewritten by `rewrite` as it is written.
+
+        Args:
+            out: The text stream (e.g. an open file) to write to.
+            title: The page title.
+            nav: The navigation bar HTML.
+            content: The page content, as HTML, as a node tree, or as a callable
+                     that writes the content HTML to the stream it is given.
+            footer: The footer HTML.
+        """
+        writer = _RewritingWriter(out, self.rewrite) if self.rewrites else out
+        values = {"Title": title, "nav": nav, "Content": content, "Footer": footer}
+        out.write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values[slot]
+            if isinstance(value, str):
+                out.write(self.rewrite(value))
+            elif isinstance(value, HTMLNode):
+                value.write_html(writer)
+            else:
+                value(writer)
+            out.write(segment)
+
+
+class _RewritingWriter:
+    def __init__(self, out: TextIO, rewrite: Callable[[str], str]):
+        self.out = out
+        self.rewrite = rewrite
+
+    def write(self, piece: str) -> None:
+        self.out.write(self.rewrite(piece))
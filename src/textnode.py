@@ -18,6 +18,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = ""):
 
         if not isinstance(text_type, TextType):
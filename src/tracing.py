@@ -0,0 +1,123 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Span that wraps the generation of one page; used for the slowest-pages summary.
+PAGE_SPAN = "page"
+
+
+class _Span:
+    __slots__ = ("owner", "name", "args", "start_ns")
+
+    def __init__(self, owner: "Tracer", name: str, args: dict):
+        self.owner = owner
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self) -> "_Span":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.owner.add_span(self.name, self.start_ns, time.perf_counter_ns(), **self.args)
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """
+    Records build stages as spans and exports them in the Chrome trace-event
+    format (viewable in chrome://tracing or Perfetto).
+
+    Tracing is disabled by default, in which case `span` returns a shared no-op
+    context manager and nothing is recorded.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: list[dict] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def span(self, name: str, **args):
+        """
+        Returns a context manager that records the time spent in its block.
+
+        Args:
+            name: The stage name, e.g. "parse".
+            **args: Extra details shown with the span, e.g. the source path.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, **args) -> None:
+        """
+        Records a completed span given its `time.perf_counter_ns` bounds.
+        """
+        self.events.append(
+            {
+                "name": name,
+                "cat": "build",
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+                "args": args,
+            }
+        )
+
+    def drain(self) -> list[dict]:
+        """
+        Returns and forgets the recorded events, e.g. to send them from a worker
+        process back to the main process.
+        """
+        events, self.events = self.events, []
+        return events
+
+    def extend(self, events: list[dict]) -> None:
+        self.events.extend(events)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Writes the recorded spans as a Chrome trace-event JSON file.
+        """
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+
+    def summary(self, top: int = 10) -> str:
+        """
+        Summarizes the recorded spans.
+
+        Args:
+            top: The number of slowest pages to list.
+
+        Returns:
+            A report of the slowest pages and the total time spent in each stage.
+        """
+        stage_totals = defaultdict(float)
+        stage_counts = defaultdict(int)
+        pages = []
+        for event in self.events:
+            stage_totals[event["name"]] += event["dur"]
+            stage_counts[event["name"]] += 1
+            if event["name"] == PAGE_SPAN:
+                pages.append((event["dur"], event["args"].get("source", "?")))
+
+        lines = [f"Slowest pages (top {min(top, len(pages))} of {len(pages)}):"]
+        for duration, source in sorted(pages, reverse=True)[:top]:
+            lines.append(f"  {duration / 1000:>10.2f} ms  {source}")
+        lines.append("Total time per stage:")
+        for name, total in sorted(stage_totals.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"  {total / 1000:>10.2f} ms  {name} ({stage_counts[name]} spans)")
+        return "\n".join(lines)
+
+
+tracer = Tracer()
@@ -0,0 +1,274 @@
+import logging
+import os
+import time
+from collections.abc import Iterable
+from dataclasses import replace
+from typing import NamedTuple
+
+from src.build import (
+    BuildConfig,
+    build_site,
+    fingerprint_site,
+    probe_site_images,
+    site_settings,
+    write_search_index,
+    write_site_feeds,
+)
+from src.fingerprint import build_asset_map
+from src.header import build_nav_bar
+from src.image_size import image_size_map
+from src.manifest import BuildManifest, file_hash
+from src.page_index import PageIndex
+from src.pages import list_content_directories, make_page, render_page
+from src.precompress import precompress_outputs
+from src.static_sync import sync_static
+from src.template import PageTemplate
+
+logger = logging.getLogger(__name__)
+
+# How often --watch polls the source directories, in seconds.
+WATCH_INTERVAL = 0.5
+
+
+class FileChanges(NamedTuple):
+    """
+    The files added, changed and removed in a directory since the last poll,
+    as paths relative to that directory.
+    """
+
+    added: set[str]
+    changed: set[str]
+    removed: set[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def all(self) -> set[str]:
+        return self.added | self.changed | self.removed
+
+
+def scan_directory(directory: str) -> dict[str, tuple[int, int]]:
+    """
+    Records the mtime and size of every file under a directory.
+
+    Args:
+        directory: The directory to scan. A missing directory has no files.
+
+    Returns:
+        A mapping of paths relative to `directory` to (mtime_ns, size).
+    """
+    stats = {}
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            stats[os.path.relpath(entry.path, directory)] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+class DirectoryWatcher:
+    """
+    Detects file changes in a directory tree by polling it against a cache of
+    the previous scan's mtimes and sizes.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.stats = scan_directory(directory)
+
+    def poll(self) -> FileChanges:
+        """
+        Rescans the directory and returns what changed since the previous scan.
+        """
+        stats = scan_directory(self.directory)
+        old_paths = self.stats.keys()
+        new_paths = stats.keys()
+        changes = FileChanges(
+            added=set(new_paths - old_paths),
+            changed={path for path in new_paths & old_paths if stats[path] != self.stats[path]},
+            removed=set(old_paths - new_paths),
+        )
+        self.stats = stats
+        return changes
+
+
+def precompress_rewritten(config: BuildConfig, manifest: BuildManifest, rel_paths: Iterable[str]) -> None:
+    """
+    Brings the `.gz` sidecars of the outputs a watch rebuild wrote or removed
+    up to date, hashing only those outputs instead of the whole output
+    directory. Nothing is done when neither this nor a previous build compresses.
+
+    Args:
+        config: The build configuration.
+        manifest: The build manifest; its record of compressed outputs is updated.
+        rel_paths: The outputs written or removed, relative to the output directory.
+    """
+    if not config.gzip and not manifest.compressed:
+        return
+    rel_paths = {rel_path.replace(os.sep, "/") for rel_path in rel_paths}
+    outputs = {}
+    for rel_path in rel_paths:
+        path = os.path.join(config.output_dir, rel_path)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            outputs[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_hash(path)}
+    previous = {rel_path: digest for rel_path, digest in manifest.compressed.items() if rel_path in rel_paths}
+    if config.gzip:
+        result = precompress_outputs(config.output_dir, outputs, previous, config.gzip_min_size)
+    else:
+        result = precompress_outputs(config.output_dir, {}, previous)
+    for rel_path in rel_paths:
+        manifest.compressed.pop(rel_path, None)
+    manifest.compressed.update(result.compressed)
+
+
+def rebuild_changed_content(config: BuildConfig, changes: FileChanges) -> None:
+    """
+    Regenerates only the pages affected by changes in the content directory.
+
+    Pages whose markdown changed are regenerated and the outputs of removed
+    ones are deleted, then the feeds, the search index and the `.gz` sidecars
+    are brought up to date. When the build-wide settings recorded in the
+    manifest no longer match (the template or the set of top-level directories
+    changed), the whole site is rebuilt instead.
+
+    Args:
+        config: The build configuration.
+        changes: The changes in the content directory since the last poll.
+    """
+    manifest = BuildManifest.load(config.state_dir)
+    if manifest.settings != site_settings(config, manifest):
+        logger.info("Template or content directories changed, rebuilding the whole site.")
+        build_site(replace(config, incremental=True))
+        return
+    page_index = PageIndex.load(config.state_dir)
+
+    changed_sources = sorted(path for path in changes.added | changes.changed if path.endswith(".md"))
+    removed_sources = {path for path in changes.removed if path.endswith(".md")}
+    search_terms = {}
+    updated = []
+
+    template = PageTemplate.load(
+        config.template_path,
+        config.basepath,
+        config.minify,
+        build_asset_map(manifest.assets),
+        image_size_map(manifest.images),
+    )
+    content_directories = list_content_directories(config.content_dir)
+    nav_bar = build_nav_bar(tuple(content_directories)) if config.generate_navbar else None
+    parse_cache = config.parse_cache()
+
+    for source_rel in changed_sources:
+        page = make_page(config.content_dir, config.output_dir, source_rel)
+        logger.info("Rebuilding changed page %s", page.source_path)
+        os.makedirs(os.path.dirname(page.output_path), exist_ok=True)
+        updated.append(page.output_rel)
+        page_info = render_page(
+            page,
+            config.template_path,
+            config.basepath,
+            content_directories,
+            config.generate_navbar,
+            template=template,
+            nav_bar=nav_bar,
+            mark_active_nav=config.mark_active_nav,
+            stream=config.stream,
+            parse_cache=parse_cache,
+            collect_terms=config.search_index,
+        )
+        if page_info and page_info.terms is not None:
+            search_terms[page.source_rel] = page_info.terms
+        if page_info:
+            manifest.record_page(page.source_rel, page.source_path, page.output_rel)
+            page_index.record(page.source_rel, page.source_path, page.output_rel, config.basepath, page_info)
+        else:
+            manifest.pages.pop(page.source_rel, None)
+            page_index.forget(page.source_rel)
+            if page_info is False and os.path.exists(page.output_path):
+                # The source no longer produces a page; drop the output of a previous build.
+                os.remove(page.output_path)
+
+    if removed_sources:
+        updated += manifest.remove_stale_pages(set(manifest.pages) - removed_sources, config.output_dir)
+        page_index.retain(set(page_index.pages) - removed_sources)
+    updated += write_site_feeds(config, manifest, page_index)
+    updated += write_search_index(config, page_index, search_terms)
+    precompress_rewritten(config, manifest, updated)
+    manifest.save()
+    page_index.save()
+
+
+def sync_changed_static(config: BuildConfig) -> None:
+    """
+    Re-syncs the static directory after a change. Only the files that changed
+    are copied, the copies of deleted ones are removed and the `.gz` sidecars
+    are brought up to date. When fingerprinted asset names or image dimensions
+    change, the pages are regenerated.
+
+    Args:
+        config: The build configuration.
+    """
+    manifest = BuildManifest.load(config.state_dir)
+    sync_result = sync_static(
+        config.static_dir, config.output_dir, manifest.static, config.static_hash, config.static_hardlink
+    )
+    manifest.static = sync_result.synced
+    previous = (build_asset_map(manifest.assets), image_size_map(manifest.images))
+    fingerprinted = fingerprint_site(config, manifest)
+    probe_site_images(config, manifest)
+    if (build_asset_map(manifest.assets), image_size_map(manifest.images)) != previous:
+        manifest.save()
+        logger.info("Fingerprinted asset names or image dimensions changed, regenerating the pages.")
+        build_site(replace(config, incremental=True))
+        return
+    precompress_rewritten(config, manifest, sync_result.copied + sync_result.removed + fingerprinted)
+    manifest.save()
+
+
+def watch_site(config: BuildConfig, interval: float = WATCH_INTERVAL) -> None:
+    """
+    Builds the site, then watches the content and static directories and
+    applies each change with the smallest rebuild that covers it, until
+    interrupted.
+
+    Args:
+        config: The build configuration.
+        interval: The polling interval in seconds.
+    """
+    build_site(config)
+
+    content_watcher = DirectoryWatcher(config.content_dir)
+    static_watcher = DirectoryWatcher(config.static_dir)
+    logger.info("Watching %s and %s for changes (Ctrl+C to stop)...", config.content_dir, config.static_dir)
+
+    try:
+        while True:
+            time.sleep(interval)
+            static_changes = static_watcher.poll()
+            if static_changes:
+                try:
+                    sync_changed_static(config)
+                except OSError as e:
+                    logger.error("Error copying static files: %s", e)
+
+            content_changes = content_watcher.poll()
+            if content_changes:
+                try:
+                    rebuild_changed_content(config, content_changes)
+                except Exception as e:
+                    logger.exception("Error rebuilding changed content: %s", e)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
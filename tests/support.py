@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from src.build import BuildConfig
+
+TEMPLATE = "<title>{{ Title }}</title><nav>{{ nav }}</nav><main>{{ Content }}</main>"
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A test case with a temporary directory, removed after each test.
+
+    `write` writes files relative to `write_dir`, which defaults to the
+    temporary directory; test cases working in a subdirectory (e.g. a static
+    directory) point it there in `setUp`.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.write_dir = self.root
+
+    def write(self, rel_path: str, data: str | bytes, directory: str | None = None, mtime_ns: int | None = None) -> str:
+        """
+        Writes text or bytes to a file, creating its parent directories.
+
+        Args:
+            rel_path: The file path relative to `directory`.
+            data: The file contents.
+            directory: The directory to write in, defaulting to `write_dir`.
+            mtime_ns: Set the file's atime and mtime to this value.
+
+        Returns:
+            The full path of the file.
+        """
+        path = os.path.join(directory or self.write_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+
+class SiteTestCase(TempDirTestCase):
+    """
+    A test case with a small site: a template, three pages and a stylesheet.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.static_dir = os.path.join(self.root, "static")
+        self.output_dir = os.path.join(self.root, "docs")
+        self.template_path = self.write("template.html", TEMPLATE, self.content_dir)
+        self.write("index.md", "# Home\n\nWelcome to the site.", self.content_dir)
+        self.write("blog/index.md", "# Blog\n\nThe posts.", self.content_dir)
+        self.write("contact/index.md", "# Contact\n\nWrite to us.", self.content_dir)
+        self.write("index.css", "body { color: red; }", self.static_dir)
+
+    def output(self, rel_path):
+        return os.path.join(self.output_dir, rel_path)
+
+    def read_output(self, rel_path):
+        with open(self.output(rel_path), encoding="utf-8") as f:
+            return f.read()
+
+    def config(self, **options):
+        return BuildConfig(self.content_dir, self.template_path, self.static_dir, self.output_dir, **options)
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from src import build, pages, search_index
+from src.build import BuildConfig, build_site
+from src.page_index import PageIndex
+from src.pages import generate_page
+from src.search_index import SEARCH_DIRNAME, page_terms
+from tests.support import TEMPLATE, SiteTestCase
+
+
+class TestBuildSite(SiteTestCase):
+    def test_build_state_is_kept_outside_the_output(self):
+        config = self.config(incremental=True, site_url="https://example.com", search_index=True)
+        build_site(config)
+        self.assertEqual(config.state_dir, os.path.join(self.root, ".ssg-state"))
+        self.assertEqual(
+            sorted(os.listdir(config.state_dir)),
+            [".build-manifest.json", ".deploy-changes.json", ".page-index.json", ".search-index.json"],
+        )
+        self.assertEqual([name for name in os.listdir(self.output_dir) if name.startswith(".")], [])
+
+        # Without the output the state is stale, so every output is written again.
+        shutil.rmtree(self.output_dir)
+        build_site(config)
+        self.assertTrue(os.path.exists(self.output("index.html")))
+        self.assertTrue(os.path.exists(self.output("index.css")))
+        self.assertTrue(os.path.exists(self.output(os.path.join(SEARCH_DIRNAME, "we.json"))))
+
+    def test_shared_state_directory_keeps_foreign_files(self):
+        state_dir = os.path.join(self.root, "shared")
+        foreign = self.write("important.txt", "keep me", state_dir)
+        config = self.config(state_dir=state_dir, search_index=True)
+        build_site(config)
+        shutil.rmtree(self.output_dir)
+        build_site(config)
+
+        self.assertTrue(os.path.exists(foreign))
+        self.assertTrue(os.path.exists(os.path.join(state_dir, ".build-manifest.json")))
+        self.assertTrue(os.path.exists(self.output("index.html")))
+
+    def test_failing_stage_does_not_skip_the_rest_of_the_build(self):
+        config = self.config(search_index=True)
+        with (
+            mock.patch.object(build, "write_site_feeds", side_effect=OSError("disk full")),
+            self.assertLogs(build.logger, "ERROR") as logs,
+        ):
+            build_site(config)
+        self.assertIn("feeds stage", logs.output[0])
+        self.assertNotIn("Content directory", "".join(logs.output))
+        self.assertTrue(os.path.exists(self.output(os.path.join(SEARCH_DIRNAME, "meta.json"))))
+        self.assertTrue(os.path.exists(os.path.join(config.state_dir, ".build-manifest.json")))
+
+    def build_counting_pages(self, config):
+        with mock.patch.object(pages, "generate_page", wraps=generate_page) as generate:
+            build_site(config)
+        return sorted(os.path.relpath(call.args[0], self.content_dir) for call in generate.call_args_list)
+
+    def read_tree(self, directory):
+        files = {}
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, directory)] = f.read()
+        return files
+
+    def test_incremental_build_skips_unchanged_pages(self):
+        config = self.config(incremental=True)
+        self.assertEqual(len(self.build_counting_pages(config)), 3)
+
+        self.write("index.md", "# Home\n\nWelcome back.", self.content_dir)
+        self.assertEqual(self.build_counting_pages(config), ["index.md"])
+        self.assertIn("Welcome back.", self.read_output("index.html"))
+        self.assertEqual(self.build_counting_pages(config), [])
+
+    def test_template_change_regenerates_every_page(self):
+        config = self.config(incremental=True)
+        build_site(config)
+
+        self.write("template.html", TEMPLATE + "<footer>v2</footer>", self.content_dir)
+        self.assertEqual(len(self.build_counting_pages(config)), 3)
+        for rel_path in ("index.html", "blog/index.html", "contact/index.html"):
+            self.assertTrue(self.read_output(rel_path).endswith("<footer>v2</footer>"))
+
+    def test_deleted_source_removes_its_output(self):
+        config = self.config(incremental=True)
+        build_site(config)
+
+        os.remove(os.path.join(self.content_dir, "contact", "index.md"))
+        self.assertEqual(self.build_counting_pages(config), [])
+        self.assertFalse(os.path.exists(self.output("contact/index.html")))
+        self.assertNotIn(os.path.join("contact", "index.md"), PageIndex.load(config.state_dir).pages)
+
+    def test_parallel_build_matches_serial_build(self):
+        for number in range(6):
+            self.write(f"blog/post{number}.md", f"# Post {number}\n\n- item {number}\n\n`code`", self.content_dir)
+        build_site(self.config(generate_navbar=True))
+        parallel_dir = os.path.join(self.root, "parallel")
+        build_site(
+            BuildConfig(
+                self.content_dir,
+                self.template_path,
+                self.static_dir,
+                parallel_dir,
+                generate_navbar=True,
+                jobs=2,
+                state_dir=os.path.join(self.root, "parallel-state"),
+            )
+        )
+        self.assertEqual(self.read_tree(parallel_dir), self.read_tree(self.output_dir))
+
+
+class TestSearchTerms(SiteTestCase):
+    def test_build_indexes_listed_pages_without_reading_them_again(self):
+        self.write("blog/draft.md", "---\ndraft: true\n---\n# Draft\n\nUnfinished.", self.content_dir)
+        with mock.patch.object(search_index, "page_terms", wraps=page_terms) as read_terms:
+            build_site(self.config(search_index=True))
+        read_terms.assert_not_called()
+
+        with open(self.output(os.path.join(SEARCH_DIRNAME, "meta.json")), encoding="utf-8") as f:
+            titles = sorted(title for _, title in json.load(f)["docs"].values())
+        self.assertEqual(titles, ["Blog", "Contact", "Home"])
+        self.assertFalse(os.path.exists(self.output(os.path.join(SEARCH_DIRNAME, "un.json"))))
+
+
+if __name__ == "__main__":
+    unittest.main()
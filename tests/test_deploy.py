@@ -0,0 +1,87 @@
+import json
+import os
+import unittest
+
+from src.deploy import diff_outputs, hash_outputs, replace_if_changed, write_deploy_changes
+from src.manifest import MANIFEST_FILENAME
+from tests.support import TempDirTestCase
+
+
+class TestDeploy(TempDirTestCase):
+    def test_replace_if_changed_keeps_identical_file(self):
+        dest = self.write("index.html", "<p>same</p>")
+        os.utime(dest, ns=(0, 10**9))
+        tmp = self.write("index.html.tmp", "<p>same</p>")
+
+        self.assertFalse(replace_if_changed(tmp, dest))
+        self.assertFalse(os.path.exists(tmp))
+        self.assertEqual(os.stat(dest).st_mtime_ns, 10**9)
+
+    def test_replace_if_changed_writes_new_contents(self):
+        dest = self.write("index.html", "<p>old</p>")
+        tmp = self.write("index.html.tmp", "<p>new</p>")
+
+        self.assertTrue(replace_if_changed(tmp, dest))
+        with open(dest, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>new</p>")
+
+        tmp = self.write("missing.html.tmp", "<p>new</p>")
+        self.assertTrue(replace_if_changed(tmp, os.path.join(self.root, "missing.html")))
+
+    def test_replace_if_changed_sees_rewrites_with_the_same_size_and_mtime(self):
+        dest = self.write("index.html", "<p>one</p>", mtime_ns=10**9)
+        tmp = self.write("index.html.tmp", "<p>one</p>", mtime_ns=10**9)
+        self.assertFalse(replace_if_changed(tmp, dest))
+
+        tmp = self.write("index.html.tmp", "<p>two</p>", mtime_ns=10**9)
+        self.assertTrue(replace_if_changed(tmp, dest))
+        with open(dest, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>two</p>")
+
+    def test_hash_outputs_skips_bookkeeping_files(self):
+        self.write("index.html", "<p>home</p>")
+        self.write(os.path.join("blog", "post.html"), "<p>post</p>")
+        self.write(MANIFEST_FILENAME, "{}")
+
+        outputs = hash_outputs(self.root)
+        self.assertEqual(set(outputs), {"index.html", "blog/post.html"})
+
+    def test_hash_outputs_reuses_hash_of_unchanged_files(self):
+        self.write("index.html", "<p>home</p>")
+        previous = hash_outputs(self.root)
+        previous["index.html"]["hash"] = "cached"
+
+        self.assertEqual(hash_outputs(self.root, previous)["index.html"]["hash"], "cached")
+
+    def test_diff_outputs(self):
+        self.write("index.html", "<p>home</p>")
+        self.write("old.html", "<p>old</p>")
+        self.write("same.css", "body {}")
+        previous = hash_outputs(self.root)
+
+        path = self.write("index.html", "<p>home, edited</p>")
+        os.utime(path, ns=(0, 10**9))
+        os.remove(os.path.join(self.root, "old.html"))
+        self.write("new.html", "<p>new</p>")
+
+        changes = diff_outputs(previous, hash_outputs(self.root, previous))
+        self.assertEqual(set(changes.added), {"new.html"})
+        self.assertEqual(set(changes.changed), {"index.html"})
+        self.assertEqual(changes.removed, {"old.html": previous["old.html"]["hash"]})
+        self.assertFalse(diff_outputs(previous, previous))
+
+    def test_write_deploy_changes(self):
+        self.write("index.html", "<p>home</p>")
+        changes = diff_outputs({}, hash_outputs(self.root))
+        path = os.path.join(self.root, "changes.json")
+
+        write_deploy_changes(path, changes)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["added"], changes.added)
+        self.assertEqual(data["changed"], {})
+        self.assertEqual(data["removed"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import unittest
+
+from src.build import BuildConfig
+from src.dev_server import RELOAD_PATH, RELOAD_SCRIPT, DevServer, DevSite, Response, inject_reload_script
+from tests.support import TempDirTestCase
+
+PAGES = {
+    "/": Response(b"<html><body><h1>Home</h1></body></html>", "text/html; charset=utf-8"),
+    "/style.css": Response(b"body {}", "text/css"),
+}
+
+
+async def request(port, target, method="GET"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), body
+
+
+class TestDevServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = DevServer(PAGES.get, port=0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_serves_resolved_paths(self):
+        status, body = await request(self.server.port, "/style.css?v=1")
+        self.assertEqual((status, body), (200, b"body {}"))
+        status, _ = await request(self.server.port, "/missing")
+        self.assertEqual(status, 404)
+        status, _ = await request(self.server.port, "/", "POST")
+        self.assertEqual(status, 405)
+
+    async def test_html_gets_reload_script(self):
+        status, body = await request(self.server.port, "/")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"<html><body><h1>Home</h1>" + RELOAD_SCRIPT + b"</body></html>")
+
+    async def test_head_has_no_body(self):
+        status, body = await request(self.server.port, "/style.css", "HEAD")
+        self.assertEqual((status, body), (200, b""))
+
+    async def test_reload_pushes_event(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(f"GET {RELOAD_PATH} HTTP/1.1\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        self.assertIn(b"text/event-stream", head)
+        await reader.readuntil(b"\n\n")
+        while not self.server.clients:
+            await asyncio.sleep(0.01)
+
+        self.server.reload()
+        event = await asyncio.wait_for(reader.readuntil(b"\n\n"), 1)
+        self.assertEqual(event, b"event: reload\ndata: reload\n\n")
+        writer.close()
+
+
+class TestInjectReloadScript(unittest.TestCase):
+    def test_without_body_tag(self):
+        self.assertEqual(inject_reload_script(b"<p>x</p>"), b"<p>x</p>" + RELOAD_SCRIPT)
+
+
+class TestDevSite(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.static_dir = os.path.join(self.root, "static")
+        self.output_dir = os.path.join(self.root, "public")
+        self.write("template.html", "<title>{{ Title }}</title><main>{{ Content }}</main>", self.content_dir)
+        self.write("index.md", "# Home\n\nHello", self.content_dir)
+        self.write("blog/index.md", "# Blog\n\nPosts", self.content_dir)
+        self.write("style.css", "body {}", self.static_dir)
+        config = BuildConfig(
+            self.content_dir, os.path.join(self.content_dir, "template.html"), self.static_dir, self.output_dir
+        )
+        self.site = DevSite(config)
+
+    def test_resolves_pages_and_static_files(self):
+        self.assertIn(b"<p>Hello</p>", self.site.resolve("/").body)
+        self.assertIn(b"<p>Posts</p>", self.site.resolve("/blog").body)
+        self.assertEqual(self.site.resolve("/blog/"), self.site.resolve("/blog/index.html"))
+        self.assertEqual(self.site.resolve("/style.css"), Response(b"body {}", "text/css"))
+        self.assertIsNone(self.site.resolve("/missing/"))
+        self.assertIsNone(self.site.resolve("/../content/index.md"))
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_rerenders_changed_sources(self):
+        first = self.site.resolve("/")
+        self.assertIs(self.site.resolve("/").body, first.body)
+
+        self.write("index.md", "# Home\n\nChanged", self.content_dir, mtime_ns=1_000_000_000)
+        self.assertIn(b"<p>Changed</p>", self.site.resolve("/").body)
+
+    def test_poll_reports_changes(self):
+        self.assertFalse(self.site.poll())
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}", self.content_dir, mtime_ns=1_000_000_000)
+        self.assertTrue(self.site.poll())
+        self.assertTrue(self.site.resolve("/").body.startswith(b"<h1>Home</h1>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
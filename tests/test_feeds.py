@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from xml.etree import ElementTree
+
+from src import feeds
+from src.feeds import entry_datetime, write_atom_feed, write_sitemap
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+def make_entry(url, title="Page", mtime_ns=0, **front_matter):
+    return {"url": url, "title": title, "mtime_ns": mtime_ns, "front_matter": front_matter}
+
+
+class TestFeeds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entry_datetime(self):
+        self.assertEqual(entry_datetime(make_entry("/", date="2024-03-01")).isoformat(), "2024-03-01T00:00:00+00:00")
+        self.assertEqual(entry_datetime(make_entry("/", mtime_ns=86400 * 10**9)).date().isoformat(), "1970-01-02")
+        self.assertEqual(entry_datetime(make_entry("/", date="soon")).year, 1970)
+
+    def test_write_sitemap(self):
+        entries = [make_entry("/site/"), make_entry("/site/a&b/"), make_entry("/site/draft/", draft=True)]
+        self.assertEqual(write_sitemap(self.output_dir, entries, "https://example.com"), ["sitemap.xml"])
+
+        root = ElementTree.parse(os.path.join(self.output_dir, "sitemap.xml")).getroot()
+        locs = [loc.text for loc in root.iter(f"{SITEMAP_NS}loc")]
+        self.assertEqual(locs, ["https://example.com/site/", "https://example.com/site/a&b/"])
+
+    def test_write_sitemap_index_above_limit(self):
+        entries = [make_entry(f"/page-{i}.html") for i in range(5)]
+        with mock.patch.object(feeds, "SITEMAP_URL_LIMIT", 2):
+            written = write_sitemap(self.output_dir, entries, "https://example.com", "/site/")
+
+        self.assertEqual(written, ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        root = ElementTree.parse(os.path.join(self.output_dir, "sitemap.xml")).getroot()
+        self.assertEqual(root.tag, f"{SITEMAP_NS}sitemapindex")
+        self.assertEqual(root[0][0].text, "https://example.com/site/sitemap-1.xml")
+
+    def test_write_atom_feed_lists_newest_first(self):
+        entries = [
+            make_entry("/blog/old/", "Old", date="2023-01-01"),
+            make_entry("/blog/new/", "New", date="2024-01-01", summary="Fresh"),
+            make_entry("/blog/wip/", "WIP", date="2025-01-01", draft=True),
+        ]
+        path = os.path.join(self.output_dir, "blog", "atom.xml")
+        write_atom_feed(path, entries, "https://example.com", "/blog/atom.xml", "Blog")
+
+        root = ElementTree.parse(path).getroot()
+        self.assertEqual(root.find(f"{ATOM_NS}updated").text, "2024-01-01T00:00:00+00:00")
+        titles = [entry.find(f"{ATOM_NS}title").text for entry in root.iter(f"{ATOM_NS}entry")]
+        self.assertEqual(titles, ["New", "Old"])
+        self.assertEqual(root.find(f"{ATOM_NS}entry/{ATOM_NS}summary").text, "Fresh")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import unittest
+
+from src.fingerprint import ASSET_MAP_FILENAME, build_asset_map, fingerprint_assets, fingerprint_name
+from src.static_sync import sync_static
+from tests.support import TempDirTestCase
+
+
+class TestFingerprintAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static_dir = self.write_dir = os.path.join(self.root, "static")
+        self.output_dir = os.path.join(self.root, "public")
+        self.write("style.css", "body { color: red; }")
+        self.write("images/logo.png", "png")
+        self.write("robots.txt", "User-agent: *")
+
+    def fingerprint(self, previous=None):
+        synced = sync_static(self.static_dir, self.output_dir).synced
+        return fingerprint_assets(self.static_dir, self.output_dir, synced, previous)
+
+    def read_asset_map(self):
+        with open(os.path.join(self.output_dir, ASSET_MAP_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("css/style.css", "3f9a1c0b77"), "css/style.3f9a1c0b.css")
+
+    def test_copies_assets_to_hashed_names(self):
+        result = self.fingerprint()
+        hashed = f"style.{hashlib.sha256(b'body { color: red; }').hexdigest()[:8]}.css"
+        hashed_logo = os.path.join("images", f"logo.{hashlib.sha256(b'png').hexdigest()[:8]}.png")
+
+        self.assertEqual(sorted(result.written), sorted([hashed, hashed_logo]))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, hashed)))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "style.css")))
+        self.assertNotIn("robots.txt", result.assets)
+        self.assertEqual(self.read_asset_map(), build_asset_map(result.assets))
+        self.assertEqual(self.read_asset_map()["style.css"], hashed)
+
+    def test_unchanged_assets_keep_their_names(self):
+        first = self.fingerprint()
+        second = self.fingerprint(first.assets)
+        self.assertEqual(second.written, [])
+        self.assertEqual(build_asset_map(second.assets), build_asset_map(first.assets))
+
+    def test_changed_and_removed_assets_drop_old_copies(self):
+        first = self.fingerprint()
+        old_style = first.assets["style.css"]["fingerprinted"]
+        old_logo = first.assets[os.path.join("images", "logo.png")]["fingerprinted"]
+
+        self.write("style.css", "body { color: blue; }")
+        os.remove(os.path.join(self.static_dir, "images", "logo.png"))
+        result = self.fingerprint(first.assets)
+
+        new_style = result.assets["style.css"]["fingerprinted"]
+        self.assertNotEqual(new_style, old_style)
+        self.assertEqual(result.written, [new_style])
+        self.assertEqual(sorted(result.removed), sorted([old_style, old_logo]))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, old_style)))
+        self.assertEqual(self.read_asset_map(), {"style.css": new_style})
+
+    def test_empty_record_removes_everything(self):
+        first = self.fingerprint()
+        result = fingerprint_assets(self.static_dir, self.output_dir, {}, first.assets)
+        self.assertEqual(len(result.removed), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, ASSET_MAP_FILENAME)))
+
+
+if __name__ == "__main__":
+    unittest.main()
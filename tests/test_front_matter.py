@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from src.front_matter import parse_value, read_header, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse_value(self):
+        self.assertEqual(parse_value(' "quoted: text" '), "quoted: text")
+        self.assertEqual(parse_value("[a, 'b c', 3]"), ["a", "b c", 3])
+        self.assertIs(parse_value("true"), True)
+        self.assertIs(parse_value("False"), False)
+        self.assertEqual(parse_value("2024-05-01"), "2024-05-01")
+
+    def test_split_front_matter(self):
+        markdown = "---\ntitle: Post\ndraft: true\ntags:\n  - one\n  - two\n---\n\n# Post\n\nBody"
+        metadata, body = split_front_matter(markdown)
+        self.assertEqual(metadata, {"title": "Post", "draft": True, "tags": ["one", "two"]})
+        self.assertEqual(body, "# Post\n\nBody")
+
+    def test_split_without_front_matter(self):
+        for markdown in ("# Title\n\nBody", "---\nnot closed\n# Title", "---", ""):
+            self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_read_header_puts_back_consumed_lines(self):
+        lines = iter(["# Title\n", "Body\n"])
+        self.assertEqual(read_header(lines), (None, ["# Title\n"]))
+        self.assertEqual(list(lines), ["Body\n"])
+
+    def test_read_header_reads_only_the_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "post.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\ntitle: Post\n---\n# Post\n" + "word " * 200_000)
+
+            with open(path, "r", encoding="utf-8") as source_file:
+                self.assertEqual(read_header(source_file), ({"title": "Post"}, []))
+                self.assertLess(source_file.buffer.tell(), 64 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
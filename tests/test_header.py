@@ -0,0 +1,31 @@
+import unittest
+
+from src.header import NavBar, build_nav_bar, generate_nav_bar, nav_section
+
+
+class TestNavBar(unittest.TestCase):
+    def test_html_matches_node_rendering(self):
+        dir_names = ["blog", "contact"]
+        self.assertEqual(NavBar(dir_names).render(), generate_nav_bar(dir_names).to_html())
+
+    def test_active_item(self):
+        nav_bar = NavBar(["blog", "contact"])
+        self.assertEqual(
+            nav_bar.render("blog"),
+            '<ul class="menu"><li class="nav-item"><a href="/">Home</a></li>'
+            '<li class="nav-item active" aria-current="page"><a href="/blog">blog</a></li>'
+            '<li class="nav-item"><a href="/contact">contact</a></li></ul>',
+        )
+        self.assertIn('<li class="nav-item active" aria-current="page"><a href="/">Home</a>', nav_bar.render(""))
+        self.assertEqual(nav_bar.render("missing"), nav_bar.html)
+
+    def test_build_nav_bar_is_cached(self):
+        self.assertIs(build_nav_bar(("blog",)), build_nav_bar(("blog",)))
+
+    def test_nav_section(self):
+        self.assertEqual(nav_section("index.md"), "")
+        self.assertEqual(nav_section("blog/tom/index.md"), "blog")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
@@ -54,6 +56,34 @@ class TestHTMLNode(unittest.TestCase):
         expected_output = "<h1><b>Bold text</b>Normal text<i>italic text</i>Normal text</h1>"
         self.assertEqual(parent_node.to_html(), expected_output)
 
+    def test_write_html_to_list_and_stream(self):
+        parent_node = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")], {"class": "x"})
+        parts = []
+        parent_node.write_html(parts)
+        self.assertEqual(parts, ['<p class="x">', "<b>Bold</b>", " text", "</p>"])
+
+        stream = io.StringIO()
+        parent_node.write_html(stream)
+        self.assertEqual(stream.getvalue(), parent_node.to_html())
+
+    def test_to_html_deeply_nested(self):
+        node = LeafNode("b", "deep")
+        depth = sys.getrecursionlimit() * 2
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        self.assertEqual(node.to_html(), "<span>" * depth + "<b>deep</b>" + "</span>" * depth)
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("p", [LeafNode("b", "x")])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
+    def test_to_html_invalid_descendant(self):
+        parent_node = ParentNode("div", [ParentNode("span", [])])
+        with self.assertRaises(ValueError):
+            parent_node.to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import os
+import struct
+import unittest
+from unittest import mock
+
+from src import image_size
+from src.image_size import image_size_map, probe_image_size, probe_static_images
+from src.static_sync import sync_static
+from tests.support import TempDirTestCase
+
+
+def png(width, height):
+    ihdr = b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\0\0\0"
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + ihdr
+
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\0" * 8
+
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    exif = b"\xff\xe1" + struct.pack(">H", 2 + 500) + b"\0" * 500
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\0" * 10
+    return b"\xff\xd8" + app0 + exif + sof + b"\xff\xda"
+
+
+def webp(chunk, payload):
+    riff_size = struct.pack("<I", 4 + 8 + len(payload))
+    return b"RIFF" + riff_size + b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+
+
+class TestProbeImageSize(TempDirTestCase):
+    def probe(self, data):
+        return probe_image_size(self.write("image", data))
+
+    def test_png(self):
+        self.assertEqual(self.probe(png(1026, 388)), (1026, 388))
+
+    def test_gif(self):
+        self.assertEqual(self.probe(gif(320, 200)), (320, 200))
+
+    def test_jpeg_skips_segments_before_frame(self):
+        self.assertEqual(self.probe(jpeg(1920, 1080)), (1920, 1080))
+
+    def test_webp_lossy(self):
+        payload = b"\0\0\0" + b"\x9d\x01\x2a" + struct.pack("<HH", 640, 480) + b"\0" * 4
+        self.assertEqual(self.probe(webp(b"VP8 ", payload)), (640, 480))
+
+    def test_webp_lossless(self):
+        bits = (800 - 1) | ((600 - 1) << 14)
+        self.assertEqual(self.probe(webp(b"VP8L", b"\x2f" + bits.to_bytes(4, "little") + b"\0" * 4)), (800, 600))
+
+    def test_webp_extended(self):
+        payload = b"\0" * 4 + (4000 - 1).to_bytes(3, "little") + (3000 - 1).to_bytes(3, "little")
+        self.assertEqual(self.probe(webp(b"VP8X", payload)), (4000, 3000))
+
+    def test_unsupported_or_truncated(self):
+        self.assertIsNone(self.probe(b"not an image"))
+        self.assertIsNone(self.probe(b"\xff\xd8\xff\xe0\x00"))
+
+
+class TestProbeStaticImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static_dir = self.write_dir = os.path.join(self.root, "static")
+        self.output_dir = os.path.join(self.root, "public")
+        self.write("images/a.png", png(10, 20))
+        self.write("images/b.gif", gif(30, 40))
+        self.write("style.css", b"body {}")
+
+    def probe(self, previous=None):
+        synced = sync_static(self.static_dir, self.output_dir).synced
+        with mock.patch.object(image_size, "probe_image_size", wraps=probe_image_size) as probe:
+            images = probe_static_images(self.static_dir, synced, previous)
+        return images, probe.call_count
+
+    def test_probes_images_once(self):
+        images, probed = self.probe()
+        self.assertEqual(probed, 2)
+        self.assertEqual(image_size_map(images), {"images/a.png": (10, 20), "images/b.gif": (30, 40)})
+
+        images, probed = self.probe(images)
+        self.assertEqual(probed, 0)
+
+    def test_cache_is_keyed_by_content_hash(self):
+        images, _ = self.probe()
+        # Rewriting identical contents and copying an image need no probing.
+        self.write("images/a.png", png(10, 20))
+        self.write("images/copy.png", png(10, 20))
+        images, probed = self.probe(images)
+        self.assertEqual(probed, 0)
+        self.assertEqual(image_size_map(images)["images/copy.png"], (10, 20))
+
+        self.write("images/a.png", png(50, 60))
+        images, probed = self.probe(images)
+        self.assertEqual(probed, 1)
+        self.assertEqual(image_size_map(images)["images/a.png"], (50, 60))
+
+    def test_unreadable_images_are_recorded_without_size(self):
+        self.write("images/broken.png", b"broken")
+        images, _ = self.probe()
+        self.assertIsNone(images[os.path.join("images", "broken.png")]["width"])
+        self.assertNotIn("images/broken.png", image_size_map(images))
+        _, probed = self.probe(images)
+        self.assertEqual(probed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from src.manifest import MANIFEST_FILENAME, BuildManifest, file_hash
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.output_dir = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.content_dir)
+        os.makedirs(self.output_dir)
+        self.source = os.path.join(self.content_dir, "index.md")
+        self.output = os.path.join(self.output_dir, "index.html")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# Title\n")
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write("<h1>Title</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_recorded_page_is_fresh_after_reload(self):
+        manifest = BuildManifest.load(self.output_dir)
+        manifest.apply_settings({"basepath": "/"})
+        manifest.record_page("index.md", self.source, "index.html")
+        manifest.save()
+
+        reloaded = BuildManifest.load(self.output_dir)
+        self.assertFalse(reloaded.apply_settings({"basepath": "/"}))
+        self.assertTrue(reloaded.is_page_fresh("index.md", self.source, self.output, "index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, MANIFEST_FILENAME)))
+
+    def test_changed_content_is_stale(self):
+        manifest = BuildManifest.load(self.output_dir)
+        manifest.record_page("index.md", self.source, "index.html")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# Another title\n")
+        self.assertFalse(manifest.is_page_fresh("index.md", self.source, self.output, "index.html"))
+
+    def test_touched_file_with_same_content_is_fresh(self):
+        manifest = BuildManifest.load(self.output_dir)
+        manifest.record_page("index.md", self.source, "index.html")
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertTrue(manifest.is_page_fresh("index.md", self.source, self.output, "index.html"))
+        self.assertEqual(manifest.pages["index.md"]["mtime_ns"], stat.st_mtime_ns + 10**9)
+
+    def test_settings_change_invalidates_every_page(self):
+        manifest = BuildManifest.load(self.output_dir)
+        manifest.apply_settings({"template_hash": "a"})
+        manifest.record_page("index.md", self.source, "index.html")
+        self.assertTrue(manifest.apply_settings({"template_hash": "b"}))
+        self.assertEqual(manifest.pages, {"index.md": {"output": "index.html"}})
+        self.assertFalse(manifest.is_page_fresh("index.md", self.source, self.output, "index.html"))
+
+    def test_remove_stale_pages_deletes_outputs(self):
+        nested_dir = os.path.join(self.output_dir, "blog")
+        os.makedirs(nested_dir)
+        nested_output = os.path.join(nested_dir, "index.html")
+        with open(nested_output, "w", encoding="utf-8") as f:
+            f.write("<p>old</p>")
+
+        manifest = BuildManifest.load(self.output_dir)
+        manifest.record_page("index.md", self.source, "index.html")
+        manifest.record_page("blog/index.md", self.source, "blog/index.html")
+
+        removed = manifest.remove_stale_pages({"index.md"}, self.output_dir)
+        self.assertEqual(removed, ["blog/index.html"])
+        self.assertFalse(os.path.exists(nested_dir))
+        self.assertTrue(os.path.exists(self.output))
+        self.assertEqual(list(manifest.pages), ["index.md"])
+
+    def test_generated_outputs(self):
+        manifest = BuildManifest.load(self.output_dir)
+        self.assertFalse(manifest.is_generated_fresh("sitemap", "a", self.output_dir))
+
+        self.assertEqual(manifest.record_generated("sitemap", "a", ["index.html"], self.output_dir), [])
+        self.assertTrue(manifest.is_generated_fresh("sitemap", "a", self.output_dir))
+        self.assertFalse(manifest.is_generated_fresh("sitemap", "b", self.output_dir))
+
+        self.assertEqual(manifest.remove_stale_generated({"sitemap"}, self.output_dir), [])
+        self.assertEqual(manifest.remove_stale_generated(set(), self.output_dir), ["index.html"])
+        self.assertFalse(os.path.exists(self.output))
+        self.assertEqual(manifest.generated, {})
+
+    def test_generated_files_no_longer_written_are_removed(self):
+        manifest = BuildManifest.load(self.output_dir)
+        for rel_path in ("blog/atom.xml", "news/atom.xml"):
+            os.makedirs(os.path.join(self.output_dir, os.path.dirname(rel_path)), exist_ok=True)
+            with open(os.path.join(self.output_dir, rel_path), "w", encoding="utf-8") as f:
+                f.write("<feed/>")
+        manifest.record_generated("feed", "a", ["blog/atom.xml"], self.output_dir)
+
+        removed = manifest.record_generated("feed", "b", ["news/atom.xml"], self.output_dir)
+        self.assertEqual(removed, ["blog/atom.xml"])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog", "atom.xml")))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "news", "atom.xml")))
+        self.assertEqual(manifest.generated["feed"], {"digest": "b", "files": ["news/atom.xml"]})
+
+    def test_file_hash(self):
+        self.assertEqual(file_hash(self.source), "e01b17ff9af77056792f67c57e3d1908795b9d1ae4cfe72421d0a2838991b740")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,19 @@
+import io
+import random
 import textwrap
 import unittest
 
 from src.markdown_parser import (
     BlockType,
     block_to_block_type,
+    block_to_block_type_predicates,
+    classify_block,
+    iter_markdown_blocks,
     markdown_to_blocks,
     markdown_to_html_node,
     text_to_textnodes,
+    text_to_textnodes_multipass,
+    write_markdown_html,
 )
 from src.textnode import TextNode, TextType
 
@@ -56,6 +63,35 @@ class TestTextToTextNodes(unittest.TestCase):
 
         self.assertEqual(text_to_textnodes(text), expected_nodes)
 
+    def test_matches_multipass_pipeline(self):
+        pieces = ["a", " ", "`", "*", "**", "_", "[", "]", "(", ")", "!", "![x](y)", "[l](u)"]
+        rng = random.Random(0)
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            try:
+                expected = text_to_textnodes_multipass(text)
+            except ValueError as e:
+                with self.assertRaises(ValueError) as cm:
+                    text_to_textnodes(text)
+                self.assertEqual(str(cm.exception), str(e))
+                continue
+            self.assertEqual(text_to_textnodes(text), expected, text)
+
+    def test_delimiters_inside_code_and_links(self):
+        text = "`a **b** _c_` and [x_y](u_v) and **b _i_**"
+        expected_nodes = [
+            TextNode("a **b** _c_", TextType.CODE),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("x_y", TextType.LINK, "u_v"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("b _i_", TextType.BOLD),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_unclosed_delimiter_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("**bold `code` bold**")
+
     def test_markdown_to_blocks(self):
         md = textwrap.dedent(
             """
@@ -262,5 +298,68 @@ class TestTextToTextNodes(unittest.TestCase):
         )
 
 
+class TestStreamingBlocks(unittest.TestCase):
+    def test_iter_markdown_blocks_matches_markdown_to_blocks(self):
+        pieces = ["a", "b\n", "\n", "\n\n", " ", "  \n"]
+        rng = random.Random(0)
+        for _ in range(3000):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            lines = io.StringIO(md)
+            self.assertEqual(list(iter_markdown_blocks(lines)), markdown_to_blocks(md), repr(md))
+
+    def test_write_markdown_html_matches_to_html(self):
+        md = textwrap.dedent(
+            """
+            # Title
+
+            Some **bold** text with a [link](/x).
+
+
+            ```
+            code
+            more code
+            ```
+
+            - one
+            - two
+            """
+        )
+        out = io.StringIO()
+        write_markdown_html(io.StringIO(md), out)
+        self.assertEqual(out.getvalue(), markdown_to_html_node(md).to_html())
+
+
+class TestClassifyBlock(unittest.TestCase):
+    def test_matches_predicates(self):
+        pieces = ["#", "# ", "## ", "```", ">", "> ", "-", "- ", "1. ", "2. ", "3. ", "\n", "a", " ", "`"]
+        rng = random.Random(0)
+        for _ in range(5000):
+            block = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+            block_type, lines = classify_block(block)
+            self.assertEqual(block_type, block_to_block_type_predicates(block), repr(block))
+            if lines is not None:
+                self.assertEqual(lines, block.split("\n"))
+
+    def test_returns_lines_of_lists_and_quotes(self):
+        self.assertEqual(classify_block("- a\n- b"), (BlockType.UNORDERED_LIST, ["- a", "- b"]))
+        self.assertEqual(classify_block("1. a\n2. b"), (BlockType.ORDERED_LIST, ["1. a", "2. b"]))
+        self.assertEqual(classify_block("> a\n> b"), (BlockType.QUOTE, ["> a", "> b"]))
+        self.assertEqual(classify_block("## Title"), (BlockType.HEADING, None))
+
+
+class TestBlockMemoization(unittest.TestCase):
+    def test_memoized_matches_unmemoized(self):
+        md = "# Title\n\nSome **bold** text.\n\n- one\n- two\n\n> quoted"
+        self.assertEqual(markdown_to_html_node(md).to_html(), markdown_to_html_node(md, memoize=False).to_html())
+
+    def test_unchanged_blocks_are_reused(self):
+        before = markdown_to_html_node("# Title\n\nFirst paragraph.\n\nSecond paragraph.")
+        after = markdown_to_html_node("# Title\n\nFirst paragraph, edited.\n\nSecond paragraph.")
+        self.assertIs(after.children[0], before.children[0])
+        self.assertIsNot(after.children[1], before.children[1])
+        self.assertIs(after.children[2], before.children[2])
+        self.assertEqual(after.children[1].to_html(), "<p>First paragraph, edited.</p>")
+
+
 if __name__ == "__main__":
     unittest.main()
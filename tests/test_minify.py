@@ -0,0 +1,40 @@
+import unittest
+
+from src.minify import minify_html
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_removes_comments(self):
+        self.assertEqual(minify_html("<p>a<!-- note -->b</p>"), "<p>ab</p>")
+
+    def test_keeps_conditional_comments(self):
+        html = "<!--[if IE]><p>old</p><![endif]-->"
+        self.assertEqual(minify_html(html), html)
+
+    def test_drops_whitespace_around_block_tags(self):
+        html = "<html>\n  <body>\n    <div>\n      <p>text</p>\n    </div>\n  </body>\n</html>\n"
+        self.assertEqual(minify_html(html), "<html><body><div><p>text</p></div></body></html>")
+
+    def test_collapses_whitespace_between_inline_tags(self):
+        self.assertEqual(minify_html("<p><b>a</b>\n   <i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+
+    def test_collapses_whitespace_in_text(self):
+        self.assertEqual(minify_html("<p>one   two\n\tthree</p>"), "<p>one two three</p>")
+
+    def test_preserves_whitespace_sensitive_elements(self):
+        html = "<div>\n<pre>\n  indented\n\n  code\n</pre>\n<textarea>  a\n b</textarea>\n</div>"
+        self.assertEqual(
+            minify_html(html), "<div><pre>\n  indented\n\n  code\n</pre><textarea>  a\n b</textarea></div>"
+        )
+
+    def test_fragment_keeps_inline_edge_space(self):
+        # A template segment ending next to a slot keeps one space before inline content.
+        self.assertEqual(minify_html("\n<footer>\n  <span>by</span>\n"), "<footer><span>by</span> ")
+
+    def test_minified_html_is_stable(self):
+        html = "<ul>\n  <li><a href='/'>Home</a></li>\n  <li>x  y</li>\n</ul>"
+        self.assertEqual(minify_html(minify_html(html)), minify_html(html))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from src.page_index import PageIndex, PageInfo, WordCounter, count_words, page_url
+
+
+class TestPageIndexHelpers(unittest.TestCase):
+    def test_count_words_skips_markdown_markers(self):
+        self.assertEqual(count_words("# Title\n\n- one item\n- two\n\n```\ncode\n```"), 5)
+
+    def test_word_counter(self):
+        counter = WordCounter(1)
+        self.assertEqual(list(counter.counted(["one two\n", "- three\n"])), ["one two\n", "- three\n"])
+        self.assertEqual(counter.count, 4)
+
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url(os.path.join("blog", "tom", "index.html"), "/site/"), "/site/blog/tom/")
+        self.assertEqual(page_url("about.html"), "/about.html")
+
+
+class TestPageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "post.md")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# Post\n\nSome words here.\n")
+        self.output_dir = os.path.join(self.tmp.name, "docs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_save_and_load(self):
+        index = PageIndex.load(self.output_dir)
+        self.assertEqual(index.pages, {})
+
+        index.record("blog/post.md", self.source, "blog/post.html", "/", PageInfo("Post", 4))
+        index.save()
+
+        entry = PageIndex.load(self.output_dir).pages["blog/post.md"]
+        self.assertEqual(entry["title"], "Post")
+        self.assertEqual(entry["url"], "/blog/post.html")
+        self.assertEqual(entry["word_count"], 4)
+        self.assertEqual(entry["size"], os.path.getsize(self.source))
+
+    def test_retain_and_entries(self):
+        index = PageIndex(os.path.join(self.output_dir, "index.json"))
+        for source_rel in ("index.md", "blog/a.md", "blog/b.md"):
+            index.record(source_rel, self.source, source_rel[:-3] + ".html", "/", PageInfo(source_rel, 1))
+
+        self.assertEqual([entry["source"] for entry in index.entries("blog")], ["blog/a.md", "blog/b.md"])
+        index.retain(["index.md", "blog/b.md"])
+        self.assertEqual([entry["source"] for entry in index.entries()], ["blog/b.md", "index.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import os
+import unittest
+
+from src.manifest import BuildManifest
+from src.pages import build_settings, generate_page, process_content_directory
+from src.search_index import page_terms
+from tests.support import TEMPLATE, SiteTestCase
+
+
+class TestProcessContentDirectory(SiteTestCase):
+    def process(self, manifest):
+        manifest.apply_settings(build_settings(self.content_dir, self.template_path, "/", False))
+        process_content_directory(self.content_dir, self.template_path, self.output_dir, "/", False, manifest=manifest)
+
+    def test_deleted_source_is_removed_when_settings_change(self):
+        manifest = BuildManifest.load(self.output_dir)
+        self.process(manifest)
+        self.assertTrue(os.path.exists(self.output("contact/index.html")))
+
+        self.write("template.html", TEMPLATE + "<!-- changed -->", self.content_dir)
+        os.remove(os.path.join(self.content_dir, "contact", "index.md"))
+        self.process(manifest)
+
+        self.assertFalse(os.path.exists(self.output("contact")))
+        self.assertNotIn(os.path.join("contact", "index.md"), manifest.pages)
+        self.assertTrue(self.read_output("index.html").endswith("<!-- changed -->"))
+
+
+class TestGeneratePage(SiteTestCase):
+    def test_streamed_page_matches_in_memory_page(self):
+        source = self.write(
+            "blog/post.md",
+            "---\ntitle: Front matter title\ntags: [a, b]\n---\n\n# Heading\n\nSome *text*.\n\n"
+            "```\ncode\n```\n\n> quote\n\n1. one\n2. two\n",
+            self.content_dir,
+        )
+        pages = []
+        for stream in (False, True):
+            out = io.StringIO()
+            info = generate_page(source, self.template_path, "", "/", [], False, stream=stream, out=out)
+            pages.append((out.getvalue(), info))
+        self.assertEqual(pages[0], pages[1])
+        html, info = pages[0]
+        self.assertTrue(html.startswith("<title>Front matter title</title>"))
+        self.assertNotIn("tags", html)
+        self.assertEqual(info.front_matter, {"title": "Front matter title", "tags": ["a", "b"]})
+
+    def test_generate_page_collects_the_terms_page_terms_reads(self):
+        source = self.write(
+            "post.md", "---\nsecret: hidden\n---\n# Hobbits\n\nA [map](/map) of **hobbit** holes.", self.content_dir
+        )
+        for stream in (False, True):
+            info = generate_page(
+                source, self.template_path, "", "/", [], False, stream=stream, out=io.StringIO(), collect_terms=True
+            )
+            self.assertEqual(info.terms, page_terms(source))
+        info = generate_page(source, self.template_path, "", "/", [], False, out=io.StringIO())
+        self.assertIsNone(info.terms)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from src.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, ".ssg-cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_text(self):
+        self.assertEqual(self.cache.key("# Title"), self.cache.key("# Title"))
+        self.assertNotEqual(self.cache.key("# Title"), self.cache.key("# Other"))
+
+    def test_get_and_put(self):
+        key = self.cache.key("# Title")
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.put(key, "<div><h1>Title</h1></div>")
+        self.assertEqual(self.cache.get(key), "<div><h1>Title</h1></div>")
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = ParseCache(self.cache.directory, max_bytes=10)
+        keys = [cache.key(text) for text in ("a", "b", "c")]
+        for age, key in enumerate(keys):
+            cache.put(key, "12345")
+            path = cache._entry_path(key)
+            os.utime(path, ns=(age * 10**9, age * 10**9))
+        # Reading the oldest entry makes it the most recently used.
+        cache.get(keys[0])
+
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
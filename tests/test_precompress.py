@@ -0,0 +1,55 @@
+import gzip
+import os
+import unittest
+
+from src.deploy import hash_outputs
+from src.precompress import precompress_outputs
+from tests.support import TempDirTestCase
+
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.output_dir = self.root
+        self.write("index.html", "<p>hello</p>" * 200)
+        self.write("style.css", "body { color: red; }\n" * 100)
+        self.write("tiny.html", "<p>hi</p>")
+        self.write("image.png", "png" * 1000)
+
+    def sidecar(self, rel_path):
+        return os.path.join(self.output_dir, rel_path + ".gz")
+
+    def test_compresses_eligible_outputs(self):
+        result = precompress_outputs(self.output_dir, hash_outputs(self.output_dir), min_size=100, jobs=2)
+        self.assertEqual(sorted(result.written), ["index.html", "style.css"])
+        self.assertFalse(os.path.exists(self.sidecar("tiny.html")))
+        self.assertFalse(os.path.exists(self.sidecar("image.png")))
+        with gzip.open(self.sidecar("index.html"), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+
+    def test_skips_unchanged_and_removes_stale_sidecars(self):
+        first = precompress_outputs(self.output_dir, hash_outputs(self.output_dir), min_size=100)
+
+        self.write("index.html", "<p>changed</p>" * 200)
+        os.remove(os.path.join(self.output_dir, "style.css"))
+        result = precompress_outputs(self.output_dir, hash_outputs(self.output_dir), first.compressed, min_size=100)
+
+        self.assertEqual(result.written, ["index.html"])
+        self.assertEqual(result.removed, ["style.css.gz"])
+        self.assertFalse(os.path.exists(self.sidecar("style.css")))
+
+        unchanged = precompress_outputs(self.output_dir, hash_outputs(self.output_dir), result.compressed, min_size=100)
+        self.assertEqual(unchanged.written, [])
+        self.assertEqual(unchanged.skipped, ["index.html"])
+
+    def test_sidecars_are_reproducible(self):
+        precompress_outputs(self.output_dir, hash_outputs(self.output_dir), min_size=100)
+        with open(self.sidecar("index.html"), "rb") as f:
+            first = f.read()
+        precompress_outputs(self.output_dir, hash_outputs(self.output_dir), min_size=100)
+        with open(self.sidecar("index.html"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import unittest
+
+from src.search_index import SEARCH_DIRNAME, SearchIndex, page_terms, shard_name, update_search_index
+from tests.support import TempDirTestCase
+
+
+class TestSearchIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.output_dir = os.path.join(self.root, "docs")
+        self.state_dir = os.path.join(self.root, "state")
+        os.makedirs(self.content_dir)
+        self.entries = {}
+
+    def write_page(self, source_rel, text, mtime_ns=0):
+        path = self.write(source_rel, text, self.content_dir)
+        title = text.splitlines()[0]
+        url = "/" + source_rel[:-3] + ".html"
+        self.entries[source_rel] = {"url": url, "title": title, "size": len(text), "mtime_ns": mtime_ns}
+        return path
+
+    def read_shard(self, shard):
+        with open(os.path.join(self.output_dir, SEARCH_DIRNAME, f"{shard}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_page_terms(self):
+        path = self.write_page(
+            "post.md",
+            "---\nsecret: frontmatter\n---\n# Hobbits\n\nA [link](/hidden) and ![Shire map](/map.png) **hobbits**.",
+        )
+        terms = page_terms(path)
+        self.assertEqual(terms["hobbits"], 2)
+        self.assertIn("shire", terms)
+        self.assertIn("link", terms)
+        self.assertNotIn("hidden", terms)
+        self.assertNotIn("frontmatter", terms)
+        self.assertNotIn("a", terms)
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("hobbit"), "ho")
+        self.assertEqual(shard_name("élan"), "_")
+
+    def test_writes_sharded_index(self):
+        self.write_page("a.md", "# Hobbits\n\nhobbits love honey")
+        self.write_page("b.md", "# Elves\n\nelves love songs")
+        update_search_index(self.output_dir, self.state_dir, self.content_dir, self.entries)
+
+        self.assertEqual(self.read_shard("lo"), {"love": [[0, 1], [1, 1]]})
+        self.assertEqual(self.read_shard("ho"), {"hobbits": [[0, 2]], "honey": [[0, 1]]})
+        meta = self.read_shard("meta")
+        self.assertEqual(meta["docs"], {"0": ["/a.html", "# Hobbits"], "1": ["/b.html", "# Elves"]})
+
+    def test_incremental_update_only_touches_changed_shards(self):
+        self.write_page("a.md", "# Hobbits\n\nhobbits love honey")
+        self.write_page("b.md", "# Elves\n\nelves love songs")
+        update_search_index(self.output_dir, self.state_dir, self.content_dir, self.entries)
+
+        self.write_page("a.md", "# Hobbits\n\nhobbits love bread", mtime_ns=1)
+        index = SearchIndex.load(self.output_dir, self.state_dir)
+        self.assertEqual(index.update(self.entries, self.content_dir), {"ho", "br"})
+
+        del self.entries["b.md"]
+        update_search_index(self.output_dir, self.state_dir, self.content_dir, self.entries)
+        self.assertEqual(self.read_shard("lo"), {"love": [[0, 1]]})
+        self.assertEqual(self.read_shard("br"), {"bread": [[0, 1]]})
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, SEARCH_DIRNAME, "so.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
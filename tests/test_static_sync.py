@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from src.static_sync import copy_asset, sync_static
+from tests.support import TempDirTestCase
+
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static_dir = self.write_dir = os.path.join(self.root, "static")
+        self.output_dir = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.static_dir, "images"))
+        self.write("index.css", "body { color: red; }")
+        self.write(os.path.join("images", "logo.png"), "png")
+
+    def read_output(self, rel_path):
+        with open(os.path.join(self.output_dir, rel_path), encoding="utf-8") as f:
+            return f.read()
+
+    def test_copies_then_skips_unchanged_files(self):
+        result = sync_static(self.static_dir, self.output_dir)
+        self.assertEqual(sorted(result.copied), ["images/logo.png", "index.css"])
+        self.assertEqual(self.read_output("index.css"), "body { color: red; }")
+
+        result = sync_static(self.static_dir, self.output_dir, result.synced)
+        self.assertEqual(result.copied, [])
+        self.assertEqual(sorted(result.skipped), ["images/logo.png", "index.css"])
+
+    def test_copies_changed_file(self):
+        first = sync_static(self.static_dir, self.output_dir)
+        path = self.write("index.css", "body { color: blue; }")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = sync_static(self.static_dir, self.output_dir, first.synced)
+        self.assertEqual(result.copied, ["index.css"])
+        self.assertEqual(self.read_output("index.css"), "body { color: blue; }")
+
+    def test_hash_mode_ignores_touched_files(self):
+        first = sync_static(self.static_dir, self.output_dir, use_hash=True)
+        path = os.path.join(self.static_dir, "index.css")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = sync_static(self.static_dir, self.output_dir, first.synced, use_hash=True)
+        self.assertEqual(result.copied, [])
+
+    def test_removes_deleted_files(self):
+        first = sync_static(self.static_dir, self.output_dir)
+        os.remove(os.path.join(self.static_dir, "images", "logo.png"))
+
+        result = sync_static(self.static_dir, self.output_dir, first.synced)
+        self.assertEqual(result.removed, ["images/logo.png"])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "images", "logo.png")))
+        self.assertNotIn("images/logo.png", result.synced)
+
+    def test_keeps_files_it_did_not_sync(self):
+        os.makedirs(self.output_dir)
+        with open(os.path.join(self.output_dir, "index.html"), "w", encoding="utf-8") as f:
+            f.write("<p>page</p>")
+
+        sync_static(self.static_dir, self.output_dir)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "index.html")))
+
+    def test_missing_static_dir(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_static(os.path.join(self.root, "missing"), self.output_dir)
+
+
+class TestCopyAsset(unittest.TestCase):
+    def test_replacing_a_hardlink_leaves_the_source_untouched(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "a.css")
+            other = os.path.join(tmp, "b.css")
+            destination = os.path.join(tmp, "out", "a.css")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("a")
+            with open(other, "w", encoding="utf-8") as f:
+                f.write("b")
+
+            copy_asset(source, destination, hardlink=True)
+            copy_asset(other, destination)
+
+            with open(source, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "a")
+            with open(destination, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import unittest
+
+from src.htmlnode import LeafNode, ParentNode
+from src.template import PageTemplate, add_image_dimensions, rewrite_basepath
+
+TEMPLATE = (
+    '<title>{{ Title }}</title><link href="/index.css" rel="stylesheet" />'
+    "<nav>{{ nav }}</nav><article>{{ Content }}</article><footer>{{ Footer }}</footer>"
+)
+
+
+def replace_render(source, title, nav, content, footer, basepath):
+    html = (
+        source.replace("{{ Title }}", title)
+        .replace("{{ nav }}", nav)
+        .replace("{{ Content }}", content)
+        .replace("{{ Footer }}", footer)
+    )
+    return html.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+
+class TestPageTemplate(unittest.TestCase):
+    def test_render_matches_string_replacement(self):
+        args = ("Title", '<ul><li><a href="/">Home</a></li></ul>', '<div><img src="/a.png" alt="a"></div>', "")
+        for basepath in ("/", "/site/"):
+            template = PageTemplate(TEMPLATE, basepath)
+            self.assertEqual(template.render(*args), replace_render(TEMPLATE, *args, basepath))
+
+    def test_repeated_and_missing_slots(self):
+        template = PageTemplate("<h1>{{ Title }}</h1><title>{{ Title }}</title>")
+        self.assertEqual(template.slots, ["Title", "Title"])
+        self.assertEqual(template.render("Hi", content="ignored"), "<h1>Hi</h1><title>Hi</title>")
+
+    def test_minify_applies_to_static_segments_only(self):
+        source = "<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n  <body>{{ Content }}</body>\n</html>\n"
+        template = PageTemplate(source, minify=True)
+        self.assertEqual(
+            template.render("A  title", content="<pre>\n  x\n</pre>"),
+            "<html><head><title>A  title</title></head><body><pre>\n  x\n</pre></body></html>",
+        )
+
+    def test_minify_keeps_slots_inside_preserved_elements(self):
+        source = '<script>\n// greet\nvar t = "{{ Title }}";\nalert(t)\n</script>'
+        template = PageTemplate(source, minify=True)
+        self.assertEqual(template.slots, ["Title"])
+        self.assertEqual(template.render("Hi"), '<script>\n// greet\nvar t = "Hi";\nalert(t)\n</script>')
+
+    def test_asset_map_rewrites_references(self):
+        asset_map = {"index.css": "index.1a2b3c4d.css", "a.png": "a.5e6f7a8b.png"}
+        template = PageTemplate(TEMPLATE, "/site/", asset_map=asset_map)
+        html = template.render("T", content='<img src="/a.png" alt="a"><a href="/blog/">b</a><img src="/b.png?v=1">')
+        self.assertIn('<link href="/site/index.1a2b3c4d.css"', html)
+        self.assertIn('<img src="/site/a.5e6f7a8b.png" alt="a">', html)
+        self.assertIn('<a href="/site/blog/">b</a><img src="/site/b.png?v=1">', html)
+
+        out = io.StringIO()
+        template.write(out, "T", content=ParentNode("p", [LeafNode("img", "", {"src": "/a.png", "alt": "a"})]))
+        self.assertIn('<img src="/site/a.5e6f7a8b.png" alt="a">', out.getvalue())
+
+    def test_image_dimensions(self):
+        sizes = {"a.png": (10, 20)}
+        self.assertEqual(
+            add_image_dimensions('<img src="/a.png" alt="a"><img src="/b.png"><img src="https://x/a.png">', sizes),
+            '<img src="/a.png" alt="a" width="10" height="20" loading="lazy" decoding="async">'
+            '<img src="/b.png"><img src="https://x/a.png">',
+        )
+        self.assertEqual(
+            add_image_dimensions('<img src="/a.png" loading="eager" />', sizes),
+            '<img src="/a.png" loading="eager" width="10" height="20" decoding="async" />',
+        )
+
+        template = PageTemplate(TEMPLATE, "/site/", asset_map={"a.png": "a.1234abcd.png"}, image_sizes=sizes)
+        out = io.StringIO()
+        template.write(out, "T", content=ParentNode("p", [LeafNode("img", "", {"src": "/a.png", "alt": "a"})]))
+        self.assertIn('<img src="/site/a.1234abcd.png" alt="a" width="10" height="20"', out.getvalue())
+
+    def test_template_without_slots(self):
+        template = PageTemplate('<a href="/x">x</a>', "/base/")
+        self.assertEqual(template.render("Title"), '<a href="/base/x">x</a>')
+
+    def test_write_streams_content_node(self):
+        content = ParentNode("div", [ParentNode("p", [LeafNode("a", "link", {"href": "/blog"})])])
+        for basepath in ("/", "/site/"):
+            template = PageTemplate(TEMPLATE, basepath)
+            out = io.StringIO()
+            template.write(out, "Title", "", content)
+            self.assertEqual(out.getvalue(), template.render("Title", "", content.to_html()))
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(rewrite_basepath('<a href="/x"><img src="/y">', "/b/"), '<a href="/b/x"><img src="/b/y">')
+        self.assertEqual(rewrite_basepath('<a href="/x">', "/"), '<a href="/x">')
+
+
+if __name__ == "__main__":
+    unittest.main()
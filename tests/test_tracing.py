@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.tracing import PAGE_SPAN, Tracer
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer()
+        with tracer.span("parse"):
+            pass
+        self.assertEqual(tracer.events, [])
+
+    def test_spans_and_summary(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span(PAGE_SPAN, source="a.md"):
+            with tracer.span("parse"):
+                pass
+        tracer.add_span(PAGE_SPAN, 0, 5_000_000, source="slow.md")
+
+        self.assertEqual([event["name"] for event in tracer.events], ["parse", PAGE_SPAN, PAGE_SPAN])
+        self.assertEqual(tracer.events[2]["dur"], 5000)
+        self.assertEqual(tracer.events[2]["ph"], "X")
+
+        summary = tracer.summary()
+        self.assertIn("slow.md", summary.splitlines()[1])
+        self.assertIn("parse (1 spans)", summary)
+
+    def test_write_chrome_trace_and_drain(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("read", path="x.md"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            tracer.write_chrome_trace(path)
+            with open(path, encoding="utf-8") as trace_file:
+                data = json.load(trace_file)
+        self.assertEqual(data["traceEvents"][0]["args"], {"path": "x.md"})
+        self.assertEqual(len(tracer.drain()), 1)
+        self.assertEqual(tracer.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
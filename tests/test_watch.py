@@ -0,0 +1,115 @@
+import gzip
+import os
+import unittest
+from unittest import mock
+
+from src import build, pages, watch
+from src.build import build_site
+from src.manifest import BuildManifest
+from src.page_index import PageIndex
+from src.pages import generate_page
+from src.watch import DirectoryWatcher, FileChanges, rebuild_changed_content, scan_directory, sync_changed_static
+from tests.support import TEMPLATE, SiteTestCase, TempDirTestCase
+
+
+class TestDirectoryWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.root, "blog"))
+        self.write("index.md", "# Home\n")
+        self.write(os.path.join("blog", "post.md"), "# Post\n")
+
+    def test_scan_directory(self):
+        self.assertEqual(set(scan_directory(self.root)), {"index.md", os.path.join("blog", "post.md")})
+        self.assertEqual(scan_directory(os.path.join(self.root, "missing")), {})
+
+    def test_poll_reports_changes(self):
+        watcher = DirectoryWatcher(self.root)
+        self.assertFalse(watcher.poll())
+
+        path = self.write("index.md", "# Home, edited\n")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.write("new.md", "# New\n")
+        os.remove(os.path.join(self.root, "blog", "post.md"))
+
+        changes = watcher.poll()
+        self.assertEqual(changes.added, {"new.md"})
+        self.assertEqual(changes.changed, {"index.md"})
+        self.assertEqual(changes.removed, {os.path.join("blog", "post.md")})
+        self.assertFalse(watcher.poll())
+
+
+class TestWatchRebuilds(SiteTestCase):
+    def assertSidecarMatches(self, rel_path):
+        with open(self.output(rel_path), "rb") as output, gzip.open(self.output(rel_path + ".gz")) as sidecar:
+            self.assertEqual(sidecar.read(), output.read())
+
+    def test_rebuilds_refresh_gzip_sidecars(self):
+        config = self.config(incremental=True, gzip=True, gzip_min_size=0)
+        self.write("index.css", "body { color: red; }\n" * 20, self.static_dir)
+        build_site(config)
+        self.assertSidecarMatches("index.html")
+        self.assertSidecarMatches("index.css")
+
+        self.write("index.md", "# Home\n\n" + "Welcome back. " * 20, self.content_dir)
+        rebuild_changed_content(config, FileChanges(set(), {"index.md"}, set()))
+        self.assertIn("Welcome back.", self.read_output("index.html"))
+        self.assertSidecarMatches("index.html")
+
+        os.remove(os.path.join(self.content_dir, "contact", "index.md"))
+        rebuild_changed_content(config, FileChanges(set(), set(), {os.path.join("contact", "index.md")}))
+        self.assertFalse(os.path.exists(self.output("contact/index.html.gz")))
+
+        self.write("index.css", "body { color: blue; }\n" * 20, self.static_dir)
+        sync_changed_static(config)
+        self.assertSidecarMatches("index.css")
+
+    def test_rebuilds_do_not_rehash_the_output_directory(self):
+        for gzip_outputs in (True, False):
+            config = self.config(incremental=True, gzip=gzip_outputs, gzip_min_size=0, clean=True)
+            build_site(config)
+            self.write("index.md", f"# Home\n\nGzip {gzip_outputs}.", self.content_dir)
+            with (
+                mock.patch.object(build, "hash_outputs") as hash_outputs,
+                mock.patch.object(watch, "precompress_outputs", wraps=watch.precompress_outputs) as precompress,
+            ):
+                rebuild_changed_content(config, FileChanges(set(), {"index.md"}, set()))
+            hash_outputs.assert_not_called()
+            self.assertEqual(precompress.called, gzip_outputs)
+            if gzip_outputs:
+                self.assertEqual(list(precompress.call_args.args[1]), ["index.html"])
+
+    def test_rebuild_regenerates_only_changed_pages(self):
+        config = self.config(incremental=True)
+        build_site(config)
+
+        self.write("blog/post.md", "# Post\n\nNew post.", self.content_dir)
+        with mock.patch.object(pages, "generate_page", wraps=generate_page) as generate:
+            rebuild_changed_content(config, FileChanges({os.path.join("blog", "post.md")}, set(), set()))
+        self.assertEqual(generate.call_count, 1)
+        self.assertIn("New post.", self.read_output("blog/post.html"))
+        self.assertEqual(PageIndex.load(config.state_dir).pages[os.path.join("blog", "post.md")]["title"], "Post")
+
+    def test_rebuild_after_template_change_regenerates_every_page(self):
+        config = self.config(incremental=True)
+        build_site(config)
+
+        self.write("template.html", TEMPLATE + "<footer>v2</footer>", self.content_dir)
+        rebuild_changed_content(config, FileChanges(set(), {"template.html"}, set()))
+        for rel_path in ("index.html", "blog/index.html", "contact/index.html"):
+            self.assertTrue(self.read_output(rel_path).endswith("<footer>v2</footer>"))
+
+    def test_emptied_page_output_is_removed(self):
+        config = self.config(incremental=True)
+        build_site(config)
+        self.assertTrue(os.path.exists(self.output("contact/index.html")))
+
+        self.write("contact/index.md", "\n", self.content_dir)
+        rebuild_changed_content(config, FileChanges(set(), {os.path.join("contact", "index.md")}, set()))
+        self.assertFalse(os.path.exists(self.output("contact/index.html")))
+        self.assertNotIn(os.path.join("contact", "index.md"), BuildManifest.load(config.state_dir).pages)
+
+
+if __name__ == "__main__":
+    unittest.main()